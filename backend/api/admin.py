@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, date as dt_date
 from backend.core.database import get_db
+from backend.core.pagination import LISTING_MAX_PAGE_SIZE, forecast_listing
+from backend.core.partitions import drop_partitions_before
 from backend.db_models.forecast import Forecast
+from backend.db_models.ingest_run import IngestRun
+from backend.schemas.ingest import IngestRunOut
 from backend.core.security import get_current_admin_user
-import subprocess
+from backend.core.ingest_worker import ingest_worker
+from backend.core.snapshot import forecast_snapshot
 
 router = APIRouter()
 
@@ -14,43 +20,61 @@ def get_all_forecasts(
     region: str | None = Query(None),
     start_date: dt_date | None = Query(None),
     end_date: dt_date | None = Query(None),
+    cursor: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=LISTING_MAX_PAGE_SIZE),
+    format: str = Query("json", pattern="^(json|ndjson|csv)$"),
     db: Session = Depends(get_db),
     current_admin=Depends(get_current_admin_user)
 ):
-    query = db.query(Forecast)
+    query = select(Forecast.region, Forecast.forecast_date, Forecast.prob_hybrid, Forecast.alert, Forecast.id)
     if region:
-        query = query.filter(Forecast.region == region.lower())
+        query = query.where(Forecast.region == region.lower())
     if start_date:
-        query = query.filter(Forecast.forecast_date >= start_date)
+        query = query.where(Forecast.forecast_date >= start_date)
     if end_date:
-        query = query.filter(Forecast.forecast_date <= end_date)
+        query = query.where(Forecast.forecast_date <= end_date)
 
-    forecasts = query.order_by(Forecast.forecast_date.desc()).all()
-    return [
-        {
-            "region": f.region,
-            "date": str(f.forecast_date),
-            "risk_score": f.prob_hybrid,
-            "alert": f.alert
-        }
-        for f in forecasts
-    ]
+    def to_dict(row):
+        name, day, prob, alert, _ = row
+        return {"region": name, "date": str(day), "risk_score": prob, "alert": alert}
+
+    # Newest first
+    return forecast_listing(db, query, to_dict, ["region", "date", "risk_score", "alert"], cursor=cursor,
+                            limit=limit, fmt=format, descending=True)
 
 # 2. Trigger forecast job manually (admin only)
-@router.post("/admin/ingest")
-def trigger_forecast_job(current_admin=Depends(get_current_admin_user)):
-    try:
-        result = subprocess.run(
-            ["python", "simulation/forecast_job.py"],
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
-        if result.returncode != 0:
-            raise RuntimeError(result.stderr)
-        return {"message": "✅ Forecast job triggered", "stdout": result.stdout}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Forecast failed: {str(e)}")
+@router.post("/admin/ingest", status_code=202)
+def trigger_forecast_job(
+    backfill_days: int | None = Query(None, ge=1),
+    current_admin=Depends(get_current_admin_user)
+):
+    options = {"backfill_days": backfill_days} if backfill_days else {}
+    job_id = ingest_worker.enqueue(trigger="manual", **options)
+    return {"message": "✅ Forecast job queued", "job_id": job_id}
+
+# Ingest job history, newest first (admin only)
+@router.get("/admin/jobs", response_model=list[IngestRunOut])
+def list_ingest_jobs(
+    status: str | None = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_admin=Depends(get_current_admin_user)
+):
+    query = db.query(IngestRun)
+    if status:
+        query = query.filter(IngestRun.status == status)
+    return query.order_by(IngestRun.queued_at.desc()).limit(limit).all()
+
+@router.get("/admin/jobs/{job_id}", response_model=IngestRunOut)
+def get_ingest_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_admin=Depends(get_current_admin_user)
+):
+    run = db.get(IngestRun, job_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return run
 
 # 3. Delete old forecasts (admin only)
 @router.delete("/admin/cleanup")
@@ -60,9 +84,16 @@ def cleanup_old_forecasts(
     current_admin=Depends(get_current_admin_user)
 ):
     cutoff = datetime.utcnow().date() - timedelta(days=days)
+    # Partitioned storage: whole months/weeks before the cutoff are dropped,
+    # leaving only the partition that straddles it to DELETE from
+    dropped = drop_partitions_before(db.connection(), cutoff)
     deleted = db.query(Forecast).filter(Forecast.forecast_date < cutoff).delete()
     db.commit()
-    return {"message": f"🧹 Deleted {deleted} forecasts older than {days} days."}
+    forecast_snapshot.bump()
+    message = f"🧹 Deleted {deleted} forecasts older than {days} days."
+    if dropped:
+        message += f" Dropped {len(dropped)} partition(s): {', '.join(dropped)}."
+    return {"message": message}
 
 # 4. Ping endpoint for admin auth check
 @router.get("/admin/ping")
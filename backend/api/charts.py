@@ -1,79 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from backend.core.database import get_db
+from backend.core.pagination import LISTING_MAX_PAGE_SIZE, forecast_listing
+from backend.core.snapshot import forecast_snapshot, risk_counts
 from backend.db_models.forecast import Forecast
 from config.regions_config import REGIONS
 
 router = APIRouter()
 
+REGION_COORDS = {region: (info.get("lat"), info.get("lon")) for region, info in REGIONS.items()}
+
 @router.get("/status")
 def latest_status(db: Session = Depends(get_db)):
-    latest = db.query(Forecast.forecast_date).order_by(Forecast.forecast_date.desc()).first()
-    if not latest:
+    snapshot = forecast_snapshot.get(db)
+    if snapshot.empty:
         raise HTTPException(status_code=404, detail="No forecast data")
-
-    records = db.query(Forecast).filter(Forecast.forecast_date == latest[0]).all()
-
-    def label(score):
-        if score > 0.8:
-            return "High"
-        elif score > 0.5:
-            return "Moderate"
-        return "Low"
-
-    return [
-        {
-            "region": f.region,
-            "risk_score": f.prob_hybrid,
-            "alert_level": label(f.prob_hybrid),
-            "lat": REGIONS.get(f.region, {}).get("lat"),
-            "lon": REGIONS.get(f.region, {}).get("lon")
-        }
-        for f in records
-    ]
+    return Response(snapshot.status_json, media_type="application/json")
 
 @router.get("/risk-summary")
-def risk_summary(db: Session = Depends(get_db)):
-    latest = db.query(Forecast.forecast_date).order_by(Forecast.forecast_date.desc()).first()
-    if not latest:
-        raise HTTPException(status_code=404, detail="No forecast data")
+def risk_summary(
+    forecast_date: date | None = Query(None, alias="date"),
+    db: Session = Depends(get_db)
+):
+    if forecast_date is not None:
+        # Any other day is bucketed in SQL rather than loaded row by row
+        counts = risk_counts(db, forecast_date)
+        if not any(counts.values()):
+            raise HTTPException(status_code=404, detail="No forecast data")
+        return counts
 
-    records = db.query(Forecast).filter(Forecast.forecast_date == latest[0]).all()
+    snapshot = forecast_snapshot.get(db)
+    if snapshot.empty:
+        raise HTTPException(status_code=404, detail="No forecast data")
+    return Response(snapshot.summary_json, media_type="application/json")
 
-    summary = {"Low": 0, "Moderate": 0, "High": 0}
-    for f in records:
-        if f.prob_hybrid > 0.8:
-            summary["High"] += 1
-        elif f.prob_hybrid > 0.5:
-            summary["Moderate"] += 1
-        else:
-            summary["Low"] += 1
-    return summary
+HISTORICAL_FIELDS = ["region", "date", "risk_score", "alert", "lat", "lon"]
 
 @router.get("/historical")
 def historical_forecasts(
     region: str = Query(None),
     days: int = 30,
+    cursor: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=LISTING_MAX_PAGE_SIZE),
+    format: str = Query("json", pattern="^(json|ndjson|csv)$"),
     db: Session = Depends(get_db)
 ):
     cutoff = datetime.utcnow().date() - timedelta(days=days)
-    
-    query = db.query(Forecast).filter(Forecast.forecast_date >= cutoff)
 
+    # Plain tuples of just the needed columns; no ORM objects
+    query = (
+        select(Forecast.region, Forecast.forecast_date, Forecast.prob_hybrid, Forecast.alert, Forecast.id)
+        .where(Forecast.forecast_date >= cutoff)
+    )
     if region:
-        query = query.filter(Forecast.region == region.lower())
+        query = query.where(Forecast.region == region.lower())
 
-    results = query.order_by(Forecast.forecast_date).all()
+    def to_dict(row):
+        name, day, prob, alert, _ = row
+        lat, lon = REGION_COORDS.get(name, (None, None))
+        return {"region": name, "date": day.isoformat(), "risk_score": prob, "alert": alert,
+                "lat": lat, "lon": lon}
 
-    return [
-        {
-            "region": f.region,
-            "date": str(f.forecast_date),
-            "risk_score": f.prob_hybrid,
-            "alert": f.alert,
-            "lat": REGIONS.get(f.region, {}).get("lat"),
-            "lon": REGIONS.get(f.region, {}).get("lon")
-        }
-        for f in results
-    ]
+    return forecast_listing(db, query, to_dict, HISTORICAL_FIELDS, cursor=cursor, limit=limit,
+                            fmt=format, filename="historical")
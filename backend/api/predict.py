@@ -1,14 +1,68 @@
-import joblib
+import os
+from concurrent.futures import TimeoutError as FutureTimeout
+import numpy as np
 import pandas as pd
-from fastapi import APIRouter
-from backend.schemas.forecast import PredictionRequest, PredictionResponse
+from fastapi import APIRouter, HTTPException
+from backend.schemas.forecast import (
+    PredictionRequest,
+    PredictionResponse,
+    PredictionBatchRequest,
+    PredictionBatchResponse,
+)
+from backend.core.model_registry import get_model, get_fuzzy_surface
+from backend.core.micro_batcher import MicroBatcher
 
 router = APIRouter()
-model = joblib.load("backend/models/hybrid_calibrated_pipeline.pkl")
+
+# Opt-in coalescing of concurrent /predict calls into one predict_proba
+PREDICT_MICROBATCH   = os.getenv("PREDICT_MICROBATCH", "").lower() in ("1", "true", "yes")
+MICROBATCH_WINDOW_MS = float(os.getenv("PREDICT_MICROBATCH_WINDOW_MS", "3"))
+MICROBATCH_MAX       = int(os.getenv("PREDICT_MICROBATCH_MAX", "64"))
+MICROBATCH_TIMEOUT_S = float(os.getenv("PREDICT_MICROBATCH_TIMEOUT_S", "5"))
+
+def score_frame(df):
+    """Fill missing Fuzzy_Risk from the surface and score every row in one call."""
+    if "Fuzzy_Risk" not in df:
+        df["Fuzzy_Risk"] = np.nan
+    fuzzy = np.array(df["Fuzzy_Risk"], dtype=float)
+    missing = np.isnan(fuzzy)
+    if missing.any():
+        fuzzy[missing] = get_fuzzy_surface().evaluate(
+            df["Precipitation_norm"].to_numpy(dtype=float)[missing],
+            df["River_Level_norm"].to_numpy(dtype=float)[missing],
+        )
+    df["Fuzzy_Risk"] = fuzzy
+    return get_model().predict_proba(df)[:, 1]
+
+def alert_levels(scores):
+    return np.where(scores > 0.8, "High", np.where(scores > 0.5, "Moderate", "Low"))
+
+batcher = MicroBatcher(score_frame, MICROBATCH_WINDOW_MS, MICROBATCH_MAX) if PREDICT_MICROBATCH else None
 
 @router.post("/predict", response_model=PredictionResponse)
 def predict(data: PredictionRequest):
-    df = pd.DataFrame([data.model_dump()])
-    risk_score = model.predict_proba(df)[0][1]
-    alert = "High" if risk_score > 0.8 else "Moderate" if risk_score > 0.5 else "Low"
-    return {"risk_score": risk_score, "alert_level": alert}
+    if batcher is not None:
+        future = batcher.submit(data.model_dump())
+        try:
+            risk_score = future.result(timeout=MICROBATCH_TIMEOUT_S)
+        except FutureTimeout:
+            # Stalled or lost worker: fail this request instead of hanging its thread
+            future.cancel()
+            raise HTTPException(status_code=503, detail="Prediction timed out; try again")
+    else:
+        risk_score = float(score_frame(pd.DataFrame([data.model_dump()]))[0])
+    return {"risk_score": risk_score, "alert_level": alert_levels(risk_score).item()}
+
+@router.post("/predict/batch", response_model=PredictionBatchResponse)
+def predict_batch(data: PredictionBatchRequest):
+    # At most PREDICT_MAX_BATCH rows: larger bodies fail validation (422)
+    if data.rows is not None:
+        df = pd.DataFrame([row.model_dump() for row in data.rows])
+    else:
+        df = pd.DataFrame(data.columns.model_dump(exclude_none=True))
+
+    if df.empty:
+        return {"risk_scores": [], "alert_levels": []}
+
+    scores = score_frame(df)
+    return {"risk_scores": scores.tolist(), "alert_levels": alert_levels(scores).tolist()}
@@ -0,0 +1,160 @@
+import csv
+import io
+from datetime import date
+
+from sqlalchemy import and_, event, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from backend.core.database import engine
+from backend.core.partitions import ensure_partitions
+from backend.core.snapshot import forecast_snapshot
+from backend.db_models.forecast import Forecast
+
+COLUMNS = ("region", "forecast_date", "prob_hybrid", "alert")
+KEY = ("region", "forecast_date")
+
+
+def _as_rows(records):
+    """
+    Normalize forecast records to tuples in COLUMNS order. Accepts a
+    DataFrame with those columns or an iterable of dicts / pydantic models.
+    """
+    if hasattr(records, "itertuples"):
+        frame = records[list(COLUMNS)]
+        return list(frame.itertuples(index=False, name=None))
+    rows = []
+    for r in records:
+        if not isinstance(r, dict):
+            r = r.model_dump()
+        rows.append(tuple(r[c] for c in COLUMNS))
+    return rows
+
+
+def _normalize(row):
+    region, forecast_date, prob_hybrid, alert = row
+    if not isinstance(forecast_date, date):
+        forecast_date = date.fromisoformat(str(forecast_date)[:10])
+    elif hasattr(forecast_date, "date"):  # datetime / pandas Timestamp
+        forecast_date = forecast_date.date()
+    return str(region), forecast_date, float(prob_hybrid), int(alert)
+
+
+def _copy_rows(conn, rows):
+    """
+    COPY rows into a temporary staging table, then upsert them into
+    forecasts with one INSERT … SELECT. Returns False if the driver cannot COPY.
+    """
+    cursor = conn.connection.driver_connection.cursor()
+    if not hasattr(cursor, "copy_expert"):  # psycopg2 only
+        return False
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for region, forecast_date, prob_hybrid, alert in rows:
+        writer.writerow((region, forecast_date.isoformat(), repr(prob_hybrid), alert))
+    buf.seek(0)
+
+    table = Forecast.__tablename__
+    cols = ", ".join(COLUMNS)
+    cursor.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS forecast_stage "
+        "(region varchar, forecast_date date, prob_hybrid double precision, alert integer) "
+        "ON COMMIT DELETE ROWS"
+    )
+    cursor.copy_expert(f"COPY forecast_stage ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+    cursor.execute(
+        f"INSERT INTO {table} ({cols}) SELECT {cols} FROM forecast_stage "
+        f"ON CONFLICT ({', '.join(KEY)}) DO UPDATE "
+        f"SET prob_hybrid = EXCLUDED.prob_hybrid, alert = EXCLUDED.alert"
+    )
+    cursor.execute("TRUNCATE forecast_stage")
+    cursor.close()
+    return True
+
+
+def _upsert_statement(dialect):
+    table = Forecast.__table__
+    if dialect == "postgresql":
+        stmt = postgresql.insert(table)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(table)
+    else:
+        return insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=list(KEY),
+        set_={"prob_hybrid": stmt.excluded.prob_hybrid, "alert": stmt.excluded.alert},
+    )
+
+
+def _write(conn, rows):
+    # Partitioned storage (FORECAST_PARTITIONS) needs a partition for every day first
+    ensure_partitions(conn, {row[1] for row in rows})
+    if conn.dialect.name == "postgresql" and _copy_rows(conn, rows):
+        return
+    # executemany: one prepared statement, all rows bound in a single call
+    conn.execute(_upsert_statement(conn.dialect.name), [dict(zip(COLUMNS, row)) for row in rows])
+
+
+def write_forecasts(records, bind=None):
+    """
+    Upsert forecast rows in one set-based write: COPY into a staging table
+    plus INSERT … ON CONFLICT on Postgres, an executemany upsert on SQLite.
+    A (region, forecast_date) that already exists gets the new prob_hybrid
+    and alert, so re-runs and backfills never duplicate rows; within one
+    batch the last record for a key wins.
+
+    `bind` may be an Engine (own transaction, committed here), a Connection
+    or an ORM Session (the caller commits). Returns the number of distinct
+    rows written. The dashboard snapshot (backend.core.snapshot) is marked
+    stale now and again once a Session commits, so a reload in between
+    cannot keep pre-commit data.
+    """
+    rows = [_normalize(row) for row in _as_rows(records)]
+    rows = list({row[:2]: row for row in rows}.values())
+    if not rows:
+        return 0
+
+    bind = engine if bind is None else bind
+    if isinstance(bind, Session):
+        _write(bind.connection(), rows)
+        event.listen(bind, "after_commit", lambda session: forecast_snapshot.bump(), once=True)
+    elif isinstance(bind, Connection):
+        _write(bind, rows)
+    elif isinstance(bind, Engine):
+        with bind.begin() as conn:
+            _write(conn, rows)
+    else:
+        raise TypeError(f"Cannot write forecasts through {type(bind).__name__}")
+    forecast_snapshot.bump()
+    return len(rows)
+
+
+def watermark_query():
+    """
+    Latest forecast_date of every region with that day's prob_hybrid and
+    alert: one GROUP BY over the (region, forecast_date) index joined back
+    to the matching rows, rather than loading forecasts.
+    """
+    latest = (
+        select(Forecast.region, func.max(Forecast.forecast_date).label("last_date"))
+        .group_by(Forecast.region)
+        .subquery()
+    )
+    return (
+        select(latest.c.region, latest.c.last_date,
+               func.max(Forecast.prob_hybrid).label("prob_hybrid"), func.max(Forecast.alert).label("alert"))
+        .join(Forecast, and_(Forecast.region == latest.c.region, Forecast.forecast_date == latest.c.last_date))
+        .group_by(latest.c.region, latest.c.last_date)
+        .order_by(latest.c.region)
+    )
+
+
+def read_watermarks(bind=None):
+    """Per-region watermarks as dicts with region, last_date, prob_hybrid and alert."""
+    bind = engine if bind is None else bind
+    if isinstance(bind, Engine):
+        with bind.connect() as conn:
+            return [dict(row._mapping) for row in conn.execute(watermark_query())]
+    return [dict(row._mapping) for row in bind.execute(watermark_query())]
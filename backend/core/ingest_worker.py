@@ -0,0 +1,434 @@
+import os
+import queue
+import shutil
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cron expression (minute hour day-of-month month day-of-week, local time) for
+# scheduled ingestion, e.g. "15 */6 * * *". Empty: on-demand triggers only.
+INGEST_SCHEDULE = os.getenv("INGEST_SCHEDULE", "").strip()
+# Where in-process runs send their results; see forecast_job --sink
+INGEST_SINK = os.getenv("INGEST_SINK", "db").lower()
+INGEST_KEEP_JOBS = int(os.getenv("INGEST_KEEP_JOBS", "100"))
+# A run still marked running after this long (e.g. its host never came back)
+# no longer blocks new runs from starting
+INGEST_MAX_RUN_S = int(os.getenv("INGEST_MAX_RUN_S", "21600"))
+
+# Serializes claim() across processes on Postgres; on SQLite the claim's
+# write transaction already holds the database lock
+CLAIM_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('ingest_runs_running'))"
+
+
+class CronSchedule:
+    """
+    Minimal five-field cron: `*`, lists, ranges and steps (`*/15`, `1-5`,
+    `0,30`). As in Vixie cron, when both day-of-month and day-of-week are
+    restricted a day matching either one fires.
+    """
+
+    BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: '{expr}'")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, dows = (
+            self._parse(field, lo, hi) for field, (lo, hi) in zip(fields, self.BOUNDS)
+        )
+        self.dows = {d % 7 for d in dows}  # 7 is Sunday too
+        self.any_day = fields[2] == "*"
+        self.any_dow = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field, lo, hi):
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step = part.split("/", 1)
+                step = int(step)
+                if step < 1:
+                    raise ValueError(f"Bad cron step in '{field}'")
+            if part == "*":
+                start, end = lo, hi
+            elif "-" in part:
+                start, end = (int(v) for v in part.split("-", 1))
+            else:
+                start = int(part)
+                end = hi if step > 1 else start
+            if not lo <= start <= end <= hi:
+                raise ValueError(f"Cron field '{field}' out of range {lo}-{hi}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt):
+        dom = dt.day in self.days
+        dow = dt.isoweekday() % 7 in self.dows
+        if self.any_day or self.any_dow:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, dt):
+        """First firing time strictly after `dt` (to the minute)."""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression '{self.expr}' never fires")
+
+
+def run_forecast_job(job_id, backfill_days=None, stream=False):
+    """
+    Default job body: the forecast job's main(), run in this process. Each
+    job checkpoints into its own directory, so it can never discard the
+    files of a run started elsewhere (another API worker, the CLI).
+    """
+    from simulation.checkpoint import CHECKPOINT_DIR, Checkpoint
+    from simulation.forecast_job import main
+
+    checkpoint = Checkpoint(os.path.join(CHECKPOINT_DIR, "jobs", job_id))
+    try:
+        return main(backfill_days=backfill_days, stream=stream, sink=INGEST_SINK, checkpoint=checkpoint)
+    finally:
+        # Nothing resumes a worker run; failed regions are on the job record
+        shutil.rmtree(checkpoint.path, ignore_errors=True)
+
+
+def worker_id():
+    """host:pid of this process, recorded on the jobs it owns."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def is_orphaned(owner, me):
+    """
+    Whether a queued/running job owned by `owner` can no longer finish, as
+    seen from worker `me` when it starts: owned by no one (rows from before
+    ownership was recorded), by `me` itself (a restarted container reusing
+    the pid), or by a dead process on this host. Jobs of other hosts are
+    left to their own workers.
+    """
+    if not owner or owner == me:
+        return True
+    host, _, pid = owner.rpartition(":")
+    return host == me.rpartition(":")[0] and pid.isdigit() and not _pid_alive(int(pid))
+
+
+class DbRunStore:
+    """Persists each job's state as an IngestRun row (see GET /admin/jobs)."""
+
+    def fail_interrupted(self, me):
+        """Mark queued/running runs whose process died as failed; returns how many."""
+        from backend.core.database import SessionLocal
+        from backend.db_models.ingest_run import IngestRun
+
+        db = SessionLocal()
+        try:
+            runs = db.query(IngestRun).filter(IngestRun.status.in_(("queued", "running"))).all()
+            stale = [run for run in runs if is_orphaned(run.worker, me)]
+            for run in stale:
+                run.status = "failed"
+                run.error = "Interrupted: the worker process exited before the job finished"
+                run.finished_at = datetime.utcnow()
+            db.commit()
+            return len(stale)
+        finally:
+            db.close()
+
+    def claim(self, job, me):
+        """
+        Atomically mark `job` running unless another run is already running in
+        any process. Returns None when claimed, else the id of the running run.
+        """
+        from sqlalchemy import exists, select, text, update
+        from backend.core.database import SessionLocal
+        from backend.db_models.ingest_run import IngestRun
+
+        columns = {c.name for c in IngestRun.__table__.columns}
+        started_at = datetime.utcnow()
+        other = IngestRun.__table__.alias("other")
+        running = (other.c.status == "running", other.c.id != job["id"],
+                   other.c.started_at > started_at - timedelta(seconds=INGEST_MAX_RUN_S))
+        db = SessionLocal()
+        try:
+            if db.bind.dialect.name == "postgresql":
+                db.execute(text(CLAIM_LOCK_SQL))
+            row = {**job, "status": "queued", "started_at": None}
+            db.merge(IngestRun(**{k: v for k, v in row.items() if k in columns}))
+            db.flush()
+            claimed = db.execute(
+                update(IngestRun)
+                .where(IngestRun.id == job["id"], ~exists().where(*running))
+                .values(status="running", started_at=started_at, worker=me)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            blocker = None if claimed else db.execute(select(other.c.id).where(*running)).scalar()
+            db.commit()
+            return blocker
+        finally:
+            db.close()
+
+    def save(self, job):
+        from backend.core.database import SessionLocal
+        from backend.db_models.ingest_run import IngestRun
+
+        columns = {c.name for c in IngestRun.__table__.columns}
+        db = SessionLocal()
+        try:
+            db.merge(IngestRun(**{k: v for k, v in job.items() if k in columns}))
+            db.commit()
+        finally:
+            db.close()
+
+
+def _warm_up():
+    from backend.core.model_registry import get_model, get_fuzzy_surface, get_static_features
+    get_model(), get_fuzzy_surface(), get_static_features()
+
+
+_STOP = object()
+
+
+class IngestWorker:
+    """
+    Long-lived ingestion worker running forecast jobs one at a time on a
+    background thread of the current process, so imports and loaded models
+    stay warm between runs.
+
+    Jobs come from enqueue() (e.g. the admin trigger) and, when a cron
+    `schedule` is given, from the schedule itself. A trigger arriving while
+    an identical job is still queued returns that job's id instead of
+    queueing a duplicate. The thread starts on first use and is restarted
+    in a forked child, like the predict micro-batcher. run_fn is called
+    with the job's options and its `job_id`.
+
+    Every API process has its own worker, so with a `store` that supports
+    claim() a job only starts if no run is running in any process; one that
+    loses the claim is recorded as skipped.
+
+    If run_fn returns a RunStats, its stage times, counts, failed regions
+    and error are merged into the job; a run that reports an error counts
+    as failed. With a `store`, every state change is persisted through
+    store.save(job).
+    """
+
+    def __init__(self, run_fn=run_forecast_job, schedule=INGEST_SCHEDULE, warm_up=_warm_up,
+                 keep_jobs=INGEST_KEEP_JOBS, store=None):
+        self.run_fn = run_fn
+        self.store = store
+        self.schedule = CronSchedule(schedule) if isinstance(schedule, str) and schedule else schedule or None
+        self.warm_up = warm_up
+        self.keep_jobs = keep_jobs
+        self.jobs = OrderedDict()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    # ─── Public API ──────────────────────────────────────────────────────────
+    def start(self):
+        self._ensure_worker()
+        return self
+
+    def stop(self, timeout=None):
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def enqueue(self, trigger="manual", **options):
+        """Queue a job run with keyword `options` for run_fn; returns its job id."""
+        self._ensure_worker()
+        with self._lock:
+            for job in self.jobs.values():
+                if job["status"] == "queued" and job["options"] == options:
+                    return job["id"]
+            job = {
+                "id":          uuid.uuid4().hex,
+                "trigger":     trigger,
+                "options":     options,
+                "status":      "queued",
+                "worker":      worker_id(),
+                "queued_at":   datetime.utcnow(),
+                "started_at":  None,
+                "finished_at": None,
+                "error":       None,
+            }
+            self.jobs[job["id"]] = job
+            while len(self.jobs) > self.keep_jobs:
+                self.jobs.popitem(last=False)
+        self._save(job)
+        self._queue.put(job["id"])
+        return job["id"]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job has finished (for tests and scripts)."""
+        deadline = None if timeout is None else datetime.utcnow() + timedelta(seconds=timeout)
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in ("succeeded", "failed", "skipped"):
+                return job
+            if deadline is not None and datetime.utcnow() >= deadline:
+                return job
+            time.sleep(0.02)
+
+    # ─── Worker thread ───────────────────────────────────────────────────────
+    def _ensure_worker(self):
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                if self._pid != os.getpid():
+                    self._reconcile()
+                self._queue = queue.Queue()
+                for job in self.jobs.values():
+                    if job["status"] == "queued":
+                        self._queue.put(job["id"])
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="ingest-worker", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        if self.warm_up is not None:
+            try:
+                self.warm_up()
+            except Exception:
+                traceback.print_exc()
+
+        next_fire = self.schedule.next_after(datetime.now()) if self.schedule else None
+        while True:
+            now = datetime.now()
+            if next_fire is not None and now >= next_fire:
+                self.enqueue(trigger="schedule")
+                next_fire = self.schedule.next_after(now)
+            timeout = (next_fire - now).total_seconds() if next_fire is not None else None
+            try:
+                item = self._queue.get(timeout=max(timeout, 0) if timeout is not None else None)
+            except queue.Empty:
+                continue
+            if item is _STOP:
+                return
+            self._execute(item)
+
+    def _execute(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] != "queued":
+                return
+            job["status"] = "running"
+            job["started_at"] = datetime.utcnow()
+            options = dict(job["options"])
+        if not self._claim(job):
+            return
+        self._save(job)
+
+        print(f"🚚 Ingest job {job_id} started ({job['trigger']})", flush=True)
+        stats = {}
+        try:
+            result = self.run_fn(job_id=job_id, **options)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        else:
+            stats = result.as_dict() if hasattr(result, "as_dict") else {}
+            error = stats.get("error")
+
+        with self._lock:
+            job.update(stats)
+            job["status"] = "failed" if error else "succeeded"
+            job["error"] = error
+            job["finished_at"] = datetime.utcnow()
+            job["duration_s"] = round((job["finished_at"] - job["started_at"]).total_seconds(), 4)
+        self._save(job)
+        print(f"🏁 Ingest job {job_id} {job['status']}", flush=True)
+
+    def _claim(self, job):
+        if not hasattr(self.store, "claim"):
+            return True
+        try:
+            with self._lock:
+                snapshot = dict(job)
+            blocker = self.store.claim(snapshot, worker_id())
+        except Exception:
+            # Without the guard the run could overlap another; better not to run
+            traceback.print_exc()
+            blocker = "unknown (the claim failed)"
+        if blocker is None:
+            return True
+        with self._lock:
+            job["status"] = "skipped"
+            job["error"] = f"Skipped: ingest run {blocker} is already running"
+            job["finished_at"] = datetime.utcnow()
+        self._save(job)
+        print(f"⏭️  Ingest job {job['id']} skipped: run {blocker} is already running", flush=True)
+        return False
+
+    def _reconcile(self):
+        # A new worker process: runs left queued/running by a process that died
+        # would otherwise show as in progress forever
+        if not hasattr(self.store, "fail_interrupted"):
+            return
+        try:
+            failed = self.store.fail_interrupted(worker_id())
+        except Exception:
+            traceback.print_exc()
+            return
+        if failed:
+            print(f"⚠️  Marked {failed} interrupted ingest job(s) as failed", flush=True)
+
+    def _save(self, job):
+        if self.store is None:
+            return
+        try:
+            with self._lock:
+                snapshot = dict(job)
+            self.store.save(snapshot)
+        except Exception:
+            # Bookkeeping must never take the worker down
+            traceback.print_exc()
+
+
+ingest_worker = IngestWorker(store=DbRunStore())
+
+
+if __name__ == "__main__":
+    # Standalone worker: python -m backend.core.ingest_worker
+    if not INGEST_SCHEDULE:
+        print("⚠️  INGEST_SCHEDULE is empty; running one ingest now and exiting.")
+        print(ingest_worker.wait(ingest_worker.enqueue(trigger="cli")))
+    else:
+        print(f"⏰ Ingest worker running on schedule '{INGEST_SCHEDULE}'")
+        ingest_worker.start()._thread.join()
@@ -0,0 +1,247 @@
+"""
+Inference-only version of the calibrated hybrid pipeline.
+
+The trained artifact is CalibratedClassifierCV(isotonic, cv=5) over an imblearn
+pipeline (ColumnTransformer → SMOTE → LGBMClassifier). At predict time SMOTE
+does nothing and the rest is mostly sklearn dispatch around a little math, so
+compile_pipeline() flattens each fold into plain NumPy arrays:
+
+- OneHotEncoder   → per-column category arrays
+- PowerTransformer → lambdas plus standardization mean/scale
+- LGBM booster    → bare lightgbm.Booster, fed the NumPy matrix directly
+- isotonic map    → threshold arrays for np.interp
+
+LeanHybridModel.predict_proba() takes the same DataFrame and returns the same
+(n, 2) probabilities as the original pipeline, within float tolerance.
+"""
+
+import lightgbm as lgb
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, PowerTransformer
+
+
+def _compile_column_transformer(ct):
+    """
+    Flatten a fitted ColumnTransformer into one op per input column, each
+    knowing which slot(s) of the output matrix it writes.
+    """
+    if not isinstance(ct, ColumnTransformer):
+        raise ValueError("Expected a ColumnTransformer as the first pipeline step")
+    if getattr(ct, "sparse_output_", False):
+        raise ValueError("Sparse ColumnTransformer output is not supported")
+
+    ops = []
+    pos = 0
+    for name, trans, columns in ct.transformers_:
+        if trans == "drop" or len(columns) == 0:
+            continue
+        columns = list(columns)
+        if not all(isinstance(c, str) for c in columns):
+            raise ValueError("ColumnTransformer columns must be selected by name")
+
+        if trans == "passthrough":
+            for col in columns:
+                ops.append({"kind": "passthrough", "column": col, "pos": pos})
+                pos += 1
+        elif isinstance(trans, OneHotEncoder):
+            if trans.drop is not None or trans.handle_unknown not in ("ignore", "error"):
+                raise ValueError("OneHotEncoder must use drop=None and handle_unknown='ignore' or 'error'")
+            for col, cats in zip(columns, trans.categories_):
+                cats = np.asarray(cats).astype(str)
+                order = np.argsort(cats, kind="stable")
+                ops.append({
+                    "kind": "onehot",
+                    "column": col,
+                    "pos": pos,
+                    "categories": cats[order],  # sorted, for searchsorted
+                    "slots": order,             # output offset of each sorted category
+                    "ignore_unknown": trans.handle_unknown == "ignore",
+                })
+                pos += len(cats)
+        elif isinstance(trans, PowerTransformer):
+            scaler = trans._scaler if trans.standardize else None
+            for k, col in enumerate(columns):
+                ops.append({
+                    "kind": "power",
+                    "column": col,
+                    "pos": pos,
+                    "method": trans.method,
+                    "lambda": float(trans.lambdas_[k]),
+                    "mean": float(scaler.mean_[k]) if scaler is not None else 0.0,
+                    "scale": float(scaler.scale_[k]) if scaler is not None else 1.0,
+                })
+                pos += 1
+        else:
+            raise ValueError(f"Unsupported transformer '{name}': {type(trans).__name__}")
+    return ops, pos
+
+
+def _yeo_johnson(x, lmbda):
+    out = np.empty_like(x)
+    pos = x >= 0
+    if abs(lmbda) < np.spacing(1.0):
+        out[pos] = np.log1p(x[pos])
+    else:
+        out[pos] = (np.power(x[pos] + 1, lmbda) - 1) / lmbda
+    if abs(lmbda - 2) > np.spacing(1.0):
+        out[~pos] = -(np.power(-x[~pos] + 1, 2 - lmbda) - 1) / (2 - lmbda)
+    else:
+        out[~pos] = -np.log1p(-x[~pos])
+    return out
+
+
+def _box_cox(x, lmbda):
+    if abs(lmbda) < np.spacing(1.0):
+        return np.log(x)
+    return (np.power(x, lmbda) - 1) / lmbda
+
+
+class LeanFold:
+    """One calibrated fold: preprocessing ops, booster, isotonic map."""
+
+    def __init__(self, calibrated):
+        estimator = calibrated.estimator
+        self.ops, self.n_features = _compile_column_transformer(estimator.steps[0][1])
+
+        clf = estimator.steps[-1][1]
+        if not hasattr(clf, "booster_"):
+            raise ValueError("Expected a fitted LightGBM classifier as the last pipeline step")
+        booster = clf.booster_
+        self.booster = lgb.Booster(model_str=booster.model_to_string(num_iteration=booster.best_iteration or -1))
+
+        # CalibratedClassifierCV calibrates decision_function when the estimator
+        # exposes it, else predict_proba; a Pipeline only has the methods of its
+        # final step, so plain attribute checks give the same choice
+        if hasattr(estimator, "decision_function"):
+            self.response = "raw"
+        elif hasattr(estimator, "predict_proba"):
+            self.response = "proba"
+        else:
+            raise ValueError("Calibrated estimator has neither decision_function nor predict_proba")
+
+        if getattr(calibrated, "method", "isotonic") != "isotonic" or len(calibrated.calibrators) != 1:
+            raise ValueError("Only binary isotonic calibration is supported")
+        iso = calibrated.calibrators[0]
+        self.iso_x = np.asarray(iso.X_thresholds_, dtype=np.float64)
+        self.iso_y = np.asarray(iso.y_thresholds_, dtype=np.float64)
+
+    def transform(self, cols, n, columns=None, out=None):
+        """
+        Build the model matrix from a {column: ndarray} mapping. With
+        `columns`, only those inputs are written into the given `out` matrix.
+        """
+        if out is None:
+            out = np.zeros((n, self.n_features), dtype=np.float64)
+        for op in self.ops:
+            col = op["column"]
+            if columns is not None and col not in columns:
+                continue
+            kind, pos = op["kind"], op["pos"]
+            if kind == "onehot":
+                cats = op["categories"]
+                values = cols[col]
+                idx = np.minimum(np.searchsorted(cats, values), len(cats) - 1)
+                known = cats[idx] == values
+                if not known.all() and not op["ignore_unknown"]:
+                    raise ValueError(f"Unknown categories in column '{col}'")
+                block = out[:, pos:pos + len(cats)]
+                block[:] = 0.0
+                block[np.flatnonzero(known), op["slots"][idx[known]]] = 1.0
+            elif kind == "power":
+                x = np.asarray(cols[col], dtype=np.float64)
+                if op["method"] == "yeo-johnson":
+                    x = _yeo_johnson(x, op["lambda"])
+                else:
+                    x = _box_cox(x, op["lambda"])
+                out[:, pos] = (x - op["mean"]) / op["scale"]
+            else:
+                out[:, pos] = np.asarray(cols[col], dtype=np.float64)
+        return out
+
+    def predict_transformed(self, Xt):
+        score = self.booster.predict(Xt, raw_score=self.response == "raw")
+        return np.interp(score, self.iso_x, self.iso_y)
+
+
+class LeanHybridModel:
+    """Drop-in replacement for the calibrated pipeline's predict_proba()."""
+
+    def __init__(self, cal_pipe):
+        classes = np.asarray(cal_pipe.classes_)
+        if classes.shape != (2,):
+            raise ValueError("Only binary classifiers are supported")
+        self.classes_ = classes
+        self.folds = [LeanFold(c) for c in cal_pipe.calibrated_classifiers_]
+        self.feature_names_in_ = np.asarray(getattr(cal_pipe, "feature_names_in_", []), dtype=object)
+
+        columns = []
+        for fold in self.folds:
+            columns.extend(op["column"] for op in fold.ops if op["column"] not in columns)
+        self.columns = columns
+
+    def _columns(self, X, columns=None):
+        cols = {}
+        for col in columns or self.columns:
+            values = X[col].to_numpy()
+            if values.dtype.kind not in "biuf":
+                values = values.astype(str)
+            cols[col] = values
+        return cols
+
+    def _average(self, proba_sum):
+        proba = proba_sum / len(self.folds)
+        proba[(1.0 < proba) & (proba <= 1.0 + 1e-5)] = 1.0
+        return proba
+
+    def predict_positive(self, X):
+        cols = self._columns(X)
+        n = len(X)
+        proba = np.zeros(n)
+        for fold in self.folds:
+            proba += fold.predict_transformed(fold.transform(cols, n))
+        return self._average(proba)
+
+    def predict_proba(self, X):
+        pos = self.predict_positive(X)
+        return np.column_stack([1.0 - pos, pos])
+
+
+class StaticFeatureCache:
+    """
+    Each region's static slice of the model matrix (one-hot soil / land cover,
+    power-transformed terrain), computed once per fold for a given model.
+    Scoring copies the cached rows and only transforms the dynamic columns
+    (month terms, Fuzzy_Risk, …) into them.
+    """
+
+    def __init__(self, model, static_table):
+        self.model = model
+        self.regions = {region: i for i, region in enumerate(static_table.index)}
+        self.static_columns = [c for c in model.columns if c in static_table.columns]
+        self.dynamic_columns = [c for c in model.columns if c not in static_table.columns]
+
+        cols = model._columns(static_table, self.static_columns)
+        n = len(static_table)
+        self.blocks = [
+            fold.transform(cols, n, columns=set(self.static_columns))
+            for fold in model.folds
+        ]
+
+    def covers(self, regions):
+        return all(region in self.regions for region in set(regions))
+
+    def predict_positive(self, regions, X):
+        idx = np.fromiter((self.regions[r] for r in regions), dtype=np.intp, count=len(X))
+        cols = self.model._columns(X, self.dynamic_columns)
+        dynamic = set(self.dynamic_columns)
+        proba = np.zeros(len(X))
+        for fold, block in zip(self.model.folds, self.blocks):
+            Xt = block[idx]
+            fold.transform(cols, len(X), columns=dynamic, out=Xt)
+            proba += fold.predict_transformed(Xt)
+        return self.model._average(proba)
+
+
+def compile_pipeline(cal_pipe):
+    return LeanHybridModel(cal_pipe)
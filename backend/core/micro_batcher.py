@@ -0,0 +1,96 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row scoring calls into one vectorized call.
+
+    Callers submit() a feature dict and block on the returned Future. A
+    background thread takes the first waiting row, keeps collecting for up to
+    `window_ms` (or until `max_batch` rows), scores the batch with
+    `score_fn(DataFrame) -> array` and resolves each caller's Future with its
+    own score. If the batch call raises, its rows are rescored one by one;
+    if it returns the wrong number of scores, every row in the batch fails.
+    """
+
+    def __init__(self, score_fn, window_ms=3.0, max_batch=64):
+        self.score_fn = score_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def submit(self, row):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def _ensure_worker(self):
+        # The thread is started lazily (and restarted after a fork), so the
+        # batcher can be created at import time in a preloading master process.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                if self._pid != os.getpid():
+                    # A forked child: rows queued in the parent have no waiters here,
+                    # and the inherited queue's locks may be held
+                    self._queue = queue.Queue()
+                # Same process: a replacement worker drains the rows already queued
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="predict-microbatcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Skip rows whose caller gave up waiting and cancelled
+            batch = [(row, future) for row, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                scores = self.score_fn(pd.DataFrame([row for row, _ in batch]))
+            except Exception:
+                # One bad row must not fail its neighbours: score each alone,
+                # so only the rows that fail on their own get the exception
+                for row, future in batch:
+                    self._score_one(row, future)
+                continue
+            if len(scores) != len(batch):
+                # Scores cannot be matched to rows: fail them all rather than
+                # leave some callers waiting for a result that never comes
+                error = RuntimeError(f"score_fn returned {len(scores)} scores for {len(batch)} rows")
+                for _, future in batch:
+                    future.set_exception(error)
+                continue
+            for (_, future), score in zip(batch, scores):
+                future.set_result(float(score))
+
+    def _score_one(self, row, future):
+        try:
+            score = float(self.score_fn(pd.DataFrame([row]))[0])
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(score)
@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+
+from backend.core.database import engine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[1] / "migrations"
+
+# Session-level, so it is held until the upgrade has committed
+LOCK_KEY = "hashtext('alembic_upgrade')"
+
+
+def alembic_config(connection=None):
+    # No ini file: alembic.ini is for the CLI, and loading it here would
+    # replace the application's logging configuration
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+@contextmanager
+def migration_lock(conn):
+    """
+    On Postgres, hold an advisory lock on `conn` for the block, so API
+    workers starting together (and `alembic upgrade`) migrate one at a time;
+    the others then find the schema already at head. `conn` must not be in
+    a transaction. A no-op on other databases.
+    """
+    if conn.dialect.name != "postgresql":
+        yield
+        return
+    conn.execute(text(f"SELECT pg_advisory_lock({LOCK_KEY})"))
+    conn.commit()
+    try:
+        yield
+    finally:
+        if conn.in_transaction():
+            conn.rollback()
+        conn.execute(text(f"SELECT pg_advisory_unlock({LOCK_KEY})"))
+        conn.commit()
+
+
+def upgrade_database(bind=None, revision="head"):
+    """
+    Bring the schema up to `revision` (the latest by default), in one
+    transaction. Databases created by create_all before migrations existed
+    are adopted by the baseline revision.
+    """
+    bind = engine if bind is None else bind
+    with bind.connect() as conn, migration_lock(conn):
+        with conn.begin():
+            command.upgrade(alembic_config(conn), revision)
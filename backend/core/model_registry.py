@@ -0,0 +1,143 @@
+import os
+import hashlib
+import threading
+
+import joblib
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MODEL_PATH      = os.getenv("HYBRID_MODEL_PATH", "backend/models/hybrid_calibrated_pipeline.pkl")
+LEAN_MODEL_PATH = os.getenv("LEAN_MODEL_PATH", "backend/models/hybrid_lean_model.pkl")
+
+# "calibrated" serves the trained sklearn pipeline as-is; "lean" serves the
+# inference-only export written by scripts/export_lean_model.py
+MODEL_FLAVOR = os.getenv("HYBRID_MODEL_FLAVOR", "calibrated").lower()
+
+# "r" memory-maps numpy arrays inside the artifacts read-only, so workers forked
+# after a preload share those pages instead of each holding a private copy.
+# Set MODEL_MMAP_MODE=none to load everything into process memory.
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE", "r")
+if MODEL_MMAP_MODE.lower() in ("", "none", "off"):
+    MODEL_MMAP_MODE = None
+
+
+class ModelRegistry:
+    """
+    Process-wide store of heavy artifacts (model, fuzzy surface, …).
+
+    Each entry is registered as a zero-argument loader and is only loaded on
+    first get(). Loading is serialized per entry, so concurrent first callers
+    wait for a single load instead of racing to build their own copy.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._objects = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._objects.pop(name, None)
+
+    def get(self, name):
+        try:
+            return self._objects[name]
+        except KeyError:
+            pass
+
+        if name not in self._loaders:
+            raise KeyError(f"No artifact registered under '{name}'")
+
+        with self._locks[name]:
+            if name not in self._objects:
+                self._objects[name] = self._loaders[name]()
+            return self._objects[name]
+
+    def is_loaded(self, name):
+        return name in self._objects
+
+    def preload(self, *names):
+        """Load artifacts eagerly, e.g. in a gunicorn master before workers fork."""
+        for name in names or list(self._loaders):
+            self.get(name)
+
+    def reset(self, name=None):
+        """Drop loaded artifacts so the next get() reloads them."""
+        with self._lock:
+            if name is None:
+                self._objects.clear()
+            else:
+                self._objects.pop(name, None)
+
+
+def _model_path():
+    return LEAN_MODEL_PATH if MODEL_FLAVOR == "lean" else MODEL_PATH
+
+
+def _load_hybrid_model():
+    return joblib.load(_model_path(), mmap_mode=MODEL_MMAP_MODE)
+
+
+def _load_model_version():
+    model = get_model()
+    digest = hashlib.sha256()
+    with open(_model_path(), "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return model, digest.hexdigest()[:16]
+
+
+def _load_fuzzy_surface():
+    from simulation.fuzzy_surface import load_fuzzy_surface
+    return load_fuzzy_surface(mmap_mode=MODEL_MMAP_MODE)
+
+
+def _load_static_features():
+    from backend.core.lean_model import LeanHybridModel, StaticFeatureCache
+    from simulation.fetcher import region_static_table
+
+    model = get_model()
+    if not isinstance(model, LeanHybridModel):
+        return None
+    return StaticFeatureCache(model, region_static_table())
+
+
+registry = ModelRegistry()
+registry.register("hybrid", _load_hybrid_model)
+registry.register("fuzzy_surface", _load_fuzzy_surface)
+registry.register("static_features", _load_static_features)
+registry.register("model_version", _load_model_version)
+
+
+def get_model():
+    return registry.get("hybrid")
+
+
+def get_fuzzy_surface():
+    return registry.get("fuzzy_surface")
+
+
+def get_static_features():
+    """
+    Per-region static feature cache for the loaded model, or None when the
+    calibrated sklearn pipeline is served (it cannot transform column subsets).
+    Rebuilt whenever the model itself has been reloaded.
+    """
+    cache = registry.get("static_features")
+    if cache is not None and cache.model is not get_model():
+        registry.reset("static_features")
+        cache = registry.get("static_features")
+    return cache
+
+
+def get_model_version():
+    """Content hash of the served model artifact, e.g. to key cached scores."""
+    model, version = registry.get("model_version")
+    if model is not get_model():
+        registry.reset("model_version")
+        model, version = registry.get("model_version")
+    return version
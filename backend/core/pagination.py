@@ -0,0 +1,135 @@
+import os
+import csv
+import io
+import json
+import base64
+from datetime import date
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import tuple_
+
+from backend.core.database import SessionLocal
+from backend.db_models.forecast import Forecast
+
+load_dotenv()
+
+LISTING_PAGE_SIZE     = int(os.getenv("LISTING_PAGE_SIZE", "1000"))
+LISTING_MAX_PAGE_SIZE = int(os.getenv("LISTING_MAX_PAGE_SIZE", "10000"))
+STREAM_CHUNK_ROWS     = int(os.getenv("STREAM_CHUNK_ROWS", "1000"))
+
+FORMATS = ("json", "ndjson", "csv")
+
+# Keyset order for forecast listings; (forecast_date, region, id) is unique
+# and stable, so a page boundary never skips or repeats a row
+FORECAST_KEY = (Forecast.forecast_date, Forecast.region, Forecast.id)
+
+
+def encode_cursor(forecast_date, region, row_id):
+    raw = f"{forecast_date.isoformat()}|{row_id}|{region}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(forecast_date, region, id) from an X-Next-Cursor value; ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        day, row_id, region = raw.split("|", 2)
+        return date.fromisoformat(day), region, int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def keyset_page(query, cursor=None, descending=False):
+    """
+    Order `query` by FORECAST_KEY and start it after `cursor`. The query must
+    select Forecast.id as its last column so the next cursor can be built.
+    """
+    key = tuple_(*FORECAST_KEY)
+    if cursor:
+        after = tuple_(*decode_cursor(cursor))
+        query = query.where(key < after if descending else key > after)
+    order = [c.desc() for c in FORECAST_KEY] if descending else list(FORECAST_KEY)
+    return query.order_by(*order)
+
+
+def json_page(db, query, limit, to_dict):
+    """
+    One page of at most `limit` rows as a JSON list, with an X-Next-Cursor
+    header when more rows follow. Reads limit + 1 rows to find out.
+    """
+    rows = db.execute(query.limit(limit + 1)).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        headers["X-Next-Cursor"] = encode_cursor(last["forecast_date"], last["region"], last["id"])
+    return JSONResponse([to_dict(row) for row in rows], headers=headers)
+
+
+def _stream_rows(query, to_dict, fmt, fields):
+    # Own session: the response body is produced after the request's
+    # dependencies may already have been closed
+    db = SessionLocal()
+    try:
+        # Server-side cursor: rows are fetched STREAM_CHUNK_ROWS at a time
+        result = db.execute(query.execution_options(yield_per=STREAM_CHUNK_ROWS))
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        started = False
+        if fmt == "csv":
+            writer.writeheader()
+        for chunk in result.partitions():
+            for row in chunk:
+                if fmt == "ndjson":
+                    buffer.write(json.dumps(to_dict(row), separators=(",", ":")))
+                    buffer.write("\n")
+                elif fmt == "json":
+                    buffer.write("," if started else "[")
+                    buffer.write(json.dumps(to_dict(row), separators=(",", ":")))
+                    started = True
+                else:
+                    writer.writerow(to_dict(row))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if fmt == "json":
+            buffer.write("]" if started else "[]")
+        if buffer.tell():  # closing bracket, or the CSV header of an empty result
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def forecast_listing(db, query, to_dict, fields, cursor=None, limit=None, fmt="json",
+                     descending=False, filename="forecasts"):
+    """
+    Response for a bulk forecast listing. `query` selects the row columns
+    plus Forecast.id last; `to_dict` turns a row into the output record
+    with the keys in `fields`.
+
+    json:         with `limit` or `cursor`, one page (`limit`, default
+                  LISTING_PAGE_SIZE) and an X-Next-Cursor header to pass back
+                  as `cursor` for the next. Without either, every row, as
+                  before paging existed, streamed as one JSON array.
+    ndjson / csv: every row after `cursor` (at most `limit` if given),
+                  streamed from a server-side cursor.
+    """
+    try:
+        query = keyset_page(query, cursor, descending)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if fmt == "json" and (limit or cursor):
+        return json_page(db, query, limit or LISTING_PAGE_SIZE, to_dict)
+    if limit:
+        query = query.limit(limit)
+    if fmt == "json":
+        return StreamingResponse(_stream_rows(query, to_dict, fmt, fields), media_type="application/json")
+    if fmt == "ndjson":
+        return StreamingResponse(_stream_rows(query, to_dict, fmt, fields), media_type="application/x-ndjson")
+    return StreamingResponse(
+        _stream_rows(query, to_dict, fmt, fields), media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+    )
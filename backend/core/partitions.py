@@ -0,0 +1,211 @@
+import os
+import re
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from backend.db_models.forecast import Forecast
+
+load_dotenv()
+
+# Optional Postgres storage mode: forecasts range-partitioned by "month" or
+# "week" of forecast_date. Partitions are created at ingest, retention drops
+# whole partitions and date-range reads only touch the partitions they need.
+# Empty (the default) keeps the plain table; SQLite always does.
+FORECAST_PARTITIONS = os.getenv("FORECAST_PARTITIONS", "").lower()
+INTERVALS = ("month", "week")
+
+TABLE = Forecast.__tablename__
+PARTITION_NAME = re.compile(rf"^{TABLE}_p\d{{4}}(_\d{{2}}|w\d{{2}})$")
+_BOUND = re.compile(r"FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+# Serializes partition DDL across processes (API workers, forecast_job,
+# cleanup) for the rest of the caller's transaction
+LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('forecasts_partitions'))"
+
+
+def partition_for(day, interval):
+    """(name, start, end) of the partition that holds `day`; `end` is exclusive."""
+    if interval == "month":
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return f"{TABLE}_p{start:%Y_%m}", start, end
+    if interval == "week":
+        start = day - timedelta(days=day.weekday())
+        year, week, _ = start.isocalendar()
+        return f"{TABLE}_p{year}w{week:02d}", start, start + timedelta(days=7)
+    raise ValueError(f"Unknown partition interval {interval!r}; expected one of {INTERVALS}")
+
+
+def partitions_between(first, last, interval):
+    """Every partition from the one holding `first` to the one holding `last`."""
+    parts = []
+    day = first
+    while day <= last:
+        part = partition_for(day, interval)
+        parts.append(part)
+        day = part[2]
+    return parts
+
+
+def create_partition_sql(name, start, end):
+    return (f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+
+
+def is_partitioned(conn):
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND pg_table_is_visible(c.oid))"
+    ), {"table": TABLE}).scalar())
+
+
+def list_partitions(conn):
+    """[(name, start, end)] of the forecasts partitions, oldest first."""
+    rows = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table AND pg_table_is_visible(p.oid)"
+    ), {"table": TABLE}).all()
+    parts = []
+    for name, bound in rows:
+        match = _BOUND.search(bound or "")
+        if match:  # a DEFAULT partition has no range
+            parts.append((name, date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))))
+    return sorted(parts, key=lambda part: part[1])
+
+
+def _uncovered(conn, days):
+    existing = [(start, end) for _, start, end in list_partitions(conn)]
+    return {day for day in set(days) if not any(start <= day < end for start, end in existing)}
+
+
+def ensure_partitions(conn, days, interval=None):
+    """
+    Create the partitions that `days` fall into, in the caller's transaction,
+    before rows for them are written. A no-op unless partitioning is enabled
+    (FORECAST_PARTITIONS) and the forecasts table is partitioned. Returns the
+    names created.
+
+    Coverage is read from the catalog on every call rather than cached: any
+    other process may have dropped a partition since (retention cleanup), and
+    a failed insert would abort the caller's whole transaction. The DDL lock
+    is only taken when a partition is missing, so writes into existing
+    partitions never wait on each other.
+    """
+    interval = interval or FORECAST_PARTITIONS
+    if not interval or conn.dialect.name != "postgresql" or not is_partitioned(conn):
+        return []
+
+    days = _uncovered(conn, days)
+    if not days:
+        return []
+    conn.execute(text(LOCK_SQL))
+    days = _uncovered(conn, days)  # another process may have created them meanwhile
+
+    created = []
+    for name, start, end in sorted({partition_for(day, interval) for day in days}, key=lambda part: part[1]):
+        conn.execute(text(create_partition_sql(name, start, end)))
+        created.append(name)
+    if created:
+        print(f"🗂️  Created forecast partition(s): {', '.join(created)}")
+    return created
+
+
+def drop_partitions_before(conn, cutoff):
+    """
+    Drop every partition whose rows are all older than `cutoff`: a catalog
+    change instead of deleting and vacuuming row by row. Rows older than
+    `cutoff` in the partition that straddles it are left to the caller's
+    DELETE. Returns the names dropped; [] for a plain table.
+    """
+    if not is_partitioned(conn):
+        return []
+    conn.execute(text(LOCK_SQL))
+    dropped = []
+    for name, start, end in list_partitions(conn):
+        if end <= cutoff:
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+def partition_table(conn, interval):
+    """
+    Rebuild a plain Postgres forecasts table as one range-partitioned by
+    forecast_date, keeping every row, id and index. Runs in the caller's
+    transaction and locks the table until it commits. Returns the partitions
+    created.
+    """
+    partition_for(date.today(), interval)  # validates the interval
+    if conn.dialect.name != "postgresql":
+        raise RuntimeError("Forecast partitioning needs PostgreSQL")
+    if is_partitioned(conn):
+        return []
+
+    old = f"{TABLE}_unpartitioned"
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": TABLE}).scalar()
+    primary_key = conn.execute(text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:table AS regclass) AND contype = 'p'"
+    ), {"table": TABLE}).scalar()
+
+    # Index and sequence names are schema-wide: move the old ones aside
+    conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {old}"))
+    conn.execute(text(f"ALTER TABLE {old} DROP CONSTRAINT IF EXISTS uq_forecasts_region_date"))
+    for index in ("uq_forecasts_region_date", "ix_forecasts_id", "ix_forecasts_date_region"):
+        conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    if primary_key:
+        conn.execute(text(f"ALTER TABLE {old} RENAME CONSTRAINT {primary_key} TO {old}_pkey"))
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {old}_id_seq"))
+
+    # The partition key has to be part of every unique constraint
+    conn.execute(text(
+        f"CREATE TABLE {TABLE} ("
+        f"id serial NOT NULL, region varchar NOT NULL, forecast_date date NOT NULL, "
+        f"prob_hybrid double precision NOT NULL, alert integer NOT NULL, "
+        f"CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, forecast_date), "
+        f"CONSTRAINT uq_forecasts_region_date UNIQUE (region, forecast_date)"
+        f") PARTITION BY RANGE (forecast_date)"
+    ))
+    conn.execute(text(f"CREATE INDEX ix_forecasts_id ON {TABLE} (id)"))
+    conn.execute(text(f"CREATE INDEX ix_forecasts_date_region ON {TABLE} (forecast_date, region)"))
+
+    first, last = conn.execute(text(f"SELECT min(forecast_date), max(forecast_date) FROM {old}")).one()
+    created = []
+    if first is not None:
+        for name, start, end in partitions_between(first, last, interval):
+            conn.execute(text(create_partition_sql(name, start, end)))
+            created.append(name)
+
+    cols = "id, region, forecast_date, prob_hybrid, alert"
+    conn.execute(text(f"INSERT INTO {TABLE} ({cols}) SELECT {cols} FROM {old}"))
+    conn.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(max(id), 0) + 1, false) FROM {TABLE}"
+    ))
+    conn.execute(text(f"DROP TABLE {old}"))
+    return created
+
+
+def prepare_storage(bind, interval=FORECAST_PARTITIONS):
+    """
+    Startup check for FORECAST_PARTITIONS: an empty plain forecasts table is
+    converted on the spot; one with rows is left for
+    scripts/partition_forecasts.py, which copies them under a lock.
+    """
+    if not interval:
+        return
+    if bind.dialect.name != "postgresql":
+        print(f"ℹ️  FORECAST_PARTITIONS is ignored on {bind.dialect.name}; forecasts stay a plain table.")
+        return
+    with bind.begin() as conn:
+        if is_partitioned(conn):
+            return
+        if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {TABLE})")).scalar():
+            print("⚠️  forecasts is not partitioned yet; run `python -m scripts.partition_forecasts`.")
+            return
+        partition_table(conn, interval)
+    print(f"🗂️  forecasts is now partitioned by {interval}")
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import threading
+
+from dotenv import load_dotenv
+from sqlalchemy import case, func, select
+
+from backend.db_models.forecast import Forecast
+from config.regions_config import REGIONS
+
+load_dotenv()
+
+# Writes made through this process (uploads, the in-process ingest worker,
+# admin cleanup) invalidate the snapshot at once; the TTL bounds how long
+# writes from other processes (another API worker, forecast_job --sink db)
+# can go unseen.
+SNAPSHOT_TTL = float(os.getenv("SNAPSHOT_TTL", "30"))
+
+
+def risk_level(prob):
+    return "High" if prob > 0.8 else "Moderate" if prob > 0.5 else "Low"
+
+
+def risk_level_expr(prob=Forecast.prob_hybrid):
+    """risk_level() as a SQL CASE, to label and bucket rows in the database."""
+    return case((prob > 0.8, "High"), (prob > 0.5, "Moderate"), else_="Low")
+
+
+def risk_counts(db, forecast_date):
+    """Low/Moderate/High counts for one forecast_date from a single GROUP BY CASE."""
+    level = risk_level_expr()
+    counts = {"Low": 0, "Moderate": 0, "High": 0}
+    counts.update(db.execute(
+        select(level, func.count()).where(Forecast.forecast_date == forecast_date).group_by(level)
+    ).all())
+    return counts
+
+
+def _json(value):
+    # Same encoding as FastAPI's JSONResponse
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class LatestSnapshot:
+    """
+    The forecasts of the latest forecast_date with everything the dashboard
+    endpoints return precomputed: risk labels, per-level counts and region
+    coordinates, already serialized to JSON bytes.
+    """
+
+    def __init__(self, forecast_date, rows, version, loaded_at):
+        self.forecast_date = forecast_date
+        self.version = version
+        self.loaded_at = loaded_at
+
+        latest, status = [], []
+        summary = {"Low": 0, "Moderate": 0, "High": 0}
+        for region, day, prob, alert, level in rows:
+            summary[level] += 1
+            info = REGIONS.get(region, {})
+            latest.append({"region": region, "forecast_date": day.isoformat(), "prob_hybrid": prob,
+                           "alert": alert, "risk_level": level})
+            status.append({"region": region, "risk_score": prob, "alert_level": level,
+                           "lat": info.get("lat"), "lon": info.get("lon")})
+
+        self.latest = latest
+        self.status = status
+        self.summary = summary
+        self.latest_json = _json(latest)
+        self.status_json = _json(status)
+        self.summary_json = _json(summary)
+
+    @property
+    def empty(self):
+        return self.forecast_date is None
+
+
+def load_snapshot(db, version=0, loaded_at=0.0):
+    """Read the latest forecast set, risk labels included, in one query."""
+    latest_date = select(func.max(Forecast.forecast_date)).scalar_subquery()
+    rows = db.execute(
+        select(Forecast.region, Forecast.forecast_date, Forecast.prob_hybrid, Forecast.alert,
+               risk_level_expr())
+        .where(Forecast.forecast_date == latest_date)
+        .order_by(Forecast.id)
+    ).all()
+    forecast_date = rows[0][1] if rows else None
+    return LatestSnapshot(forecast_date, rows, version, loaded_at)
+
+
+class SnapshotCache:
+    """
+    Process-wide LatestSnapshot, reloaded on the next read after bump() or
+    once it is older than `ttl` seconds. Reads of a current snapshot take no
+    lock and touch no database; concurrent reloads collapse into one query.
+    """
+
+    def __init__(self, ttl=SNAPSHOT_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.version = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._version_lock = threading.Lock()
+
+    def _current(self, snapshot):
+        return (snapshot is not None and snapshot.version == self.version
+                and self.clock() - snapshot.loaded_at < self.ttl)
+
+    def get(self, db):
+        snapshot = self._snapshot
+        if self._current(snapshot):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if not self._current(snapshot):
+                # A bump during the query leaves this snapshot one version behind,
+                # so the next read reloads it
+                snapshot = load_snapshot(db, self.version, self.clock())
+                self._snapshot = snapshot
+            return snapshot
+
+    def bump(self):
+        """Mark the snapshot stale; called by every path that writes forecasts."""
+        with self._version_lock:
+            self.version += 1
+
+
+forecast_snapshot = SnapshotCache()
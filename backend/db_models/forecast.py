@@ -1,8 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, Date
+from sqlalchemy import Column, Integer, String, Float, Date, Index, UniqueConstraint
 from backend.core.database import Base
 
 class Forecast(Base):
     __tablename__ = "forecasts"
+    __table_args__ = (
+        # One row per region and day; re-runs and backfills upsert into it.
+        # Also the index for per-region reads (region = ? AND forecast_date …)
+        UniqueConstraint("region", "forecast_date", name="uq_forecasts_region_date"),
+        # Date-range reads across regions, the latest date, keyset paging
+        Index("ix_forecasts_date_region", "forecast_date", "region"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     region = Column(String, nullable=False)
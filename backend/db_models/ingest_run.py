@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, Index
+from backend.core.database import Base
+
+class IngestRun(Base):
+    """One forecast ingestion run queued on the ingest worker."""
+    __tablename__ = "ingest_runs"
+    __table_args__ = (Index("ix_ingest_runs_status_queued", "status", "queued_at"),)
+
+    id = Column(String(32), primary_key=True)  # job id returned by POST /admin/ingest
+    trigger = Column(String, nullable=False)   # manual / schedule / cli
+    status = Column(String, nullable=False)    # queued / running / succeeded / failed / skipped
+    worker = Column(String)                    # host:pid of the process that owns the job
+    options = Column(JSON, nullable=False, default=dict)
+    queued_at = Column(DateTime, nullable=False, index=True)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    duration_s = Column(Float)  # wall clock, started → finished
+
+    # Busy seconds per stage (they overlap in streaming mode)
+    fetch_s = Column(Float)
+    fuzzy_s = Column(Float)
+    model_s = Column(Float)
+    upload_s = Column(Float)
+
+    regions_fetched = Column(Integer)
+    rows_scored = Column(Integer)
+    rows_uploaded = Column(Integer)
+    failed_regions = Column(JSON)
+    error = Column(Text)
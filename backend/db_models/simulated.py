@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, Date
+from sqlalchemy import Column, Integer, String, Float, Date, Index
 from backend.core.database import Base
 
 class SimulatedHistory(Base):
     __tablename__ = "simulated_history"
+    __table_args__ = (Index("ix_simulated_history_region_date", "region", "sim_date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     region = Column(String, nullable=False)
@@ -1,20 +1,41 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 
-from backend.core.database import Base, engine
+from backend.core.database import engine
+from backend.core.model_registry import registry
+from backend.core.migrations import upgrade_database
+from backend.core.partitions import prepare_storage
+from backend.core.ingest_worker import INGEST_SCHEDULE, ingest_worker
 
 # Import DB models so SQLAlchemy sees them
 from backend.db_models.user import User
 from backend.db_models.subscription import Subscription
 from backend.db_models.forecast import Forecast
+from backend.db_models.ingest_run import IngestRun
 
 # Import all routers
 from backend.api import auth, subscriptions, forecast, predict
 from backend.api import charts, regions, admin, simulated
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+# Create or upgrade the schema (backend/migrations); serialized across
+# workers on Postgres
+upgrade_database(engine)
+
+# Optional monthly/weekly partitioned forecasts (FORECAST_PARTITIONS, Postgres)
+prepare_storage(engine)
+
+# Load model artifacts up front when asked to (e.g. under gunicorn --preload),
+# so forked workers share them copy-on-write instead of loading on first use
+if os.getenv("PRELOAD_MODELS", "").lower() in ("1", "true", "yes"):
+    registry.preload()
+
+# Scheduled ingestion runs on a worker thread of this process. Under several
+# API workers each fires the schedule, but only one of the runs goes ahead;
+# the others are recorded as skipped (see IngestWorker).
+if INGEST_SCHEDULE:
+    ingest_worker.start()
 
 # Create FastAPI app
 app = FastAPI(
@@ -30,6 +51,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # lets browser clients page listings
 )
 
 # Include all routers
@@ -0,0 +1,57 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from backend.core.database import Base, engine
+from backend.core.migrations import migration_lock
+from backend.core.partitions import PARTITION_NAME
+
+# Import DB models so autogenerate sees every table
+from backend.db_models.user import User
+from backend.db_models.subscription import Subscription
+from backend.db_models.forecast import Forecast
+from backend.db_models.ingest_run import IngestRun
+from backend.db_models.simulated import SimulatedHistory
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names):
+    # Forecast partitions (FORECAST_PARTITIONS) are managed at runtime, not by migrations
+    return not (type_ == "table" and PARTITION_NAME.match(name))
+
+
+def run_migrations_offline():
+    """Emit the SQL instead of running it (alembic upgrade head --sql)."""
+    context.configure(url=engine.url, target_metadata=target_metadata, include_name=include_name,
+                      literal_binds=True,
+                      render_as_batch=engine.dialect.name == "sqlite")
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # upgrade_database() hands in its own connection; the CLI uses DATABASE_URL
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+    with engine.connect() as connection, migration_lock(connection):
+        _run(connection)
+
+
+def _run(connection):
+    context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name,
+                      render_as_batch=connection.dialect.name == "sqlite")
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,95 @@
+"""Baseline: the schema Base.metadata.create_all used to build
+
+Databases created before migrations already have these tables, so each is
+created only when missing; such databases are simply stamped at this
+revision. A forecasts table older than its (region, forecast_date) unique
+index is deduplicated and given the index by revision 0003.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _missing(table):
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade():
+    if _missing("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("is_admin", sa.Boolean(), nullable=True),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if _missing("subscriptions"):
+        op.create_table(
+            "subscriptions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("region", sa.String(), nullable=False),
+        )
+        op.create_index("ix_subscriptions_id", "subscriptions", ["id"])
+
+    if _missing("forecasts"):
+        op.create_table(
+            "forecasts",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("region", sa.String(), nullable=False),
+            sa.Column("forecast_date", sa.Date(), nullable=False),
+            sa.Column("prob_hybrid", sa.Float(), nullable=False),
+            sa.Column("alert", sa.Integer(), nullable=False),
+            sa.UniqueConstraint("region", "forecast_date", name="uq_forecasts_region_date"),
+        )
+        op.create_index("ix_forecasts_id", "forecasts", ["id"])
+
+    if _missing("simulated_history"):
+        op.create_table(
+            "simulated_history",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("region", sa.String(), nullable=False),
+            sa.Column("sim_date", sa.Date(), nullable=False),
+            sa.Column("risk_score", sa.Float(), nullable=False),
+            sa.Column("flood_status", sa.Integer(), nullable=False),
+        )
+        op.create_index("ix_simulated_history_id", "simulated_history", ["id"])
+
+    if _missing("ingest_runs"):
+        op.create_table(
+            "ingest_runs",
+            sa.Column("id", sa.String(32), primary_key=True),
+            sa.Column("trigger", sa.String(), nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("options", sa.JSON(), nullable=False),
+            sa.Column("queued_at", sa.DateTime(), nullable=False),
+            sa.Column("started_at", sa.DateTime()),
+            sa.Column("finished_at", sa.DateTime()),
+            sa.Column("duration_s", sa.Float()),
+            sa.Column("fetch_s", sa.Float()),
+            sa.Column("fuzzy_s", sa.Float()),
+            sa.Column("model_s", sa.Float()),
+            sa.Column("upload_s", sa.Float()),
+            sa.Column("regions_fetched", sa.Integer()),
+            sa.Column("rows_scored", sa.Integer()),
+            sa.Column("rows_uploaded", sa.Integer()),
+            sa.Column("failed_regions", sa.JSON()),
+            sa.Column("error", sa.Text()),
+        )
+        op.create_index("ix_ingest_runs_queued_at", "ingest_runs", ["queued_at"])
+
+
+def downgrade():
+    for table in ("ingest_runs", "simulated_history", "forecasts", "subscriptions", "users"):
+        op.drop_table(table)
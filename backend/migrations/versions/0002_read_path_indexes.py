@@ -0,0 +1,39 @@
+"""Indexes for the main read paths
+
+forecasts         (forecast_date, region): date-range reads across regions,
+                  max(forecast_date) for the latest set, keyset paging.
+                  Per-region reads use the (region, forecast_date) unique index.
+simulated_history (region, sim_date):      /simulated/history
+subscriptions     (user_id, region):       a user's subscriptions
+ingest_runs       (status, queued_at):     /admin/jobs?status=
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_forecasts_date_region", "forecasts", ["forecast_date", "region"]),
+    ("ix_simulated_history_region_date", "simulated_history", ["region", "sim_date"]),
+    ("ix_subscriptions_user_region", "subscriptions", ["user_id", "region"]),
+    ("ix_ingest_runs_status_queued", "ingest_runs", ["status", "queued_at"]),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if name not in {ix["name"] for ix in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,46 @@
+"""Deduplicate forecasts and enforce one row per (region, forecast_date)
+
+Forecast uploads upsert ON CONFLICT (region, forecast_date), which needs a
+unique index on those columns. A forecasts table created before uploads
+became upserts may lack it and hold duplicates; keep the newest row (highest
+id) of each key and add the index, so the write path works on every
+database that reaches head.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+KEY = ["region", "forecast_date"]
+
+
+def _has_unique_key(inspector):
+    uniques = [c["column_names"] for c in inspector.get_unique_constraints("forecasts")]
+    uniques += [ix["column_names"] for ix in inspector.get_indexes("forecasts") if ix["unique"]]
+    return any(sorted(cols) == sorted(KEY) for cols in uniques)
+
+
+def upgrade():
+    if _has_unique_key(sa.inspect(op.get_bind())):
+        return
+    deleted = op.get_bind().execute(sa.text(
+        "DELETE FROM forecasts WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM forecasts "
+        "GROUP BY region, forecast_date) AS newest)"
+    )).rowcount
+    if deleted:
+        print(f"🧹 Deleted {deleted} duplicate forecast row(s)")
+    op.create_index("uq_forecasts_region_date", "forecasts", KEY, unique=True)
+
+
+def downgrade():
+    # Deleted duplicates cannot be restored, and the unique key predates
+    # migrations on most databases: nothing to undo
+    pass
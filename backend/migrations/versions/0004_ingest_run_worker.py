@@ -0,0 +1,27 @@
+"""Record which worker process owns each ingest run
+
+A worker starting up marks runs left queued/running by a dead process on
+its host as failed; it needs to know whose they are.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("ingest_runs")}
+    if "worker" not in columns:
+        op.add_column("ingest_runs", sa.Column("worker", sa.String(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("ingest_runs") as batch:
+        batch.drop_column("worker")
@@ -1,5 +1,14 @@
-from pydantic import BaseModel
+import os
+from typing import Annotated
+from pydantic import BaseModel, Field, model_validator
 from datetime import date
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Rows per /predict/batch request. Enforced while the body is validated, so an
+# oversized batch is rejected before its rows are built
+PREDICT_MAX_BATCH = int(os.getenv("PREDICT_MAX_BATCH", "1000"))
 
 # Input from forecast_job.py
 class ForecastIn(BaseModel):
@@ -19,6 +28,14 @@ class ForecastOut(BaseModel):
     class Config:
         from_attributes = True
 
+# Latest stored forecast day per region (GET /forecast/watermarks)
+class ForecastWatermark(BaseModel):
+    region: str
+    last_date: date
+    prob_hybrid: float
+    alert: int
+    risk_level: str
+
 class PredictionRequest(BaseModel):
     Precipitation: float
     Elevation_m: float
@@ -33,12 +50,55 @@ class PredictionRequest(BaseModel):
     month_cos: float
     Precipitation_norm: float
     River_Level_norm: float
-    Fuzzy_Risk: float
+    Fuzzy_Risk: float | None = None  # looked up from the fuzzy surface when omitted
 
 class PredictionResponse(BaseModel):
     risk_score: float
     alert_level: str
 
+# Columnar form of PredictionRequest: one list per feature, all the same length
+Numbers = Annotated[list[float], Field(max_length=PREDICT_MAX_BATCH)]
+Labels = Annotated[list[str], Field(max_length=PREDICT_MAX_BATCH)]
+
+class PredictionColumns(BaseModel):
+    Precipitation: Numbers
+    Elevation_m: Numbers
+    Slope_deg: Numbers
+    Drainage_Density: Numbers
+    Dist_to_River_km: Numbers
+    Soil_Type: Labels
+    Land_Cover: Labels
+    TWI: Numbers
+    NDVI: Numbers
+    month_sin: Numbers
+    month_cos: Numbers
+    Precipitation_norm: Numbers
+    River_Level_norm: Numbers
+    Fuzzy_Risk: Annotated[list[float | None], Field(max_length=PREDICT_MAX_BATCH)] | None = None
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        lengths = {len(v) for v in self.model_dump(exclude_none=True).values()}
+        if len(lengths) > 1:
+            raise ValueError("All feature columns must have the same length")
+        return self
+
+# Exactly one of `rows` or `columns` must be given
+class PredictionBatchRequest(BaseModel):
+    rows: Annotated[list[PredictionRequest], Field(max_length=PREDICT_MAX_BATCH)] | None = None
+    columns: PredictionColumns | None = None
+
+    @model_validator(mode="after")
+    def check_one_payload(self):
+        if (self.rows is None) == (self.columns is None):
+            raise ValueError("Provide either 'rows' or 'columns'")
+        return self
+
+# Results are in input order
+class PredictionBatchResponse(BaseModel):
+    risk_scores: list[float]
+    alert_levels: list[str]
+
 class ForecastResponse(BaseModel):
     region: str
     risk_level: str
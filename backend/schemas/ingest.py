@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class IngestRunOut(BaseModel):
+    id: str
+    trigger: str
+    status: str
+    worker: str | None = None
+    options: dict
+    queued_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    duration_s: float | None = None
+    fetch_s: float | None = None
+    fuzzy_s: float | None = None
+    model_s: float | None = None
+    upload_s: float | None = None
+    regions_fetched: int | None = None
+    rows_scored: int | None = None
+    rows_uploaded: int | None = None
+    failed_regions: list[str] | None = None
+    error: str | None = None
+
+    class Config:
+        from_attributes = True
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from sklearn.preprocessing import MinMaxScaler
+from backend.core.model_registry import get_fuzzy_surface
 
 RAW_FILE   = "data/raw/raw_data_with_flood_status.csv"
 CLEAN_DIR  = Path("data/cleaned")
@@ -33,10 +34,18 @@ def impute_and_normalize(df):
     df[[f"{c}_norm" for c in num_cols]] = scaler.fit_transform(df[num_cols])
     return df
 
+def add_fuzzy_risk(df):
+    # Same compiled surface the forecast job and /predict read from
+    df["Fuzzy_Risk"] = get_fuzzy_surface().evaluate(
+        df["Precipitation_norm"].to_numpy(), df["River_Level_norm"].to_numpy()
+    )
+    return df
+
 def main():
     df = load_raw()
     df = inject_missing(df)
     df = impute_and_normalize(df)
+    df = add_fuzzy_risk(df)
     df.to_csv(OUTPUT_CSV, index=False)
     print(f"✅ Cleaned data → {OUTPUT_CSV}")
 
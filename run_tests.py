@@ -16,6 +16,9 @@ def run_tests():
     print("\n🧠 Running Model Prediction Test...")
     subprocess.run(["pytest", "tests/test_model.py"])
 
+    print("\n🌀 Running Fuzzy Engine Parity Test...")
+    subprocess.run(["pytest", "tests/test_fuzzy_engine.py"])
+
     print("\n🔁 Running Forecast Simulation Job Test...")
     subprocess.run(["pytest", "tests/test_forecast_job.py"])
 
@@ -0,0 +1,119 @@
+# Offline load test of the forecast job's fetch → fuzzy → model → upload
+# path against a fake or recorded provider, at N× the configured regions.
+#
+#   python -m scripts.bench_forecast_pipeline --scale 10 [--transport replay] [--latency 0.05]
+#       [--error-rate 0.02] [--http] [--output runs/x10.json] [--compare runs/x10_before.json]
+#
+# Results are upserted into a throwaway SQLite database through
+# forecast_store, so the bulk write is part of the measurement. With --http
+# the provider sits behind a local HTTP stand-in and the real requests
+# client is used. The run summary is printed as JSON; `digest` identifies
+# the scored output, so two runs over the same cassette can be compared.
+
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+
+import requests
+from sqlalchemy import create_engine
+
+import simulation.fetcher as fetcher
+from backend.core.database import Base
+from backend.core.forecast_store import write_forecasts
+from backend.db_models.forecast import Forecast
+from simulation.forecast_job import score_records
+from simulation.quota import QuotaScheduler
+from simulation.replay import OWM_CASSETTE, ProviderServer, scaled_regions, transport_session
+from simulation.run_stats import RunStats
+
+
+def digest(records):
+    rows = sorted((r["region"], r["forecast_date"], round(r["prob_hybrid"], 9), r["alert"]) for r in records)
+    return hashlib.sha256(json.dumps(rows).encode()).hexdigest()[:16]
+
+
+def main(scale=10, transport="fake", cassette=OWM_CASSETTE, latency=0.0, error_rate=0.0, workers=fetcher.FETCH_WORKERS,
+         days=3, http=False):
+    regions = scaled_regions(scale)
+    provider = transport_session(transport, requests.Session(), cassette=cassette, latency=latency,
+                                 error_rate=error_rate)
+    server = None
+    if http:
+        server = ProviderServer(provider).start()
+        fetcher.OWM_FORECAST_URL = server.url  # the fetcher reads it per request
+        session = fetcher.make_session(workers, transport="live")
+    else:
+        session = provider
+
+    stats = RunStats()
+    started = time.perf_counter()
+    try:
+        with stats.stage("fetch"):
+            df_raw, failed = fetcher.fetch_forecast("bench", days=days, workers=workers, session=session,
+                                                    quota=QuotaScheduler.unlimited(), cache=False,
+                                                    region_table=regions)
+        stats.failed_regions = failed
+        records = score_records(df_raw, stats) if not df_raw.empty else []
+
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+            Base.metadata.create_all(engine, tables=[Forecast.__table__])
+            with stats.stage("upload"):
+                stats.add("rows_uploaded", write_forecasts(records, engine))
+            engine.dispose()
+    finally:
+        if server is not None:
+            server.stop()
+            session.close()
+
+    wall = time.perf_counter() - started
+    summary = stats.as_dict()
+    summary.pop("failed_regions")
+    return {
+        "scale": scale,
+        "regions": len(regions),
+        "transport": transport + ("+http" if http else ""),
+        "failed": len(failed),
+        "wall_s": round(wall, 4),
+        "rows_per_s": round(len(records) / wall, 1) if wall else None,
+        **summary,
+        "digest": digest(records),
+    }
+
+
+def compare(run, baseline):
+    print(f"{'metric':<16}{'baseline':>14}{'this run':>14}{'change':>10}")
+    for key, value in run.items():
+        before = baseline.get(key)
+        if isinstance(value, (int, float)) and isinstance(before, (int, float)) and not isinstance(value, bool):
+            change = f"{(value - before) / before:+.1%}" if before else ""
+            print(f"{key:<16}{before:>14}{value:>14}{change:>10}")
+    same = run["digest"] == baseline.get("digest")
+    print("✅ Same scored output as the baseline" if same else "⚠️  Scored output differs from the baseline")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the forecast pipeline offline at N× regions.")
+    parser.add_argument("--scale", type=int, default=10, help="Copies of every configured region.")
+    parser.add_argument("--transport", choices=("fake", "replay"), default="fake")
+    parser.add_argument("--cassette", default=OWM_CASSETTE, help="Recorded responses for --transport replay.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Provider seconds per call.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of provider calls failing with 503.")
+    parser.add_argument("--workers", type=int, default=fetcher.FETCH_WORKERS)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--http", action="store_true", help="Serve the provider over a local HTTP stand-in.")
+    parser.add_argument("--output", help="Also write the run summary to this JSON file.")
+    parser.add_argument("--compare", help="A previous --output file to compare against.")
+    args = parser.parse_args()
+
+    run = main(scale=args.scale, transport=args.transport, cassette=args.cassette, latency=args.latency,
+               error_rate=args.error_rate, workers=args.workers, days=args.days, http=args.http)
+    print(json.dumps(run, indent=2))
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(run, indent=2))
+    if args.compare:
+        compare(run, json.loads(Path(args.compare).read_text()))
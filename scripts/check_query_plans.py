@@ -0,0 +1,108 @@
+# Check that the API's main read queries use indexes rather than full table
+# scans, on the database in DATABASE_URL.
+#
+#   python -m scripts.check_query_plans [--verbose]
+#
+# Runs EXPLAIN (Postgres) or EXPLAIN QUERY PLAN (SQLite) on each query and
+# exits 1 if any of them scans a whole table. On Postgres sequential scans
+# are disabled for the check, so a small table still shows whether an index
+# could serve the query.
+
+import re
+import sys
+import argparse
+from datetime import date, timedelta
+
+from sqlalchemy import func, inspect, select, text
+
+from backend.core.database import engine
+from backend.core.forecast_store import watermark_query
+from backend.core.pagination import encode_cursor, keyset_page
+from backend.core.snapshot import risk_level_expr
+from backend.db_models.forecast import Forecast
+from backend.db_models.ingest_run import IngestRun
+from backend.db_models.simulated import SimulatedHistory
+from backend.db_models.subscription import Subscription
+from backend.db_models.user import User  # noqa: F401  (Subscription.user)
+
+FULL_SCAN = {
+    "sqlite": re.compile(r"^SCAN (\w+)$"),
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+}
+
+
+def read_queries(today=None):
+    """(name, statement) for the read paths of the API and forecast_job."""
+    today = today or date.today()
+    cutoff = today - timedelta(days=30)
+    row = (Forecast.region, Forecast.forecast_date, Forecast.prob_hybrid, Forecast.alert, Forecast.id)
+    level = risk_level_expr()
+    return [
+        ("latest forecast set (snapshot)",
+         select(*row[:4], level).where(
+             Forecast.forecast_date == select(func.max(Forecast.forecast_date)).scalar_subquery())),
+        ("watermarks", watermark_query()),
+        ("GET /forecast/{region}",
+         select(*row[:4]).where(Forecast.region == "osh", Forecast.forecast_date >= cutoff)
+         .order_by(Forecast.forecast_date)),
+        ("GET /risk-summary?date=",
+         select(level, func.count()).where(Forecast.forecast_date == today).group_by(level)),
+        ("GET /historical",
+         keyset_page(select(*row).where(Forecast.forecast_date >= cutoff)).limit(1001)),
+        ("GET /historical?cursor=",
+         keyset_page(select(*row).where(Forecast.forecast_date >= cutoff),
+                     encode_cursor(today, "osh", 1)).limit(1001)),
+        ("GET /forecasts/all?start_date=&end_date=",
+         keyset_page(select(*row).where(Forecast.forecast_date.between(cutoff, today)),
+                     descending=True).limit(1001)),
+        ("GET /simulated/history",
+         select(SimulatedHistory).where(SimulatedHistory.region == "osh", SimulatedHistory.sim_date >= cutoff)
+         .order_by(SimulatedHistory.sim_date)),
+        ("GET /user/subscriptions", select(Subscription).where(Subscription.user_id == 1)),
+        ("GET /admin/jobs?status=",
+         select(IngestRun).where(IngestRun.status == "failed").order_by(IngestRun.queued_at.desc()).limit(50)),
+    ]
+
+
+def explain(conn, statement):
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [detail for *_, detail in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [line for line, in conn.execute(text(f"EXPLAIN {sql}"))]
+
+
+def main(verbose=False):
+    dialect = engine.dialect.name
+    if dialect not in FULL_SCAN:
+        print(f"❌ Query plan check supports sqlite and postgresql, not {dialect}")
+        return 2
+
+    failures = 0
+    with engine.connect() as conn:
+        # Scans of subqueries SQLite materializes (anon_1 …) are not table scans
+        tables = set(inspect(conn).get_table_names())
+        if dialect == "postgresql":
+            conn.execute(text("SET enable_seqscan = off"))
+        for name, statement in read_queries():
+            plan = explain(conn, statement)
+            found = (FULL_SCAN[dialect].search(line.strip()) for line in plan)
+            scans = sorted({m.group(1) for m in found if m and m.group(1) in tables})
+            if scans:
+                failures += 1
+                print(f"❌ {name}: full scan of {', '.join(scans)}")
+            else:
+                print(f"✅ {name}")
+            if verbose or scans:
+                for line in plan:
+                    print(f"     {line}")
+        conn.rollback()
+
+    print(f"🔎 Queries with full table scans: {failures}/{len(read_queries())}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN the main read queries and flag full table scans.")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Print every plan, not just failing ones.")
+    args = parser.parse_args()
+    sys.exit(main(verbose=args.verbose))
@@ -0,0 +1,46 @@
+# Remove duplicate (region, forecast_date) rows left by runs before forecast
+# uploads became upserts, then add the unique index that prevents new ones.
+#
+#   python -m scripts.dedupe_forecasts [--dry-run]
+#
+# Both are done by migration 0003 (backend/migrations), which keeps the newest
+# row (highest id) of each (region, forecast_date); this runs the migrations.
+# --dry-run only counts the rows it would delete.
+
+import argparse
+
+from sqlalchemy import inspect, text
+
+from backend.core.database import engine
+from backend.core.migrations import upgrade_database
+from backend.db_models.forecast import Forecast
+
+
+def count_duplicates(bind):
+    """Number of surplus rows sharing a (region, forecast_date) with another row."""
+    table = Forecast.__tablename__
+    if not inspect(bind).has_table(table):
+        return 0
+    with bind.connect() as conn:
+        return conn.execute(text(
+            f"SELECT COALESCE(SUM(n - 1), 0) FROM "
+            f"(SELECT COUNT(*) AS n FROM {table} GROUP BY region, forecast_date) AS per_key"
+        )).scalar()
+
+
+def main(dry_run=False):
+    duplicates = count_duplicates(engine)
+    print(f"🔎 {duplicates} duplicate forecast row(s) in '{Forecast.__tablename__}'")
+    if dry_run:
+        return duplicates
+
+    upgrade_database(engine)
+    print("✅ Unique index on (region, forecast_date) in place")
+    return duplicates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete duplicate forecasts and add the (region, forecast_date) unique index.")
+    parser.add_argument("--dry-run", action="store_true", help="Only count duplicates.")
+    args = parser.parse_args()
+    main(dry_run=args.dry_run)
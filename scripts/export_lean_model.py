@@ -0,0 +1,67 @@
+# Compile the calibrated hybrid pipeline into its inference-only form
+#
+#   python -m scripts.export_lean_model
+#
+# Then serve it with HYBRID_MODEL_FLAVOR=lean.
+
+import argparse
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from backend.core.lean_model import compile_pipeline
+from backend.core.model_registry import MODEL_PATH, LEAN_MODEL_PATH
+from config.regions_config import REGIONS
+
+
+def sample_rows(n=2000, seed=0):
+    """Realistic feature rows built from the region table, for the parity check."""
+    rng = np.random.default_rng(seed)
+    infos = list(REGIONS.values())
+    rows = []
+    for _ in range(n):
+        info = infos[rng.integers(len(infos))]
+        month = rng.integers(1, 13)
+        precip_norm = rng.random()
+        rows.append({
+            "Precipitation":      rng.random() * 20,
+            "Elevation_m":        info["elevation_m"],
+            "Slope_deg":          info["slope_deg"],
+            "Drainage_Density":   info["drainage_density"],
+            "Dist_to_River_km":   info["dist_to_river_km"],
+            "Soil_Type":          info["soil_type"],
+            "Land_Cover":         info["land_cover"],
+            "TWI":                info["TWI"],
+            "NDVI":               info["NDVI"],
+            "month_sin":          np.sin(2 * np.pi * month / 12),
+            "month_cos":          np.cos(2 * np.pi * month / 12),
+            "Precipitation_norm": precip_norm,
+            "River_Level_norm":   precip_norm,
+            "Fuzzy_Risk":         rng.random(),
+        })
+    return pd.DataFrame(rows)
+
+
+def main(src=MODEL_PATH, dst=LEAN_MODEL_PATH, tolerance=1e-6):
+    cal_pipe = joblib.load(src)
+    lean = compile_pipeline(cal_pipe)
+
+    X = sample_rows()
+    diff = np.abs(cal_pipe.predict_proba(X) - lean.predict_proba(X)).max()
+    print(f"🔍 Max |Δp| vs original pipeline on {len(X)} rows: {diff:.2e}")
+    if diff > tolerance:
+        raise SystemExit(f"❌ Lean model deviates by more than {tolerance}; not exporting.")
+
+    # Uncompressed, so the registry can memory-map the arrays
+    joblib.dump(lean, dst)
+    print(f"✅ Saved lean model → {dst}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the inference-only hybrid model.")
+    parser.add_argument("--src", default=MODEL_PATH)
+    parser.add_argument("--dst", default=LEAN_MODEL_PATH)
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args()
+    main(args.src, args.dst, args.tolerance)
@@ -0,0 +1,47 @@
+# Convert the forecasts table to monthly or weekly range partitions on
+# forecast_date (PostgreSQL only). Existing rows, ids and indexes are kept.
+#
+#   python -m scripts.partition_forecasts [--interval month|week] [--dry-run]
+#
+# The table is locked while its rows are copied, so run it in a quiet
+# moment. Then set FORECAST_PARTITIONS to the same interval, so ingestion
+# creates new partitions as it writes.
+
+import argparse
+
+from sqlalchemy import text
+
+from backend.core.database import engine
+from backend.core.partitions import (FORECAST_PARTITIONS, INTERVALS, TABLE, is_partitioned, partition_table,
+                                     partitions_between)
+
+
+def main(interval="month", dry_run=False):
+    if engine.dialect.name != "postgresql":
+        print(f"❌ Partitioning needs PostgreSQL; {engine.dialect.name} keeps the plain table")
+        return []
+
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            print(f"✅ '{TABLE}' is already partitioned")
+            return []
+        if dry_run:
+            first, last = conn.execute(text(f"SELECT min(forecast_date), max(forecast_date) FROM {TABLE}")).one()
+            parts = partitions_between(first, last, interval) if first else []
+            print(f"🔎 Would create {len(parts)} {interval} partition(s) for {first} … {last}")
+            return [name for name, _, _ in parts]
+        created = partition_table(conn, interval)
+
+    print(f"🗂️  '{TABLE}' partitioned by {interval}: {len(created)} partition(s) created")
+    if FORECAST_PARTITIONS != interval:
+        print(f"⚠️  Set FORECAST_PARTITIONS={interval} so ingestion creates new partitions")
+    return created
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Range-partition the forecasts table by forecast_date.")
+    parser.add_argument("--interval", choices=INTERVALS, default=FORECAST_PARTITIONS or "month",
+                        help="Partition size (default: FORECAST_PARTITIONS, else month).")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the partitions that would be created.")
+    args = parser.parse_args()
+    main(interval=args.interval, dry_run=args.dry_run)
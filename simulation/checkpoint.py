@@ -0,0 +1,172 @@
+# simulation/checkpoint.py
+
+import os
+import json
+import shutil
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+from simulation.fetcher import _rain_3h
+
+load_dotenv()
+
+CHECKPOINT_DIR          = os.getenv("CHECKPOINT_DIR", "data/checkpoints")
+CHECKPOINT_UPLOAD_BATCH = int(os.getenv("CHECKPOINT_UPLOAD_BATCH", "500"))  # rows per upload batch
+
+STAGES = ("fetch", "score", "upload", "done")
+
+
+def _atomic_write(path, write):
+    """Write through a temp file and rename, so a crash never leaves half a file."""
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _save_npz(path, **columns):
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **columns)
+    _atomic_write(path, write)
+
+
+class Checkpoint:
+    """
+    On-disk progress of one forecast_job run, so a crashed or partly failed
+    run can pick up where it stopped instead of starting over.
+
+    Everything lives under one directory:
+
+    manifest.json        spans, current stage, failed regions, uploaded batches
+    fetch/<region>.npz   each region's 3-hourly (dt, rain) columns, written
+                         as soon as the region is fetched
+    scored.npz           the scored records as columns
+                         (region, forecast_date, prob_hybrid, alert)
+
+    Files are replaced atomically. finish() drops the data files and keeps
+    the manifest, so the failed regions of the last run stay available
+    for --retry-failed.
+    """
+
+    def __init__(self, path=CHECKPOINT_DIR):
+        self.path = Path(path)
+        self.manifest_path = self.path / "manifest.json"
+        self.fetch_dir = self.path / "fetch"
+        self.scored_path = self.path / "scored.npz"
+        self.manifest = self._load_manifest()
+
+    # ─── Manifest ────────────────────────────────────────────────────────────
+    def _load_manifest(self):
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_manifest(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.manifest_path, lambda tmp: tmp.write_text(json.dumps(self.manifest, indent=2)))
+
+    def update(self, **fields):
+        self.manifest.update(fields)
+        self._save_manifest()
+
+    @property
+    def stage(self):
+        return self.manifest["stage"] if self.manifest else None
+
+    def resumable(self):
+        """True if an unfinished run is on disk."""
+        return self.manifest is not None and self.stage != "done"
+
+    def start(self, spans, **meta):
+        """Discard any previous checkpoint and record a new run over `spans`."""
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self.manifest = {
+            "created_at":       datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "stage":            "fetch",
+            "spans":            {r: [w.isoformat() if w else None, days] for r, (w, days) in spans.items()},
+            "failed_regions":   [],
+            "uploaded_batches": [],
+            **meta,
+        }
+        self._save_manifest()
+
+    @property
+    def spans(self):
+        return {
+            region: (date.fromisoformat(w) if w else None, days)
+            for region, (w, days) in (self.manifest or {}).get("spans", {}).items()
+        }
+
+    @property
+    def failed_regions(self):
+        return list((self.manifest or {}).get("failed_regions", []))
+
+    # ─── Fetch stage ─────────────────────────────────────────────────────────
+    def save_payload(self, region, payload):
+        self.fetch_dir.mkdir(parents=True, exist_ok=True)
+        entries = payload["list"]
+        _save_npz(
+            self.fetch_dir / f"{region}.npz",
+            dt=np.fromiter((e["dt"] for e in entries), dtype=np.int64, count=len(entries)),
+            rain=np.fromiter((_rain_3h(e) for e in entries), dtype=np.float64, count=len(entries)),
+        )
+
+    def fetched_regions(self):
+        if not self.fetch_dir.exists():
+            return set()
+        return {p.stem for p in self.fetch_dir.glob("*.npz")}
+
+    def load_payloads(self):
+        """Checkpointed regions as provider-shaped payloads, enough for daily_forecast_frame()."""
+        payloads = {}
+        for region in sorted(self.fetched_regions()):
+            with np.load(self.fetch_dir / f"{region}.npz") as cols:
+                payloads[region] = {"list": [
+                    {"dt": int(dt), "rain": {"3h": float(rain)}} for dt, rain in zip(cols["dt"], cols["rain"])
+                ]}
+        return payloads
+
+    # ─── Score stage ─────────────────────────────────────────────────────────
+    def save_scored(self, records):
+        _save_npz(
+            self.scored_path,
+            region=np.array([r["region"] for r in records], dtype=str),
+            forecast_date=np.array([r["forecast_date"] for r in records], dtype="datetime64[D]"),
+            prob_hybrid=np.array([r["prob_hybrid"] for r in records], dtype=np.float64),
+            alert=np.array([r["alert"] for r in records], dtype=np.int64),
+        )
+
+    def load_scored(self):
+        """The checkpointed records, or None if scoring has not completed."""
+        if not self.scored_path.exists():
+            return None
+        with np.load(self.scored_path) as cols:
+            return [
+                {"region": str(region), "forecast_date": str(day), "prob_hybrid": float(prob), "alert": int(alert)}
+                for region, day, prob, alert in zip(cols["region"], cols["forecast_date"],
+                                                    cols["prob_hybrid"], cols["alert"])
+            ]
+
+    # ─── Upload stage ────────────────────────────────────────────────────────
+    @property
+    def uploaded_batches(self):
+        return set((self.manifest or {}).get("uploaded_batches", []))
+
+    def mark_uploaded(self, index):
+        self.update(uploaded_batches=sorted(self.uploaded_batches | {index}))
+
+    def finish(self):
+        """Mark the run complete and drop its data files."""
+        shutil.rmtree(self.fetch_dir, ignore_errors=True)
+        self.scored_path.unlink(missing_ok=True)
+        self.update(stage="done")
+
+
+def upload_batches(records, size=CHECKPOINT_UPLOAD_BATCH):
+    """Split records into fixed-size batches; indices are stable across resumes."""
+    return [records[i:i + size] for i in range(0, len(records), size)]
@@ -0,0 +1,149 @@
+# simulation/disk_cache.py
+
+import time
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class DiskCache:
+    """
+    Small persistent key → object store backed by one SQLite file.
+
+    Values are pickled. Each entry has an optional expiry; get() ignores
+    expired entries unless asked for stale ones, which lets callers
+    revalidate instead of refetching. When the stored payloads exceed
+    `max_bytes`, the least recently used entries are evicted. Safe to share
+    between threads, and between processes through SQLite's own locking.
+    """
+
+    BATCH = 500  # keys per IN (…) lookup, well under SQLite's bound-variable limit
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, default_ttl=None, clock=time.time):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires REAL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def get(self, key, default=None, stale=False):
+        """Return the value stored under `key`, or `default` if missing or expired (unless `stale`)."""
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return default
+            value, expires = row
+            if not stale and expires is not None and expires <= now:
+                return default
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return pickle.loads(value)
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        now = self.clock()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now + ttl if ttl is not None else None, now),
+            )
+            self._evict()
+
+    def get_many(self, keys):
+        """{key: value} for every key in `keys` that is stored and not expired."""
+        now = self.clock()
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for i in range(0, len(keys), self.BATCH):
+                    chunk = keys[i:i + self.BATCH]
+                    marks = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        f"SELECT key, value FROM entries WHERE key IN ({marks}) AND (expires IS NULL OR expires > ?)",
+                        (*chunk, now),
+                    ).fetchall()
+                    self._conn.executemany("UPDATE entries SET accessed = ? WHERE key = ?",
+                                           [(now, k) for k, _ in rows])
+                    found.update((k, pickle.loads(v)) for k, v in rows)
+            finally:
+                self._conn.execute("COMMIT")
+        return found
+
+    def set_many(self, items, ttl=None):
+        """Store every (key, value) of `items` in one transaction."""
+        ttl = self.default_ttl if ttl is None else ttl
+        now = self.clock()
+        expires = now + ttl if ttl is not None else None
+        rows = []
+        for key, value in dict(items).items():
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append((key, blob, len(blob), expires, now))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                self._evict()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def touch(self, key, ttl=None):
+        """Extend an entry's lifetime without rewriting it, e.g. after a 304."""
+        ttl = self.default_ttl if ttl is None else ttl
+        now = self.clock()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET expires = ?, accessed = ? WHERE key = ?",
+                (now + ttl if ttl is not None else None, now, key),
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def size(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        drop = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            drop.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", drop)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
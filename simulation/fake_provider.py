@@ -0,0 +1,112 @@
+# simulation/fake_provider.py
+
+import json
+import time
+import random
+import hashlib
+import threading
+from collections import deque
+
+import requests
+
+
+class FakeResponse:
+    """The slice of requests.Response the fetcher uses."""
+
+    def __init__(self, status_code=200, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload if payload is not None else {}
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error from fake OWM provider", response=self)
+
+
+class FakeOWMSession:
+    """
+    In-process stand-in for the OpenWeatherMap 5-day/3-hour forecast
+    endpoint, usable wherever the fetcher takes a requests.Session.
+
+    Payloads are deterministic per (lat, lon). The provider can add latency,
+    fail a fraction of calls with 503, and enforce a call quota of `limit`
+    calls per sliding `window` seconds, answering 429 with Retry-After once
+    it is exceeded. Responses carry an ETag and a matching If-None-Match is
+    answered with 304. Call counts and peak concurrency are kept for assertions.
+
+    `payloads(lat, lon)` supplies the forecast bodies (synthetic ones from
+    forecast_payload() by default, recorded ones in replay mode); when it
+    returns None the provider answers 404.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, limit=None, window=60.0, seed=0, clock=time.monotonic,
+                 payloads=None):
+        self.payloads = payloads or forecast_payload
+        self.latency = latency
+        self.error_rate = error_rate
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self.calls = 0
+        self.rejected = 0
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._recent = deque()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            now = self.clock()
+            while self._recent and self._recent[0] <= now - self.window:
+                self._recent.popleft()
+            if self.limit is not None and len(self._recent) >= self.limit:
+                self.rejected += 1
+                retry_after = self._recent[0] + self.window - now
+                return FakeResponse(429, {"cod": 429, "message": "rate limited"},
+                                    {"Retry-After": f"{retry_after:.3f}"})
+            self._recent.append(now)
+            fail = self._rng.random() < self.error_rate
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if fail:
+                return FakeResponse(503, {"cod": 503, "message": "unavailable"})
+            payload = self.payloads(float(params["lat"]), float(params["lon"]))
+            if payload is None:
+                return FakeResponse(404, {"cod": "404", "message": "city not found"})
+            etag = '"' + hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16] + '"'
+            if (headers or {}).get("If-None-Match") == etag:
+                with self._lock:
+                    self.not_modified += 1
+                return FakeResponse(304, None, {"ETag": etag})
+            return FakeResponse(200, payload, {"ETag": etag})
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def close(self):
+        pass
+
+
+def forecast_payload(lat, lon, steps=40, start=None):
+    """OWM-shaped forecast: `steps` 3-hourly entries from the current UTC day, rain on some of them."""
+    seed = int(hashlib.sha256(f"{lat:.4f},{lon:.4f}".encode()).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    if start is None:
+        start = int(time.time()) // 86400 * 86400
+    entries = []
+    for k in range(steps):
+        entry = {"dt": start + k * 3 * 3600, "main": {"temp": round(rng.uniform(-5, 35), 2)}}
+        if rng.random() < 0.4:
+            entry["rain"] = {"3h": round(rng.expovariate(0.5), 2)}
+        entries.append(entry)
+    return {"cod": "200", "cnt": steps, "list": entries, "city": {"coord": {"lat": lat, "lon": lon}}}
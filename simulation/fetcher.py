@@ -1,95 +1,315 @@
 import os
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from requests.adapters import HTTPAdapter
 import numpy as np
 import pandas as pd
+from dotenv import load_dotenv
 from config.regions_config import REGIONS
+from simulation.quota import QuotaScheduler, parse_retry_after, prioritize
+from simulation.http_cache import load_response_cache
+from simulation.replay import OWM_TRANSPORT, transport_session
 
-def fetch_forecast(api_key, days=3):
-    cutoff = pd.Timestamp.now(tz='UTC') + pd.Timedelta(days=days)
-    static_map = {
-        'Elevation_m': 'elevation_m',
-        'Slope_deg': 'slope_deg',
-        'Drainage_Density': 'drainage_density',
-        'Dist_to_River_km': 'dist_to_river_km',
-        'Soil_Type': 'soil_type',
-        'Land_Cover': 'land_cover',
-        'TWI': 'TWI',
-        'NDVI': 'NDVI'
-    }
-
-    all_forecasts = []
-    failed_regions = []
+load_dotenv()
+
+# Overridable to point the fetcher at a local stand-in (python -m simulation.replay serve)
+OWM_FORECAST_URL = os.getenv("OWM_FORECAST_URL", "https://api.openweathermap.org/data/2.5/forecast")
+
+FETCH_WORKERS = int(os.getenv("OWM_FETCH_WORKERS", "8"))
+FETCH_TIMEOUT = float(os.getenv("OWM_TIMEOUT", "10"))
+FETCH_RETRIES = int(os.getenv("OWM_RETRIES", "3"))
+FETCH_BACKOFF = float(os.getenv("OWM_BACKOFF", "0.5"))  # seconds, doubled per attempt
 
-    for i, (region, info) in enumerate(REGIONS.items(), start=1):
-        print(f"[{i}/{len(REGIONS)}] Fetching forecast for {region}...", end="", flush=True)
-        lat, lon = info.get('lat'), info.get('lon')
+# Transient upstream statuses worth another attempt; anything else fails fast
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-        if lat is None or lon is None:
-            print(" SKIPPED: Missing lat/lon")
-            failed_regions.append(region)
-            continue
+# Model input column → key in REGIONS; constant per region
+STATIC_FEATURES = {
+    'Elevation_m': 'elevation_m',
+    'Slope_deg': 'slope_deg',
+    'Drainage_Density': 'drainage_density',
+    'Dist_to_River_km': 'dist_to_river_km',
+    'Soil_Type': 'soil_type',
+    'Land_Cover': 'land_cover',
+    'TWI': 'TWI',
+    'NDVI': 'NDVI'
+}
 
-        url = (
-            f"https://api.openweathermap.org/data/2.5/forecast"
-            f"?lat={lat}&lon={lon}"
-            f"&appid={api_key}&units=metric"
-        )
+def region_static_table(regions=REGIONS):
+    """Static features of every region as one DataFrame indexed by region name."""
+    return pd.DataFrame(
+        {col: [info[key] for info in regions.values()] for col, key in STATIC_FEATURES.items()},
+        index=pd.Index(list(regions), name='Region'),
+    )
 
+def make_session(pool_size=FETCH_WORKERS, transport=None):
+    """
+    Keep-alive session whose connection pool fits every fetch worker. A
+    `transport` other than "live" (default: OWM_TRANSPORT) records,
+    replays or fakes the provider instead, see simulation.replay.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return transport_session(transport or OWM_TRANSPORT, session)
+
+def _get_with_retry(session, url, params, timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF,
+                    quota=None, headers=None):
+    """
+    GET with up to `retries` extra attempts on connection errors, timeouts and
+    RETRY_STATUSES, sleeping a jittered exponential backoff in between. A 429
+    waits at least the provider's Retry-After; with a `quota` scheduler every
+    attempt takes a token and a 429 pauses all callers sharing it.
+    """
+    for attempt in range(retries + 1):
+        delay = random.uniform(0, backoff * 2 ** attempt)
+        if quota is not None:
+            quota.acquire()
         try:
-            resp = requests.get(url, timeout=10)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f" FAILED: {e}")
-            failed_regions.append(region)
-            continue
-        else:
-            print(" OK")
-
-        data = resp.json()
-        if 'list' not in data:
-            print("  → unexpected response format, skipping")
-            failed_regions.append(region)
-            continue
-
-        df3h = pd.DataFrame(data['list'])
-        df3h['Date'] = pd.to_datetime(df3h['dt'], unit='s', utc=True)
-        df3h = df3h[df3h['Date'] < cutoff]
-
-        if 'rain' in df3h.columns:
-            df3h['rain'] = df3h['rain'].apply(lambda v: v.get('3h', 0) if isinstance(v, dict) else 0)
-        else:
-            df3h = df3h.assign(rain=0)
-
-        daily = (
-            df3h.set_index('Date')
-            .resample('D')['rain']
-            .sum()
-            .rename('Precipitation')
-            .reset_index()
-        )
-        daily['Region'] = region
-
-        for dfcol, infokey in static_map.items():
-            daily[dfcol] = info[infokey]
-
-        m = daily['Date'].dt.month
-        daily['month_sin'] = np.sin(2 * np.pi * m / 12)
-        daily['month_cos'] = np.cos(2 * np.pi * m / 12)
-
-        maxp = daily['Precipitation'].max()
-        daily['Precipitation_norm'] = daily['Precipitation'] / (maxp if maxp > 0 else 1)
-        daily['River_Level_norm'] = daily['Precipitation_norm']
-
-        all_forecasts.append(daily)
+            resp = session.get(url, params=params, headers=headers, timeout=timeout)
+            if resp.status_code not in RETRY_STATUSES or attempt == retries:
+                resp.raise_for_status()
+                return resp
+            if resp.status_code == 429:
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"), default=delay)
+                if quota is not None:
+                    quota.throttle(retry_after)
+                    delay = 0  # the next acquire() waits out the pause
+                else:
+                    delay = max(delay, retry_after)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        time.sleep(delay)
+
+def _fetch_region(session, api_key, info, timeout, retries, quota=None, cache=None):
+    """
+    Return the decoded forecast payload for one region, or raise. A fresh
+    cache entry is returned without touching the network or the quota.
+    """
+    lat, lon = info.get('lat'), info.get('lon')
+    if lat is None or lon is None:
+        raise ValueError("Missing lat/lon")
+
+    params = {'lat': lat, 'lon': lon, 'appid': api_key, 'units': 'metric'}
+    entry, fresh = cache.lookup(OWM_FORECAST_URL, params) if cache is not None else (None, False)
+    if fresh:
+        return entry["payload"]
+
+    headers = cache.conditional_headers(entry) if entry is not None else None
+    resp = _get_with_retry(session, OWM_FORECAST_URL, params, timeout=timeout, retries=retries,
+                           quota=quota, headers=headers)
+    if resp.status_code == 304 and entry is not None:
+        cache.renew(OWM_FORECAST_URL, params, entry, resp.headers)
+        return entry["payload"]
+
+    data = resp.json()
+    if 'list' not in data:
+        raise ValueError("unexpected response format")
+    if cache is not None:
+        cache.save(OWM_FORECAST_URL, params, data, resp.headers)
+    return data
+
+def iter_region_responses(api_key, regions=REGIONS, workers=FETCH_WORKERS, session=None,
+                          timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES, quota=None, cache=None):
+    """
+    Fetch every region concurrently over one shared session, yielding
+    (region, payload, error) in completion order; exactly one of payload /
+    error is None. At most `workers` requests are in flight at a time, and
+    requests start in the order of `regions`.
+    """
+    own_session = session is None
+    session = session or make_session(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="owm-fetch") as pool:
+            futures = {
+                pool.submit(_fetch_region, session, api_key, info, timeout, retries, quota, cache): region
+                for region, info in regions.items()
+            }
+            for future in as_completed(futures):
+                region = futures[future]
+                try:
+                    yield region, future.result(), None
+                except Exception as e:
+                    yield region, None, e
+    finally:
+        if own_session:
+            session.close()
+
+def _rain_3h(entry):
+    rain = entry.get('rain')
+    return rain.get('3h', 0) if isinstance(rain, dict) else 0
+
+def daily_forecast_frame(payloads, cutoff, regions=REGIONS):
+    """
+    Turn provider payloads ({region: data}) into the daily model input frame
+    in one columnar pass: all 3-hourly entries are flattened into (region,
+    timestamp, rain) arrays, binned into region-days with one groupby, and
+    the static features are joined once from region_static_table().
+
+    Rows come out grouped by region in `regions` order, each region spanning
+    every day from its first to its last entry before `cutoff`.
+    """
+    names = [region for region in regions if region in payloads]
+    entries = [payloads[region]['list'] for region in names]
+    counts = np.fromiter((len(e) for e in entries), dtype=np.intp, count=len(entries))
+    if counts.sum() == 0:
+        return pd.DataFrame()
+
+    rid = np.repeat(np.arange(len(names)), counts)
+    ts = np.fromiter((e['dt'] for lst in entries for e in lst), dtype=np.int64, count=counts.sum())
+    rain = np.fromiter((_rain_3h(e) for lst in entries for e in lst), dtype=np.float64, count=counts.sum())
+
+    keep = ts * 1_000_000_000 < cutoff.value
+    rid, ts, rain = rid[keep], ts[keep], rain[keep]
+    if len(ts) == 0:
+        return pd.DataFrame()
+    day = ts // 86400
+
+    # Each region covers [first day, last day]; lay those spans out back to back
+    present = np.unique(rid)
+    first = np.full(len(names), np.iinfo(np.int64).max)
+    last = np.full(len(names), np.iinfo(np.int64).min)
+    np.minimum.at(first, rid, day)
+    np.maximum.at(last, rid, day)
+    span = last[present] - first[present] + 1
+    start = np.zeros(len(names), dtype=np.int64)
+    start[present] = np.concatenate([[0], np.cumsum(span)[:-1]])
+    n = int(span.sum())
+
+    # One groupby over row slots; pandas' compensated sum keeps totals
+    # bit-identical to the per-region resample('D').sum() this replaces
+    sums = pd.Series(rain).groupby(start[rid] + day - first[rid]).sum()
+    precip = np.zeros(n)
+    precip[sums.index.to_numpy()] = sums.to_numpy()
+    row_region = np.repeat(present, span)
+    row_day = first[row_region] + np.arange(n) - start[row_region]
+
+    maxp = np.maximum.reduceat(precip, start[present])
+    maxp = np.where(maxp > 0, maxp, 1)
+
+    dates = pd.to_datetime(row_day * 86400, unit='s', utc=True)
+    month = dates.month.to_numpy()
+    region_names = np.asarray(names, dtype=object)[row_region]
+    static = region_static_table(regions).loc[region_names].reset_index(drop=True)
+
+    daily = pd.DataFrame({'Date': dates, 'Precipitation': precip, 'Region': region_names})
+    daily = pd.concat([daily, static[list(STATIC_FEATURES)]], axis=1)
+    daily['month_sin'] = np.sin(2 * np.pi * month / 12)
+    daily['month_cos'] = np.cos(2 * np.pi * month / 12)
+    daily['Precipitation_norm'] = precip / np.repeat(maxp, span)
+    daily['River_Level_norm'] = daily['Precipitation_norm']
+    return daily
+
+def forecast_cutoff(days):
+    """Entries at or after this instant are beyond the requested horizon."""
+    return pd.Timestamp.now(tz='UTC') + pd.Timedelta(days=days)
+
+def incremental_frame(payloads, spans, regions=REGIONS):
+    """
+    Daily frame holding only the days each region is missing. `spans` maps
+    region → (watermark, days): entries are cut off `days` ahead as in
+    fetch_forecast(days=…), and days on or before the watermark (already
+    stored) are dropped; a None watermark keeps every day. Regions without
+    a span are left out.
+    """
+    groups = {}
+    for region, data in payloads.items():
+        if region in spans:
+            groups.setdefault(spans[region][1], {})[region] = data
+    frames = [daily_forecast_frame(group, forecast_cutoff(days), regions) for days, group in groups.items()]
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    daily = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    watermark = pd.to_datetime(daily['Region'].map({r: w for r, (w, _) in spans.items()}), utc=True)
+    daily = daily[watermark.isna() | (daily['Date'] > watermark)]
+    if len(frames) > 1:
+        order = {region: i for i, region in enumerate(regions)}
+        daily = daily.sort_values('Region', key=lambda r: r.map(order), kind='stable')
+    return daily.reset_index(drop=True)
+
+def stream_forecast_payloads(api_key, workers=FETCH_WORKERS, session=None, quota=None, last_dates=None,
+                             alerts=None, cache=None, failed_regions=None, regions=None, region_table=REGIONS):
+    """
+    Yield (region, payload) for each region as soon as its fetch completes.
+
+    Requests go through `quota` (a QuotaScheduler built from the OWM_* quota
+    settings by default) and start with the most urgent regions first, see
+    simulation.quota.prioritize(); if the daily allowance runs out, the
+    least urgent regions are the ones that fail. Responses are served from
+    the on-disk cache (simulation.http_cache) while fresh; pass cache=False
+    to always go to the provider.
+
+    With a recorded, replayed or fake transport (OWM_TRANSPORT) the defaults
+    are an unpaced quota and no response cache.
+
+    `regions` limits the run to those region names (all of `region_table`,
+    REGIONS by default, otherwise). Failed regions are appended to
+    `failed_regions` in table order and written to data/failed_regions.txt
+    once every region has been tried.
+    """
+    live = OWM_TRANSPORT == "live"
+    quota = quota or (QuotaScheduler() if live else QuotaScheduler.unlimited())
+    if cache is None:
+        cache = load_response_cache() if live else None
+    cache = cache or None
+    wanted = list(region_table) if regions is None else [r for r in region_table if r in set(regions)]
+    ordered = {region: region_table[region] for region in prioritize(wanted, last_dates, alerts)}
+
+    errors = {}
+    total = len(ordered)
+    responses = iter_region_responses(api_key, ordered, workers=workers, session=session, quota=quota, cache=cache)
+    try:
+        for i, (region, data, error) in enumerate(responses, start=1):
+            if error is None:
+                print(f"[{i}/{total}] {region} OK", flush=True)
+                yield region, data
+            else:
+                errors[region] = error
+                print(f"[{i}/{total}] {region} FAILED: {error}", flush=True)
+    finally:
+        responses.close()
+    print(quota.report())
+    if cache is not None:
+        print(cache.report())
+
+    # Failures listed in table order, independent of completion order
+    failed = [region for region in region_table if region in errors]
+    if failed_regions is not None:
+        failed_regions.extend(failed)
 
     # Save failures to file for review/retry
-    if failed_regions:
+    if failed:
         os.makedirs("data", exist_ok=True)
         with open("data/failed_regions.txt", "w") as f:
-            for r in failed_regions:
+            for r in failed:
                 f.write(r + "\n")
-        print(f"❌ Failed regions written to data/failed_regions.txt ({len(failed_regions)} failures)")
+        print(f"❌ Failed regions written to data/failed_regions.txt ({len(failed)} failures)")
+
+def fetch_forecast(api_key, days=3, workers=FETCH_WORKERS, session=None, quota=None, last_dates=None, alerts=None,
+                   cache=None, spans=None, region_table=REGIONS):
+    """
+    Fetch and aggregate the daily forecast of every region. With `spans`
+    (see incremental_frame()) only those regions are fetched and only
+    their missing days are returned; `days` is then ignored. See
+    stream_forecast_payloads() for quota, priority and caching behaviour.
+    """
+    cutoff = forecast_cutoff(days)
+    failed_regions = []
+    payloads = dict(stream_forecast_payloads(api_key, workers=workers, session=session, quota=quota,
+                                             last_dates=last_dates, alerts=alerts, cache=cache,
+                                             failed_regions=failed_regions, regions=spans,
+                                             region_table=region_table))
 
     # Return both the successful DataFrame and failed region list
-    df_result = pd.concat(all_forecasts, ignore_index=True) if all_forecasts else pd.DataFrame()
+    if spans is None:
+        df_result = daily_forecast_frame(payloads, cutoff, region_table)
+    else:
+        df_result = incremental_frame(payloads, spans, region_table)
     return df_result, failed_regions
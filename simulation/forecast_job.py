@@ -2,104 +2,320 @@
 
 import os
 import sys
+import time
 import argparse
 import requests
 import pandas as pd
 from datetime import date
 from dateutil import parser as date_parser      # ← alias here
 from dotenv import load_dotenv
-from joblib import load
 
-from simulation.fetcher import fetch_forecast
+from simulation.fetcher import incremental_frame, stream_forecast_payloads
+from simulation.checkpoint import Checkpoint, upload_batches
+from simulation.streaming import run_streaming
+from simulation.run_stats import RunStats
 from simulation.hybrid import run_forecast_pipeline
-from simulation.fuzzy_sim import load_fuzzy_sim
+from simulation.score_cache import load_score_cache
+from backend.core.model_registry import get_model, get_fuzzy_surface, get_model_version, get_static_features
+from config.regions_config import REGIONS
 
 # ─── Config ──────────────────────────────────────────────────────────────────
 load_dotenv()
 API_KEY     = os.getenv("OWM_API_KEY")
 BACKEND_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000")
 
-cal_pipe = load("backend/models/hybrid_calibrated_pipeline.pkl")
-sim       = load_fuzzy_sim()
 BEST_THR  = 0.71
 
+# "http" posts results to /forecast/upload; "db" writes them straight into
+# DATABASE_URL with one bulk statement (COPY on Postgres)
+FORECAST_SINK = os.getenv("FORECAST_SINK", "http").lower()
+
+FIRST_RUN_DAYS = 3  # days fetched for a region with no forecasts yet
+
 # ─── Helpers ─────────────────────────────────────────────────────────────────
-def get_last_forecast_date():
+def get_watermarks(sink=FORECAST_SINK):
+    """
+    Latest stored forecast per region: {region: {"last_date", "risk_level", …}}.
+    Read straight from DATABASE_URL with the db sink, else from
+    GET /forecast/watermarks (one small row per region).
+    """
+    if sink == "db":
+        from backend.core.forecast_store import read_watermarks
+        from backend.core.snapshot import risk_level
+        rows = [dict(row, risk_level=risk_level(row["prob_hybrid"])) for row in read_watermarks()]
+    else:
+        resp = requests.get(f"{BACKEND_URL}/forecast/watermarks", timeout=10)
+        resp.raise_for_status()
+        rows = resp.json() or []
+    watermarks = {}
+    for row in rows:
+        row = dict(row)
+        if isinstance(row["last_date"], str):
+            row["last_date"] = date_parser.parse(row["last_date"]).date()   # ← use date_parser
+        watermarks[row["region"]] = row
+    return watermarks
+
+def get_last_forecast_date(watermarks):
     """Return the most recent forecast_date in the DB, or None if no data."""
-    resp = requests.get(f"{BACKEND_URL}/forecast/latest", timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
-    if not data:
-        return None
-    dates = [
-        date_parser.parse(item["forecast_date"]).date()   # ← use date_parser
-        for item in data
-        if item.get("forecast_date")
-    ]
+    dates = [w["last_date"] for w in watermarks.values()]
     return max(dates) if dates else None
 
+def stale_spans(watermarks, today, first_run_days=FIRST_RUN_DAYS):
+    """
+    {region: (watermark, days)} for every region whose latest forecast is
+    before `today`: `days` is how far it is behind, and regions with no
+    data at all get `first_run_days`. Up-to-date regions are left out.
+    """
+    spans = {}
+    for region in REGIONS:
+        last = watermarks[region]["last_date"] if region in watermarks else None
+        if last is None:
+            spans[region] = (None, first_run_days)
+        elif (today - last).days > 0:
+            spans[region] = (last, (today - last).days)
+    return spans
+
+def build_records(df_raw, df_results):
+    return pd.DataFrame({
+        "region":        df_raw["Region"].str.lower(),
+        "forecast_date": df_raw["Date"].dt.strftime("%Y-%m-%d"),
+        "prob_hybrid":   df_results["prob_hybrid"].astype(float),
+        "alert":         df_results["alert"].astype(int),
+    }).to_dict("records")
+
+def score_records(df_raw, stats=None):
+    """Hybrid fuzzy + ML scores for a daily forecast frame, as upload records."""
+    score_cache = load_score_cache()
+    df_results = run_forecast_pipeline(
+        df_raw, get_model(), get_fuzzy_surface(), BEST_THR, static_features=get_static_features(), stats=stats,
+        score_cache=score_cache, model_version=get_model_version() if score_cache is not None else None
+    )
+    records = build_records(df_raw, df_results)
+    if stats is not None:
+        stats.add("regions_fetched", df_raw["Region"].nunique())
+        stats.add("rows_scored", len(records))
+    return records
+
+def upload_records(records):
+    resp = requests.post(
+        f"{BACKEND_URL}/forecast/upload",
+        json=records,
+        timeout=30
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+def write_records(records):
+    # Imported here: the DB engine is only needed (and DATABASE_URL only
+    # required) when this sink is used
+    from backend.core.forecast_store import write_forecasts
+    return {"message": f"✅ Wrote {write_forecasts(records)} forecasts to the database"}
+
+SINKS = {"http": upload_records, "db": write_records}
+
+def run_stream(spans, last_dates, alerts, sink=upload_records, stats=None):
+    """
+    Streaming mode: each region is scored and queued for upload as soon as
+    its fetch completes, instead of after all regions have been fetched.
+    Stage times in `stats` are busy time per stage, so they overlap.
+    """
+    stats = stats or RunStats()
+    # Load artifacts up front so the first scored batch does not wait on them
+    get_model(), get_fuzzy_surface(), get_static_features()
+
+    failed = []
+
+    def timed_payloads():
+        # Fetch time is the wall time until the last region has come back
+        start = time.perf_counter()
+        try:
+            yield from stream_forecast_payloads(API_KEY, last_dates=last_dates, alerts=alerts,
+                                                failed_regions=failed, regions=spans)
+        finally:
+            stats.add_time("fetch", time.perf_counter() - start)
+
+    def timed_sink(records):
+        with stats.stage("upload"):
+            result = sink(records)
+        stats.add("rows_uploaded", len(records))
+        return result
+
+    progress = run_streaming(timed_payloads(), None,
+                             lambda df_raw: score_records(df_raw, stats), timed_sink,
+                             total_regions=len(spans), spans=spans)
+    if progress.counts["upload_failed"]:
+        stats.error = f"{progress.counts['upload_failed']} record(s) failed to upload"
+    return progress, failed
+
+def read_failed_regions(path="data/failed_regions.txt"):
+    try:
+        with open(path) as f:
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+def run_batch(checkpoint, spans, last_dates, alerts, sink, stats):
+    """
+    Fetch → score → upload for `spans`, checkpointing after every fetched
+    region, after scoring and after every upload batch. Stages already in
+    `checkpoint` are skipped, so calling this again resumes the run.
+    """
+    records = checkpoint.load_scored()
+    if records is None:
+        fetched = checkpoint.fetched_regions()
+        pending = [region for region in spans if region not in fetched]
+        failed = []
+        if pending:
+            resumed = f" ({len(spans) - len(pending)} already checkpointed)" if fetched else ""
+            print(f"🌦️  Fetching forecast for {len(pending)} region(s){resumed}…")
+            with stats.stage("fetch"):
+                for region, data in stream_forecast_payloads(API_KEY, last_dates=last_dates, alerts=alerts,
+                                                             failed_regions=failed, regions=pending):
+                    checkpoint.save_payload(region, data)
+        checkpoint.update(stage="score", failed_regions=failed)
+        stats.failed_regions = failed
+
+        df_raw = incremental_frame(checkpoint.load_payloads(), spans)
+        if df_raw.empty:
+            print("⚠️  No forecast data returned. Exiting.")
+            checkpoint.finish()
+            return stats
+
+        print("🧠 Running hybrid ML + fuzzy pipeline…")
+        records = score_records(df_raw, stats)
+        if stats.counts["rows_cached"]:
+            print(f"♻️  {stats.counts['rows_cached']}/{len(records)} row(s) reused from the score cache")
+        checkpoint.save_scored(records)
+        checkpoint.update(stage="upload")
+    else:
+        stats.failed_regions = checkpoint.failed_regions
+        print(f"🧠 Using {len(records)} scored record(s) from the checkpoint")
+
+    batches = upload_batches(records)
+    done = checkpoint.uploaded_batches
+    skipped = f", {len(done)} already uploaded" if done else ""
+    print(f"📡 Uploading {len(records)} records to {'the database' if sink == 'db' else 'backend'} "
+          f"in {len(batches)} batch(es){skipped}…")
+    errors = []
+    result = None
+    for i, batch in enumerate(batches):
+        if i in done:
+            continue
+        try:
+            with stats.stage("upload"):
+                result = SINKS[sink](batch)
+            stats.add("rows_uploaded", len(batch))
+            checkpoint.mark_uploaded(i)
+        except Exception as e:
+            errors.append(e)
+            print(f"❌ Upload of batch {i + 1}/{len(batches)} failed:", e)
+
+    if errors:
+        stats.error = f"Upload failed for {len(errors)} of {len(batches)} batch(es): {errors[-1]}"
+        print("↩️  Run again with --resume to retry the failed batch(es).")
+    else:
+        print("✅ Upload successful:", result)
+        checkpoint.finish()
+
+    if stats.failed_regions:
+        print(f"⚠️ Forecast failed for {len(stats.failed_regions)} regions. "
+              f"Run again with --retry-failed to fetch just those.")
+    return stats
+
 # ─── Main ────────────────────────────────────────────────────────────────────
-def main(backfill_days=None):
-    today     = date.today()
-    last_date = get_last_forecast_date()
+def main(backfill_days=None, stream=False, sink=FORECAST_SINK, stats=None, resume=False, retry_failed=False,
+         checkpoint=None):
+    """
+    Run one ingestion and return its RunStats. Batch runs checkpoint their
+    progress (see simulation.checkpoint): `resume` continues an unfinished
+    run, `retry_failed` reruns only the regions the last run failed on.
+    """
+    if sink not in SINKS:
+        raise ValueError(f"Unknown sink '{sink}', expected one of {sorted(SINKS)}")
+    if stream and (resume or retry_failed):
+        raise ValueError("resume and retry_failed apply to batch runs, not to streaming")
+    stats = stats or RunStats()
+    checkpoint = checkpoint or Checkpoint()
+
+    today      = date.today()
+    watermarks = get_watermarks(sink)
+    last_date  = get_last_forecast_date(watermarks)
+    last_dates = {region: w["last_date"] for region, w in watermarks.items()}
+    alerts     = {region: w["risk_level"] for region, w in watermarks.items()}
 
-    if backfill_days is not None:
-        days_to_fetch = backfill_days
-        print(f"🔄 BACKFILL MODE: forcing fetch of last {days_to_fetch} day(s).")
+    if resume:
+        if checkpoint.resumable():
+            print(f"♻️  Resuming the run started {checkpoint.manifest['created_at']} "
+                  f"at the {checkpoint.stage} stage")
+            return run_batch(checkpoint, checkpoint.spans, last_dates, alerts, checkpoint.manifest["sink"], stats)
+        print("ℹ️  No unfinished run to resume; starting a new one.")
+
+    if retry_failed:
+        failed = checkpoint.failed_regions or read_failed_regions()
+        known, current = checkpoint.spans, stale_spans(watermarks, today)
+        spans = {region: known.get(region) or current[region]
+                 for region in failed if region in known or region in current}
+        if not spans:
+            print("✅ No failed regions left to retry. Exiting.")
+            return stats
+        print(f"🔁 Retrying {len(spans)} failed region(s): {', '.join(spans)}")
+    elif backfill_days is not None:
+        spans = {region: (None, backfill_days) for region in REGIONS}
+        print(f"🔄 BACKFILL MODE: forcing fetch of last {backfill_days} day(s).")
     else:
-        if last_date:
-            days_to_fetch = (today - last_date).days
-            if days_to_fetch <= 0:
-                print(f"✅ Already up to date (last forecast: {last_date}). Exiting.")
-                return
-        else:
-            days_to_fetch = 3
+        spans = stale_spans(watermarks, today)
+        if not spans:
+            print(f"✅ Already up to date (last forecast: {last_date}). Exiting.")
+            return stats
         print(f"🔎 Last forecast date in DB: {last_date or 'None (first run)'}")
-        print(f"→ Will fetch {days_to_fetch} new day(s) (today is {today})")
-
-    print(f"🌦️  Fetching forecast for last {days_to_fetch} day(s)…")
-    df_raw, failed = fetch_forecast(API_KEY, days=days_to_fetch)
-    if df_raw.empty:
-        print("⚠️  No forecast data returned. Exiting.")
-        return
-
-    print("🧠 Running hybrid ML + fuzzy pipeline…")
-    df_results = run_forecast_pipeline(df_raw, cal_pipe, sim, BEST_THR)
-    df_final = pd.concat([df_raw, df_results], axis=1)
-
-    records = [
-        {
-            "region":        row["Region"].lower(),
-            "forecast_date": str(row["Date"].date()),
-            "prob_hybrid":   float(row["prob_hybrid"]),
-            "alert":         int(row["alert"]),
-        }
-        for _, row in df_final.iterrows()
-    ]
-
-    print(f"📡 Uploading {len(records)} records to backend…")
-    try:
-        resp = requests.post(
-            f"{BACKEND_URL}/forecast/upload",
-            json=records,
-            timeout=30
-        )
-        resp.raise_for_status()
-        print("✅ Upload successful:", resp.json())
-    except Exception as e:
-        print("❌ Upload failed:", e)
+        print(f"→ {len(spans)}/{len(REGIONS)} region(s) behind, up to "
+              f"{max(days for _, days in spans.values())} new day(s) each (today is {today})")
+
+    if stream:
+        print(f"🌊 Streaming fetch → score → upload for {len(spans)} region(s)…")
+        progress, failed = run_stream(spans, last_dates, alerts, sink=SINKS[sink], stats=stats)
+        stats.failed_regions = failed
+        if progress.counts["scored"] == 0:
+            print("⚠️  No forecast data returned.")
+        if failed:
+            print(f"⚠️ Forecast failed for {len(failed)} regions. Inspect `data/failed_regions.txt` if present.")
+        return stats
 
-    if failed:
-        print(f"⚠️ Forecast failed for {len(failed)} regions. Inspect `data/failed_regions.txt` if present.")
+    checkpoint.start(spans, sink=sink)
+    return run_batch(checkpoint, spans, last_dates, alerts, sink, stats)
 
 if __name__ == "__main__":
     arg_parser = argparse.ArgumentParser(
-        description="Run daily flood forecast ingestion. By default it only fetches days since last DB entry."
+        description="Run daily flood forecast ingestion. By default it only fetches regions and days missing from the DB."
     )
     arg_parser.add_argument(
         "--backfill-days", "-b",
         type=int,
         help="Force fetching this many days of data (ignores last-forecast check)."
     )
+    arg_parser.add_argument(
+        "--stream", "-s",
+        action="store_true",
+        help="Score and upload each region as soon as it is fetched."
+    )
+    arg_parser.add_argument(
+        "--sink",
+        choices=sorted(SINKS),
+        default=FORECAST_SINK,
+        help="Where results go: POST to the backend (http) or bulk-write to DATABASE_URL (db)."
+    )
+    arg_parser.add_argument(
+        "--resume", "-r",
+        action="store_true",
+        help="Continue the last unfinished run from its checkpoint (fetched regions, scores, uploaded batches)."
+    )
+    arg_parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Fetch, score and upload only the regions the last run failed on."
+    )
     args = arg_parser.parse_args()
-    main(backfill_days=args.backfill_days)
+    if args.stream and (args.resume or args.retry_failed):
+        arg_parser.error("--resume and --retry-failed cannot be combined with --stream")
+    main(backfill_days=args.backfill_days, stream=args.stream, sink=args.sink,
+         resume=args.resume, retry_failed=args.retry_failed)
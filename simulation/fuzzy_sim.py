@@ -2,44 +2,141 @@ import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+# Shared definition of the fuzzy system: every input/output variable lives on
+# the same [0, 1] universe and uses the same three triangular terms.
+UNIVERSE = np.arange(0, 1.01, 0.01)
+
+MEMBERSHIPS = {
+    'low':      [0, 0, 0.4],
+    'moderate': [0.2, 0.5, 0.8],
+    'high':     [0.6, 1, 1],
+}
+
+# (precip term, runoff term) → risk term
+RULES = [
+    ('low',      'low',      'low'),
+    ('low',      'moderate', 'moderate'),
+    ('low',      'high',     'moderate'),
+    ('moderate', 'low',      'moderate'),
+    ('moderate', 'moderate', 'moderate'),
+    ('moderate', 'high',     'moderate'),
+    ('high',     'low',      'moderate'),
+    ('high',     'moderate', 'moderate'),
+    ('high',     'high',     'high'),
+]
+
 def load_fuzzy_sim():
     # Define fuzzy input variables
-    precip = ctrl.Antecedent(np.arange(0, 1.01, 0.01), 'precip')
-    runoff = ctrl.Antecedent(np.arange(0, 1.01, 0.01), 'runoff')
-    
-    # Define fuzzy output variable
-    risk = ctrl.Consequent(np.arange(0, 1.01, 0.01), 'risk')
-
-    # Membership functions for inputs
-    precip['low'] = fuzz.trimf(precip.universe, [0, 0, 0.4])
-    precip['moderate'] = fuzz.trimf(precip.universe, [0.2, 0.5, 0.8])
-    precip['high'] = fuzz.trimf(precip.universe, [0.6, 1, 1])
+    precip = ctrl.Antecedent(UNIVERSE, 'precip')
+    runoff = ctrl.Antecedent(UNIVERSE, 'runoff')
 
-    runoff['low'] = fuzz.trimf(runoff.universe, [0, 0, 0.4])
-    runoff['moderate'] = fuzz.trimf(runoff.universe, [0.2, 0.5, 0.8])
-    runoff['high'] = fuzz.trimf(runoff.universe, [0.6, 1, 1])
+    # Define fuzzy output variable
+    risk = ctrl.Consequent(UNIVERSE, 'risk')
 
-    # Membership functions for output
-    risk['low'] = fuzz.trimf(risk.universe, [0, 0, 0.4])
-    risk['moderate'] = fuzz.trimf(risk.universe, [0.2, 0.5, 0.8])
-    risk['high'] = fuzz.trimf(risk.universe, [0.6, 1, 1])
+    # Membership functions for inputs and output
+    for var in (precip, runoff, risk):
+        for term, abc in MEMBERSHIPS.items():
+            var[term] = fuzz.trimf(var.universe, abc)
 
     # Define fuzzy rules
     rules = [
-        ctrl.Rule(precip['low'] & runoff['low'], risk['low']),
-        ctrl.Rule(precip['low'] & runoff['moderate'], risk['moderate']),
-        ctrl.Rule(precip['low'] & runoff['high'], risk['moderate']),
-        ctrl.Rule(precip['moderate'] & runoff['low'], risk['moderate']),
-        ctrl.Rule(precip['moderate'] & runoff['moderate'], risk['moderate']),
-        ctrl.Rule(precip['moderate'] & runoff['high'], risk['moderate']),
-        ctrl.Rule(precip['high'] & runoff['low'], risk['moderate']),
-        ctrl.Rule(precip['high'] & runoff['moderate'], risk['moderate']),
-        ctrl.Rule(precip['high'] & runoff['high'], risk['high']),
+        ctrl.Rule(precip[p] & runoff[r], risk[out])
+        for p, r, out in RULES
     ]
 
     system = ctrl.ControlSystem(rules)
     return ctrl.ControlSystemSimulation(system)
 
+
+def _trimf(x, a, b, c):
+    """Closed-form fuzz.trimf that works on arrays of any shape."""
+    y = np.zeros_like(x)
+    if a != b:
+        rising = (a < x) & (x < b)
+        y[rising] = (x[rising] - a) / (b - a)
+    if b != c:
+        falling = (b < x) & (x < c)
+        y[falling] = (c - x[falling]) / (c - b)
+    y[x == b] = 1.0
+    return y
+
+
+class FuzzyRiskEngine:
+    """
+    NumPy implementation of the Mamdani system built by load_fuzzy_sim().
+
+    Mirrors skfuzzy's control semantics (interpolated fuzzification, min for
+    AND and implication, max accumulation, centroid over the universe
+    upsampled with the cut points), but scores whole arrays in one call.
+    """
+
+    chunk_size = 50_000
+
+    def __init__(self, universe=UNIVERSE, memberships=MEMBERSHIPS, rules=RULES):
+        self.universe = np.asarray(universe, dtype=np.float64)
+        self.terms = list(memberships)
+        self.abc = np.array([memberships[t] for t in self.terms], dtype=np.float64)
+        self.mfs = np.array([fuzz.trimf(self.universe, abc) for abc in self.abc])
+
+        idx = {t: i for i, t in enumerate(self.terms)}
+        self.rule_idx = np.array([(idx[p], idx[r], idx[out]) for p, r, out in rules])
+
+    def evaluate(self, precip, runoff):
+        """Return Fuzzy_Risk for paired arrays of normalized precip / runoff."""
+        precip = np.atleast_1d(np.asarray(precip, dtype=np.float64))
+        runoff = np.atleast_1d(np.asarray(runoff, dtype=np.float64))
+        precip, runoff = np.broadcast_arrays(precip, runoff)
+
+        out = np.empty(precip.shape, dtype=np.float64)
+        flat_p, flat_r, flat_out = precip.ravel(), runoff.ravel(), out.reshape(-1)
+        for start in range(0, flat_p.size, self.chunk_size):
+            stop = start + self.chunk_size
+            flat_out[start:stop] = self._evaluate_chunk(flat_p[start:stop], flat_r[start:stop])
+        return out
+
+    def _fuzzify(self, values):
+        lo, hi = self.universe[0], self.universe[-1]
+        values = np.clip(values, lo, hi)
+        return np.stack([np.interp(values, self.universe, mf) for mf in self.mfs], axis=1)
+
+    def _evaluate_chunk(self, precip, runoff):
+        n, k = precip.size, len(self.terms)
+        mu_p = self._fuzzify(precip)
+        mu_r = self._fuzzify(runoff)
+
+        # Rule firing strengths, accumulated per output term with max
+        strength = np.minimum(mu_p[:, self.rule_idx[:, 0]], mu_r[:, self.rule_idx[:, 1]])
+        cuts = np.zeros((n, k))
+        for j in range(k):
+            mask = self.rule_idx[:, 2] == j
+            if mask.any():
+                cuts[:, j] = strength[:, mask].max(axis=1)
+
+        # Upsample the universe with the points where each term meets its cut
+        a, b, c = self.abc[:, 0], self.abc[:, 1], self.abc[:, 2]
+        left = a + cuts * (b - a)
+        right = c - cuts * (c - b)
+        xs = np.concatenate([np.broadcast_to(self.universe, (n, self.universe.size)), left, right], axis=1)
+        xs.sort(axis=1)
+
+        # Aggregated (clipped, max-combined) output membership at those points
+        ys = np.zeros_like(xs)
+        for j in range(k):
+            mf = _trimf(xs, *self.abc[j])
+            np.maximum(ys, np.minimum(cuts[:, j:j + 1], mf), out=ys)
+
+        # Exact centroid of the piecewise-linear membership function
+        x1, x2 = xs[:, :-1], xs[:, 1:]
+        y1, y2 = ys[:, :-1], ys[:, 1:]
+        dx = x2 - x1
+        area = 0.5 * dx * (y1 + y2)
+        moment = x1 * area + dx * dx * (y1 + 2 * y2) / 6.0
+        return moment.sum(axis=1) / np.fmax(area.sum(axis=1), np.finfo(float).eps)
+
+
+def load_fuzzy_engine():
+    return FuzzyRiskEngine()
+
 # import matplotlib.pyplot as plt
 # import numpy as np
 # import skfuzzy as fuzz
@@ -0,0 +1,102 @@
+# simulation/fuzzy_surface.py
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from simulation.fuzzy_sim import UNIVERSE, MEMBERSHIPS, RULES, load_fuzzy_engine
+
+SURFACE_DIR = Path(os.getenv("FUZZY_SURFACE_DIR", "backend/models"))
+RESOLUTION  = int(os.getenv("FUZZY_SURFACE_RESOLUTION", "1001"))
+
+
+def surface_key(resolution=RESOLUTION):
+    """Hash of everything that shapes the surface: universe, terms, rules and grid size."""
+    spec = {
+        "universe":    [round(float(u), 12) for u in UNIVERSE],
+        "memberships": MEMBERSHIPS,
+        "rules":       RULES,
+        "resolution":  resolution,
+    }
+    blob = json.dumps(spec, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+class FuzzyRiskSurface:
+    """
+    Fuzzy_Risk precomputed on a regular (precip, runoff) grid over [0, 1]²,
+    looked up with bilinear interpolation. Exposes the same evaluate()
+    interface as FuzzyRiskEngine so the two are interchangeable.
+    """
+
+    def __init__(self, grid, key=None):
+        self.grid = grid
+        self.key = key
+        self.steps = grid.shape[0] - 1
+
+    @classmethod
+    def build(cls, resolution=RESOLUTION, engine=None):
+        engine = engine or load_fuzzy_engine()
+        axis = np.linspace(0, 1, resolution)
+        precip, runoff = np.meshgrid(axis, axis, indexing="ij")
+        grid = engine.evaluate(precip, runoff)
+        return cls(grid, surface_key(resolution))
+
+    def evaluate(self, precip, runoff):
+        """
+        Return interpolated Fuzzy_Risk for paired arrays of normalized precip /
+        runoff; NaN where either input is missing (NaN) or infinite.
+        """
+        precip = np.atleast_1d(np.asarray(precip, dtype=np.float64))
+        runoff = np.atleast_1d(np.asarray(runoff, dtype=np.float64))
+        precip, runoff = np.broadcast_arrays(precip, runoff)
+
+        # NaN survives np.clip and casts to an arbitrary grid index
+        invalid = ~(np.isfinite(precip) & np.isfinite(runoff))
+        if invalid.any():
+            precip = np.where(invalid, 0.0, precip)
+            runoff = np.where(invalid, 0.0, runoff)
+
+        x = np.clip(precip, 0, 1) * self.steps
+        y = np.clip(runoff, 0, 1) * self.steps
+        i = np.minimum(x.astype(np.intp), self.steps - 1)
+        j = np.minimum(y.astype(np.intp), self.steps - 1)
+        fx = x - i
+        fy = y - j
+
+        g = self.grid
+        risk = (
+            g[i, j]         * (1 - fx) * (1 - fy)
+            + g[i + 1, j]     * fx       * (1 - fy)
+            + g[i, j + 1]     * (1 - fx) * fy
+            + g[i + 1, j + 1] * fx       * fy
+        )
+        if invalid.any():
+            risk[invalid] = np.nan
+        return risk
+
+
+def surface_path(resolution=RESOLUTION, cache_dir=SURFACE_DIR):
+    return Path(cache_dir) / f"fuzzy_surface_{surface_key(resolution)}.npy"
+
+
+def load_fuzzy_surface(resolution=RESOLUTION, cache_dir=SURFACE_DIR, mmap_mode=None):
+    """
+    Load the compiled surface for the current rule base, building and
+    persisting it first if no file exists for this rule/membership hash.
+    """
+    path = surface_path(resolution, cache_dir)
+    if path.exists():
+        return FuzzyRiskSurface(np.load(path, mmap_mode=mmap_mode), surface_key(resolution))
+
+    print(f"🧮 Compiling {resolution}×{resolution} fuzzy risk surface → {path}")
+    surface = FuzzyRiskSurface.build(resolution)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, surface.grid)
+    os.replace(tmp, path)
+    return surface
@@ -0,0 +1,109 @@
+# simulation/http_cache.py
+
+import os
+import time
+import threading
+
+from dotenv import load_dotenv
+
+from simulation.disk_cache import DiskCache
+
+load_dotenv()
+
+OWM_CACHE        = os.getenv("OWM_CACHE", "1").lower() not in ("", "0", "false", "off", "no")
+OWM_CACHE_PATH   = os.getenv("OWM_CACHE_PATH", "data/http_cache.sqlite")
+OWM_CACHE_TTL    = float(os.getenv("OWM_CACHE_TTL", str(3 * 3600)))
+OWM_CACHE_MAX_MB = float(os.getenv("OWM_CACHE_MAX_MB", "64"))
+
+ISSUE_BUCKET_S = 3 * 3600  # OWM issues the 5-day/3-hour forecast on a 3-hour cycle
+COORD_DECIMALS = 2         # ~1 km; nearby requests share an entry
+
+
+class ResponseCache:
+    """
+    Provider responses keyed by (endpoint, rounded lat/lon, units) and tagged
+    with the issue-time bucket they were fetched in.
+
+    An entry is fresh while it is in the current bucket and younger than
+    `ttl`. Stale entries are kept (until LRU eviction) so their ETag /
+    Last-Modified can be sent back as a conditional request; a 304 renews
+    the entry without transferring or parsing the payload again.
+    """
+
+    def __init__(self, store, ttl=OWM_CACHE_TTL, bucket_seconds=ISSUE_BUCKET_S, clock=time.time):
+        self.store = store
+        self.ttl = ttl
+        self.bucket_seconds = bucket_seconds
+        self.clock = clock
+        self.hits = 0
+        self.revalidated = 0
+        self.fetched = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, params):
+        lat = round(float(params["lat"]), COORD_DECIMALS)
+        lon = round(float(params["lon"]), COORD_DECIMALS)
+        return f"{url}|{lat:.{COORD_DECIMALS}f}|{lon:.{COORD_DECIMALS}f}|{params.get('units', '')}"
+
+    def bucket(self, now=None):
+        return int((self.clock() if now is None else now) // self.bucket_seconds)
+
+    def lookup(self, url, params):
+        """Return (entry, fresh); entry is None on a miss."""
+        entry = self.store.get(self.key(url, params), stale=True)
+        if entry is None:
+            return None, False
+        now = self.clock()
+        fresh = entry["bucket"] == self.bucket(now) and now - entry["fetched"] < self.ttl
+        if fresh:
+            self._count("hits")
+        return entry, fresh
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers or None
+
+    def save(self, url, params, payload, headers=None):
+        headers = headers or {}
+        now = self.clock()
+        entry = {
+            "payload":       payload,
+            "etag":          headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "bucket":        self.bucket(now),
+            "fetched":       now,
+        }
+        self.store.set(self.key(url, params), entry)
+        self._count("fetched")
+
+    def renew(self, url, params, entry, headers=None):
+        """Mark a stale entry fresh again after the provider answered 304."""
+        headers = headers or {}
+        now = self.clock()
+        entry = dict(entry, bucket=self.bucket(now), fetched=now)
+        entry["etag"] = headers.get("ETag") or entry.get("etag")
+        self.store.set(self.key(url, params), entry)
+        self._count("revalidated")
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def report(self):
+        return (
+            f"🗄️  OWM cache: {self.hits} fresh hit(s), {self.revalidated} revalidated (304), "
+            f"{self.fetched} fetched"
+        )
+
+
+def load_response_cache(path=OWM_CACHE_PATH, ttl=OWM_CACHE_TTL, max_mb=OWM_CACHE_MAX_MB):
+    """The on-disk OWM response cache, or None when OWM_CACHE is disabled."""
+    if not OWM_CACHE:
+        return None
+    return ResponseCache(DiskCache(path, max_bytes=int(max_mb * 1024 * 1024)), ttl=ttl)
@@ -3,21 +3,64 @@ import requests
 import numpy as np
 import pandas as pd
 from config.regions_config import REGIONS
+from simulation.run_stats import timed
 
-def run_forecast_pipeline(df_fc_raw, cal_pipe, sim, best_thr):
+def compute_fuzzy_risk(df_fc_raw, sim):
+    precip = df_fc_raw['Precipitation_norm'].to_numpy(dtype=float)
+    runoff = df_fc_raw['River_Level_norm'].to_numpy(dtype=float)
+
+    # FuzzyRiskEngine / FuzzyRiskSurface score the whole column at once
+    if hasattr(sim, 'evaluate'):
+        return sim.evaluate(precip, runoff)
+
+    # Plain skfuzzy ControlSystemSimulation: one compute() per row
     fuzzy_scores = []
-    for p, r in zip(df_fc_raw['Precipitation_norm'], df_fc_raw['River_Level_norm']):
+    for p, r in zip(precip, runoff):
         sim.input['precip'] = p
         sim.input['runoff'] = r
         sim.compute()
         fuzzy_scores.append(sim.output['risk'])
+    return np.asarray(fuzzy_scores)
 
-    df_fc_raw['Fuzzy_Risk'] = fuzzy_scores
+def _score(df_fc_raw, cal_pipe, sim, static_features=None, stats=None):
+    """Fuzzy_Risk and prob_hybrid arrays for every row of df_fc_raw (which gains a Fuzzy_Risk column)."""
+    with timed(stats, 'fuzzy'):
+        df_fc_raw['Fuzzy_Risk'] = compute_fuzzy_risk(df_fc_raw, sim)
 
-    X_fc = df_fc_raw.drop(columns=['Date', 'Region'])
-    prob_hybrid = cal_pipe.predict_proba(X_fc)[:, 1]
-    alerts = (prob_hybrid >= best_thr).astype(int)
+    with timed(stats, 'model'):
+        X_fc = df_fc_raw.drop(columns=['Date', 'Region'])
+        if static_features is not None and static_features.covers(df_fc_raw['Region']):
+            # Static columns come pre-transformed per region; only dynamic ones are encoded
+            prob_hybrid = static_features.predict_positive(df_fc_raw['Region'], X_fc)
+        else:
+            prob_hybrid = cal_pipe.predict_proba(X_fc)[:, 1]
+    return df_fc_raw['Fuzzy_Risk'].to_numpy(), np.asarray(prob_hybrid)
 
+def run_forecast_pipeline(df_fc_raw, cal_pipe, sim, best_thr, static_features=None, stats=None,
+                          score_cache=None, model_version=None):
+    """
+    Score a daily forecast frame. With a `score_cache` (see
+    simulation.score_cache), a `model_version` and a fuzzy surface that
+    carries its rule key, rows whose inputs were scored before are served
+    from the cache and only the misses go through the fuzzy and model steps.
+    """
+    rules_version = getattr(sim, 'key', None)
+    if score_cache is None or model_version is None or rules_version is None:
+        _, prob_hybrid = _score(df_fc_raw, cal_pipe, sim, static_features, stats)
+    else:
+        features = df_fc_raw.drop(columns=['Date', 'Region', 'Fuzzy_Risk'], errors='ignore')
+        keys = score_cache.keys(features, model_version, rules_version)
+        fuzzy, prob_hybrid, hit = score_cache.lookup(keys)
+        if stats is not None:
+            stats.add('rows_cached', int(hit.sum()))
+        miss = ~hit
+        if miss.any():
+            todo = df_fc_raw[miss].copy()
+            fuzzy[miss], prob_hybrid[miss] = _score(todo, cal_pipe, sim, static_features, stats)
+            score_cache.save([k for k, m in zip(keys, miss) if m], fuzzy[miss], prob_hybrid[miss])
+        df_fc_raw['Fuzzy_Risk'] = fuzzy
+
+    alerts = (prob_hybrid >= best_thr).astype(int)
     return pd.DataFrame({
         'prob_hybrid': prob_hybrid,
         'alert': alerts
@@ -0,0 +1,227 @@
+# simulation/quota.py
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows: reservations are still written per call, just not locked
+    fcntl = None
+
+load_dotenv()
+
+OWM_CALLS_PER_MINUTE = float(os.getenv("OWM_CALLS_PER_MINUTE", "60"))
+OWM_CALLS_PER_DAY    = int(os.getenv("OWM_CALLS_PER_DAY", "1000"))
+OWM_BURST            = int(os.getenv("OWM_BURST", "10"))
+OWM_USAGE_PATH       = os.getenv("OWM_USAGE_PATH", "data/owm_usage.json")
+
+ALERT_RANKS = {"high": 2, "moderate": 1, "low": 0}
+
+
+class QuotaExhausted(RuntimeError):
+    """The provider's daily call allowance has been used up."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, holding at most
+    `capacity`. acquire() blocks until a token is available and returns how
+    long it waited. pause() stops handing out tokens for a while, e.g. after
+    the provider answered 429 with a Retry-After.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            self.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds):
+        with self._lock:
+            now = self.clock()
+            self.paused_until = max(self.paused_until, now + seconds)
+            # Nothing accrues while paused, so the burst does not refire on resume
+            self._refill(now)
+            self.tokens = 0.0
+            self.updated = self.paused_until
+
+
+def parse_retry_after(value, default=None):
+    """Retry-After header → seconds to wait. Accepts delta-seconds or an HTTP date."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class QuotaScheduler:
+    """
+    Gatekeeper for calls to the weather provider.
+
+    Every request takes a token from a per-minute bucket (rate and burst
+    configurable) and counts against the daily allowance. Each call is
+    reserved in `usage_path` under a file lock as it is made, so runs on
+    the same UTC day share the count, including runs in other processes at
+    the same time; once it is spent acquire() raises QuotaExhausted instead
+    of letting the provider answer 429. throttle() pauses every caller
+    after a 429 for the provider's Retry-After.
+    """
+
+    def __init__(self, per_minute=OWM_CALLS_PER_MINUTE, per_day=OWM_CALLS_PER_DAY, burst=OWM_BURST,
+                 usage_path=OWM_USAGE_PATH, clock=time.monotonic, sleep=time.sleep):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.bucket = TokenBucket(per_minute / 60.0, burst, clock=clock, sleep=sleep)
+        self.usage_path = Path(usage_path) if usage_path else None
+        self.calls = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self.day, self.day_calls = self._load_usage()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def unlimited(cls):
+        """No pacing and nothing persisted, for local stand-in providers and load tests."""
+        return cls(per_minute=1e9, per_day=10**12, burst=10**6, usage_path=None)
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def _load_usage(self):
+        today = self._today()
+        if self.usage_path is None or not self.usage_path.exists():
+            return today, 0
+        try:
+            usage = json.loads(self.usage_path.read_text())
+        except (OSError, ValueError):
+            return today, 0
+        return today, int(usage.get("calls", 0)) if usage.get("day") == today else 0
+
+    @contextmanager
+    def _file_lock(self):
+        self.usage_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.usage_path.with_name(self.usage_path.name + ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)  # released when the file closes
+            yield
+
+    def _reserve(self):
+        """Count one call in the usage file; (day, calls today) after it, or QuotaExhausted."""
+        with self._file_lock():
+            day, calls = self._load_usage()
+            if calls >= self.per_day:
+                self.day, self.day_calls = day, calls
+                raise QuotaExhausted(f"daily quota of {self.per_day} calls used")
+            calls += 1
+            tmp = self.usage_path.with_name(self.usage_path.name + f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"day": day, "calls": calls}))
+            os.replace(tmp, self.usage_path)
+        return day, calls
+
+    def acquire(self):
+        with self._lock:
+            if self.usage_path is not None:
+                self.day, self.day_calls = self._reserve()
+            else:
+                today = self._today()
+                if today != self.day:
+                    self.day, self.day_calls = today, 0
+                if self.day_calls >= self.per_day:
+                    raise QuotaExhausted(f"daily quota of {self.per_day} calls used")
+                self.day_calls += 1
+            self.calls += 1
+        waited = self.bucket.acquire()
+        with self._lock:
+            self.waited += waited
+
+    def throttle(self, retry_after):
+        with self._lock:
+            self.throttled += 1
+        self.bucket.pause(retry_after)
+
+    def usage(self):
+        return {
+            "calls":         self.calls,
+            "throttled":     self.throttled,
+            "waited_s":      round(self.waited, 3),
+            "day":           self.day,
+            "day_calls":     self.day_calls,
+            "per_day":       self.per_day,
+            "per_minute":    self.per_minute,
+            "day_remaining": max(self.per_day - self.day_calls, 0),
+        }
+
+    def report(self):
+        u = self.usage()
+        return (
+            f"📈 OWM quota: {u['calls']} call(s) this run, {u['day_calls']}/{u['per_day']} today "
+            f"({u['throttled']} throttled, {u['waited_s']}s waiting for tokens)"
+        )
+
+
+def prioritize(regions, last_dates=None, alerts=None):
+    """
+    Order region names so the most urgent are fetched first: highest alert
+    state, then stalest (no data at all counts as stalest), then config order.
+    `alerts` maps region → "High"/"Moderate"/"Low" or a number.
+    """
+    last_dates = last_dates or {}
+    alerts = alerts or {}
+
+    def rank(alert):
+        if isinstance(alert, str):
+            return ALERT_RANKS.get(alert.lower(), 0)
+        return float(alert or 0)
+
+    order = {region: i for i, region in enumerate(regions)}
+    return sorted(
+        regions,
+        key=lambda r: (
+            -rank(alerts.get(r)),
+            last_dates.get(r) is not None,
+            last_dates.get(r) or "",
+            order[r],
+        ),
+    )
@@ -0,0 +1,205 @@
+# simulation/replay.py
+
+import os
+import json
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from dotenv import load_dotenv
+
+from simulation.fake_provider import FakeOWMSession
+from config.regions_config import REGIONS
+
+load_dotenv()
+
+# live: the real provider; record: the real provider, saving every forecast
+# to OWM_CASSETTE; replay: answer from OWM_CASSETTE; fake: synthetic forecasts
+OWM_TRANSPORT       = os.getenv("OWM_TRANSPORT", "live").lower()
+OWM_CASSETTE        = os.getenv("OWM_CASSETTE", "data/cassettes/owm_forecast.json")
+OWM_FAKE_LATENCY    = float(os.getenv("OWM_FAKE_LATENCY", "0"))     # seconds per call (replay / fake)
+OWM_FAKE_ERROR_RATE = float(os.getenv("OWM_FAKE_ERROR_RATE", "0"))  # fraction of calls answered 503
+
+TRANSPORTS = ("live", "record", "replay", "fake")
+
+
+class Cassette:
+    """Recorded forecast payloads keyed by coordinates, stored as one JSON file."""
+
+    def __init__(self, path=OWM_CASSETTE):
+        self.path = Path(path)
+        self.responses = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self.responses = json.loads(self.path.read_text())["responses"]
+
+    @staticmethod
+    def key(lat, lon):
+        return f"{float(lat):.4f},{float(lon):.4f}"
+
+    def get(self, lat, lon):
+        return self.responses.get(self.key(lat, lon))
+
+    def put(self, lat, lon, payload):
+        with self._lock:
+            self.responses[self.key(lat, lon)] = payload
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            body = json.dumps({"responses": self.responses}, separators=(",", ":"))
+        tmp = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(body)
+        os.replace(tmp, self.path)
+
+    def __len__(self):
+        return len(self.responses)
+
+
+class RecordingSession:
+    """Passes calls through to `session` and records every 200 forecast; saved on close()."""
+
+    def __init__(self, session, cassette):
+        self.session = session
+        self.cassette = cassette
+
+    def get(self, url, params=None, headers=None, timeout=None, **kwargs):
+        resp = self.session.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+        if resp.status_code == 200:
+            self.cassette.put(params["lat"], params["lon"], resp.json())
+        return resp
+
+    def close(self):
+        self.cassette.save()
+        self.session.close()
+
+
+def transport_session(transport, live_session, cassette=OWM_CASSETTE,
+                      latency=OWM_FAKE_LATENCY, error_rate=OWM_FAKE_ERROR_RATE):
+    """Wrap or replace the live provider session according to `transport` (see TRANSPORTS)."""
+    if transport == "live":
+        return live_session
+    if transport == "record":
+        return RecordingSession(live_session, Cassette(cassette))
+    live_session.close()
+    if transport == "replay":
+        recorded = Cassette(cassette)
+        if not len(recorded):
+            raise FileNotFoundError(f"No recorded responses in {cassette}; record some with OWM_TRANSPORT=record")
+        return FakeOWMSession(latency=latency, error_rate=error_rate, payloads=recorded.get)
+    if transport == "fake":
+        return FakeOWMSession(latency=latency, error_rate=error_rate)
+    raise ValueError(f"Unknown OWM transport '{transport}', expected one of {TRANSPORTS}")
+
+
+def scaled_regions(factor, regions=REGIONS):
+    """
+    `factor` copies of every region for load tests: the originals plus
+    "<name>-x2" … "<name>-x<factor>" with the same coordinates and static
+    features, so replayed and fake forecasts resolve for every copy.
+    """
+    scaled = dict(regions)
+    for k in range(2, factor + 1):
+        scaled.update({f"{region}-x{k}": info for region, info in regions.items()})
+    return scaled
+
+
+class ProviderServer:
+    """
+    Local HTTP stand-in for the OWM forecast endpoint, answering from a
+    FakeOWMSession (synthetic or replayed, with its latency, error and
+    rate-limit injection). Point the fetcher at `url` through
+    OWM_FORECAST_URL to exercise the real HTTP client path offline.
+    """
+
+    def __init__(self, session, host="127.0.0.1", port=0):
+        provider = session
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                headers = {"If-None-Match": self.headers["If-None-Match"]} if self.headers["If-None-Match"] else None
+                resp = provider.get(parts.path, params=dict(parse_qsl(parts.query)), headers=headers)
+                body = b"" if resp.status_code == 304 else json.dumps(resp.json()).encode()
+                self.send_response(resp.status_code)
+                for name, value in resp.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.session = session
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/data/2.5/forecast"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="owm-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def record(cassette=OWM_CASSETTE):
+    """Fetch every region from the live provider once and save the responses."""
+    from simulation.fetcher import make_session, stream_forecast_payloads
+
+    session = RecordingSession(make_session(transport="live"), Cassette(cassette))
+    try:
+        fetched = sum(1 for _ in stream_forecast_payloads(os.getenv("OWM_API_KEY"), session=session, cache=False))
+    finally:
+        session.close()
+    print(f"📼 Recorded {len(session.cassette)} forecast(s) for {fetched} region(s) to {cassette}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Record, replay or fake the OWM forecast provider.")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="Fetch all regions from the live API into a cassette.")
+    rec.add_argument("--cassette", default=OWM_CASSETTE)
+
+    serve = commands.add_parser("serve", help="Run a local HTTP stand-in for the forecast endpoint.")
+    serve.add_argument("--cassette", default=OWM_CASSETTE, help="Replay this cassette.")
+    serve.add_argument("--fake", action="store_true", help="Serve synthetic forecasts instead of a cassette.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8089)
+    serve.add_argument("--latency", type=float, default=OWM_FAKE_LATENCY, help="Seconds added to every call.")
+    serve.add_argument("--error-rate", type=float, default=OWM_FAKE_ERROR_RATE, help="Fraction of calls failing with 503.")
+    serve.add_argument("--limit", type=int, help="Calls allowed per --window seconds before answering 429.")
+    serve.add_argument("--window", type=float, default=60.0)
+
+    args = arg_parser.parse_args()
+    if args.command == "record":
+        record(args.cassette)
+    else:
+        payloads = None if args.fake else Cassette(args.cassette).get
+        session = FakeOWMSession(latency=args.latency, error_rate=args.error_rate, limit=args.limit,
+                                 window=args.window, payloads=payloads)
+        server = ProviderServer(session, args.host, args.port)
+        print(f"🛰️  OWM stand-in listening on {server.url}")
+        print(f"   export OWM_FORECAST_URL={server.url}")
+        try:
+            server.server.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
@@ -0,0 +1,52 @@
+# simulation/run_stats.py
+
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+
+class RunStats:
+    """
+    What one forecast job run did: busy seconds per stage, row counts, the
+    regions that failed and the error, if any. Thread-safe, since the
+    streaming mode times stages from several threads at once.
+    """
+
+    STAGES = ("fetch", "fuzzy", "model", "upload")
+
+    def __init__(self):
+        self.durations = dict.fromkeys(self.STAGES, 0.0)
+        self.counts = {"regions_fetched": 0, "rows_scored": 0, "rows_cached": 0, "rows_uploaded": 0}
+        self.failed_regions = []
+        self.error = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.durations[name] += seconds
+
+    def add(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                **{f"{name}_s": round(seconds, 4) for name, seconds in self.durations.items()},
+                **self.counts,
+                "failed_regions": list(self.failed_regions),
+                "error": self.error,
+            }
+
+
+def timed(stats, name):
+    """stats.stage(name), or a no-op when no RunStats is being collected."""
+    return stats.stage(name) if stats is not None else nullcontext()
@@ -0,0 +1,81 @@
+# simulation/score_cache.py
+
+import os
+import json
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from simulation.disk_cache import DiskCache
+
+load_dotenv()
+
+SCORE_CACHE        = os.getenv("SCORE_CACHE", "1").lower() not in ("", "0", "false", "off", "no")
+SCORE_CACHE_PATH   = os.getenv("SCORE_CACHE_PATH", "data/score_cache.sqlite")
+SCORE_CACHE_MAX_MB = float(os.getenv("SCORE_CACHE_MAX_MB", "32"))
+
+
+class ScoreCache:
+    """
+    Content-addressed (Fuzzy_Risk, prob_hybrid) per model input row.
+
+    A row's key hashes the model artifact version, the fuzzy rule/surface
+    version, the feature column names and the row's feature values, so a
+    new model, new rules or any changed input simply misses; nothing has to
+    be invalidated. Entries live in a size-bounded DiskCache (LRU eviction).
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def keys(features, model_version, rules_version):
+        """One key per row of the `features` frame (model inputs without Date / Region)."""
+        spec = json.dumps([model_version, rules_version, list(features.columns)])
+        namespace = hashlib.sha256(spec.encode()).hexdigest()[:16]
+        hashes = pd.util.hash_pandas_object(features, index=False).to_numpy()
+        return [f"{namespace}:{h:016x}" for h in hashes]
+
+    def lookup(self, keys):
+        """(fuzzy, prob, hit) arrays aligned with `keys`; values are NaN where `hit` is False."""
+        found = self.store.get_many(keys)
+        fuzzy = np.full(len(keys), np.nan)
+        prob = np.full(len(keys), np.nan)
+        hit = np.zeros(len(keys), dtype=bool)
+        for i, key in enumerate(keys):
+            value = found.get(key)
+            if value is not None:
+                fuzzy[i], prob[i] = value
+                hit[i] = True
+        with self._lock:
+            self.hits += int(hit.sum())
+            self.misses += len(keys) - int(hit.sum())
+        return fuzzy, prob, hit
+
+    def save(self, keys, fuzzy, prob):
+        self.store.set_many(zip(keys, zip(fuzzy.tolist(), prob.tolist())))
+
+    def report(self):
+        total = self.hits + self.misses
+        return f"♻️  Score cache: {self.hits}/{total} row(s) reused, {self.misses} scored"
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def load_score_cache(path=SCORE_CACHE_PATH, max_mb=SCORE_CACHE_MAX_MB):
+    """The process-wide on-disk score cache, or None when SCORE_CACHE is disabled."""
+    global _shared
+    if not SCORE_CACHE:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = ScoreCache(DiskCache(path, max_bytes=int(max_mb * 1024 * 1024)))
+        return _shared
@@ -0,0 +1,185 @@
+# simulation/streaming.py
+
+import os
+import time
+import queue
+import threading
+
+from dotenv import load_dotenv
+
+from simulation.fetcher import daily_forecast_frame, incremental_frame
+
+load_dotenv()
+
+STREAM_QUEUE_SIZE   = int(os.getenv("STREAM_QUEUE_SIZE", "8"))     # items buffered between stages
+STREAM_SCORE_BATCH  = int(os.getenv("STREAM_SCORE_BATCH", "8"))    # regions per model call, at most
+STREAM_UPLOAD_BATCH = int(os.getenv("STREAM_UPLOAD_BATCH", "500"))  # rows per upload
+
+_DONE = object()
+
+
+class StageProgress:
+    """Thread-safe per-stage counters, printed as one progress line."""
+
+    def __init__(self, total_regions):
+        self.total_regions = total_regions
+        self.started = time.monotonic()
+        self.first_result = None
+        self.counts = {"fetched": 0, "scored": 0, "rows": 0, "uploaded": 0, "upload_failed": 0}
+        self._lock = threading.Lock()
+
+    def add(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+            if name == "scored" and self.first_result is None:
+                self.first_result = time.monotonic() - self.started
+
+    def line(self):
+        c = self.counts
+        return (
+            f"📥 fetched {c['fetched']}/{self.total_regions} | 🧠 scored {c['scored']} region(s), "
+            f"{c['rows']} row(s) | 📡 uploaded {c['uploaded']} row(s)"
+            + (f", {c['upload_failed']} failed" if c['upload_failed'] else "")
+        )
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        first = f"{self.first_result:.2f}s" if self.first_result is not None else "n/a"
+        return f"⏱️  Streaming run finished in {elapsed:.2f}s (first result after {first})"
+
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def run_streaming(payloads, cutoff, score_fn, upload_fn, total_regions,
+                  queue_size=STREAM_QUEUE_SIZE, score_batch=STREAM_SCORE_BATCH, upload_batch=STREAM_UPLOAD_BATCH,
+                  spans=None):
+    """
+    Run fetch → score → upload as three concurrent stages joined by bounded
+    queues, so each region is scored and uploaded while others are still
+    being fetched.
+
+    payloads      iterable of (region, provider payload), e.g.
+                  fetcher.stream_forecast_payloads(); consumed on its own thread
+    spans         per-region (watermark, days) to score only missing days,
+                  see fetcher.incremental_frame(); replaces `cutoff`
+    score_fn      daily DataFrame (several regions) → list of upload records
+    upload_fn     list of records → None; a failing upload is reported and
+                  counted, the run carries on
+    Scoring takes whatever regions are waiting (up to `score_batch`) so the
+    model is called on small batches rather than one region at a time.
+    Returns the StageProgress with the final counters. An exception in the
+    fetch or score stage stops all stages and is re-raised.
+    """
+    progress = StageProgress(total_regions)
+    fetched = queue.Queue(maxsize=queue_size)
+    scored = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+
+    def fetch_stage():
+        try:
+            for region, data in payloads:
+                progress.add("fetched")
+                if not _put(fetched, (region, data), stop):
+                    break
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            close = getattr(payloads, "close", None)
+            if close is not None:
+                close()
+            _put(fetched, _DONE, stop)
+
+    def score_stage():
+        try:
+            done = False
+            while not done:
+                item = _get(fetched, stop)
+                if item is _DONE:
+                    break
+                batch = dict([item])
+                while len(batch) < score_batch:
+                    try:
+                        item = fetched.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        done = True
+                        break
+                    batch[item[0]] = item[1]
+
+                if spans is None:
+                    df_raw = daily_forecast_frame(batch, cutoff)
+                else:
+                    df_raw = incremental_frame(batch, spans)
+                if df_raw.empty:
+                    continue
+                records = score_fn(df_raw)
+                progress.add("scored", len(batch))
+                progress.add("rows", len(records))
+                print(progress.line(), flush=True)
+                if not _put(scored, records, stop):
+                    break
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(scored, _DONE, stop)
+
+    def upload_stage():
+        buffer = []
+
+        def flush():
+            batch = buffer[:]
+            buffer.clear()
+            try:
+                upload_fn(batch)
+                progress.add("uploaded", len(batch))
+            except Exception as e:
+                progress.add("upload_failed", len(batch))
+                print(f"❌ Upload of {len(batch)} record(s) failed: {e}", flush=True)
+            print(progress.line(), flush=True)
+
+        while True:
+            records = _get(scored, stop)
+            if records is _DONE:
+                break
+            buffer.extend(records)
+            if len(buffer) >= upload_batch:
+                flush()
+        if buffer and not stop.is_set():
+            flush()
+
+    threads = [
+        threading.Thread(target=fetch_stage, name="stream-fetch", daemon=True),
+        threading.Thread(target=score_stage, name="stream-score", daemon=True),
+        threading.Thread(target=upload_stage, name="stream-upload", daemon=True),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0]
+    print(progress.summary())
+    return progress
+
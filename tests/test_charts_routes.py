@@ -1,5 +1,10 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
 from fastapi.testclient import TestClient
 from backend.main import app
+import backend.core.pagination as pagination
 
 client = TestClient(app)
 
@@ -15,3 +20,54 @@ def test_historical_missing_param():
     res = client.get("/historical")
     assert res.status_code == 200
     assert isinstance(res.json(), list)
+
+def test_risk_summary_for_a_date_matches_row_labels():
+    client.post("/forecast/upload", json=[
+        {"region": "osh", "forecast_date": "1990-02-02", "prob_hybrid": 0.95, "alert": 1},
+        {"region": "naryn", "forecast_date": "1990-02-02", "prob_hybrid": 0.6, "alert": 0},
+        {"region": "talas", "forecast_date": "1990-02-02", "prob_hybrid": 0.5, "alert": 0},
+    ])
+    summary = client.get("/risk-summary", params={"date": "1990-02-02"}).json()
+    assert summary == {"Low": 1, "Moderate": 1, "High": 1}
+
+    rows = client.get("/forecast/osh", params={"start_date": "1990-02-02", "end_date": "1990-02-02"}).json()
+    assert rows[0]["risk_level"] == "High"
+    assert client.get("/risk-summary", params={"date": "1980-01-01"}).status_code == 404
+
+def test_historical_keyset_pages_and_streams():
+    today = date.today()
+    client.post("/forecast/upload", json=[
+        {"region": f"paging-test-{i}", "forecast_date": (today - timedelta(days=i % 2)).isoformat(),
+         "prob_hybrid": i / 10, "alert": 0}
+        for i in range(5)
+    ])
+    params = {"days": 2}
+    full = client.get("/historical", params={**params, "limit": 10000}).json()
+    assert len(full) >= 5 and "lat" in full[0]
+
+    pages, cursor = [], None
+    while True:
+        res = client.get("/historical", params={**params, "limit": 2, **({"cursor": cursor} if cursor else {})})
+        pages += res.json()
+        cursor = res.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert pages == full
+
+    ndjson = client.get("/historical", params={**params, "format": "ndjson"})
+    assert [json.loads(line) for line in ndjson.text.splitlines()] == full
+    csv_rows = list(csv.DictReader(io.StringIO(client.get("/historical", params={**params, "format": "csv"}).text)))
+    assert [r["date"] for r in csv_rows] == [r["date"] for r in full]
+
+    assert client.get("/historical", params={"cursor": "not-a-cursor"}).status_code == 400
+
+def test_historical_without_paging_params_returns_every_row(monkeypatch):
+    monkeypatch.setattr(pagination, "LISTING_PAGE_SIZE", 1)
+    full = client.get("/historical", params={"days": 2})
+    assert len(full.json()) >= 5
+    assert "x-next-cursor" not in full.headers
+    assert full.json() == client.get("/historical", params={"days": 2, "limit": 10000}).json()
+
+def test_next_cursor_header_is_exposed_to_browsers():
+    res = client.get("/historical", params={"days": 2, "limit": 1}, headers={"Origin": "http://localhost:3000"})
+    assert "x-next-cursor" in res.headers["access-control-expose-headers"].lower()
@@ -0,0 +1,94 @@
+import pytest
+import simulation.forecast_job as forecast_job
+from simulation.checkpoint import Checkpoint
+from simulation.fake_provider import forecast_payload
+from config.regions_config import REGIONS
+
+REGION_NAMES = [r for r, info in REGIONS.items() if info.get("lat") is not None][:6]
+
+class Provider:
+    """Stands in for stream_forecast_payloads(); `failing` regions fail, calls are recorded."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.requested = []
+
+    def __call__(self, api_key, failed_regions=None, regions=None, **kwargs):
+        for region in regions:
+            self.requested.append(region)
+            if region in self.failing:
+                failed_regions.append(region)
+            else:
+                yield region, forecast_payload(REGIONS[region]["lat"], REGIONS[region]["lon"])
+
+class FlakySink:
+    def __init__(self, fail_batches=()):
+        self.fail_batches = set(fail_batches)
+        self.calls = 0
+        self.rows = []
+
+    def __call__(self, records):
+        self.calls += 1
+        if self.calls in self.fail_batches:
+            raise RuntimeError("backend unavailable")
+        self.rows.extend(records)
+
+@pytest.fixture
+def job(monkeypatch, tmp_path):
+    monkeypatch.setattr(forecast_job, "REGIONS", {r: REGIONS[r] for r in REGION_NAMES})
+    monkeypatch.setattr(forecast_job, "get_watermarks", lambda sink: {})
+    monkeypatch.setattr(forecast_job, "upload_batches",
+                        lambda records: [records[i:i + 5] for i in range(0, len(records), 5)])
+    return Checkpoint(tmp_path / "checkpoints")
+
+def test_resume_skips_fetch_scoring_and_uploaded_batches(job, monkeypatch):
+    provider, sink = Provider(), FlakySink(fail_batches={2})
+    monkeypatch.setattr(forecast_job, "stream_forecast_payloads", provider)
+    monkeypatch.setitem(forecast_job.SINKS, "db", sink)
+
+    stats = forecast_job.main(sink="db", checkpoint=job)
+    assert stats.error and job.resumable() and job.stage == "upload"
+    total = stats.as_dict()["rows_scored"]
+    assert len(job.load_scored()) == total
+
+    # Scores survive a restart; nothing is refetched or rescored
+    monkeypatch.setattr(forecast_job, "score_records", lambda *a, **k: pytest.fail("rescored"))
+    stats = forecast_job.main(sink="db", resume=True, checkpoint=Checkpoint(job.path))
+    assert stats.error is None
+    assert provider.requested == REGION_NAMES
+    assert len(sink.rows) == total and len({(r["region"], r["forecast_date"]) for r in sink.rows}) == total
+    assert not Checkpoint(job.path).resumable()
+
+def test_resume_after_crash_fetches_only_missing_regions(job, monkeypatch):
+    provider = Provider()
+    monkeypatch.setattr(forecast_job, "stream_forecast_payloads", provider)
+    monkeypatch.setitem(forecast_job.SINKS, "db", FlakySink())
+
+    def crash(df_raw, stats=None):
+        raise KeyboardInterrupt
+    spans = {region: (None, 3) for region in REGION_NAMES}
+    job.start(spans, sink="db")
+    job.save_payload(REGION_NAMES[0], forecast_payload(REGIONS[REGION_NAMES[0]]["lat"], REGIONS[REGION_NAMES[0]]["lon"]))
+
+    monkeypatch.setattr(forecast_job, "score_records", crash)
+    with pytest.raises(KeyboardInterrupt):
+        forecast_job.main(sink="db", resume=True, checkpoint=job)
+    assert provider.requested == REGION_NAMES[1:]
+    assert job.fetched_regions() == set(REGION_NAMES)
+
+def test_retry_failed_reprocesses_only_failed_regions(job, monkeypatch):
+    provider, sink = Provider(failing=REGION_NAMES[2:4]), FlakySink()
+    monkeypatch.setattr(forecast_job, "stream_forecast_payloads", provider)
+    monkeypatch.setitem(forecast_job.SINKS, "db", sink)
+
+    stats = forecast_job.main(sink="db", checkpoint=job)
+    assert stats.failed_regions == REGION_NAMES[2:4]
+    assert Checkpoint(job.path).failed_regions == REGION_NAMES[2:4]
+
+    provider.failing.clear()
+    provider.requested.clear()
+    sink.rows.clear()
+    stats = forecast_job.main(sink="db", retry_failed=True, checkpoint=Checkpoint(job.path))
+    assert provider.requested == REGION_NAMES[2:4]
+    assert {r["region"] for r in sink.rows} == set(REGION_NAMES[2:4])
+    assert stats.failed_regions == []
@@ -0,0 +1,202 @@
+import time
+import pytest
+import requests
+import numpy as np
+import pandas as pd
+from simulation.fetcher import (fetch_forecast, daily_forecast_frame, forecast_cutoff, incremental_frame,
+                               region_static_table, _get_with_retry)
+from simulation.fake_provider import FakeOWMSession, FakeResponse, forecast_payload
+from simulation.quota import QuotaExhausted, QuotaScheduler, TokenBucket, prioritize
+from simulation.disk_cache import DiskCache
+from simulation.http_cache import ResponseCache
+from config.regions_config import REGIONS
+
+FETCHABLE = [r for r, info in REGIONS.items() if info.get('lat') is not None and info.get('lon') is not None]
+
+def _quota(**kwargs):
+    kwargs.setdefault("per_minute", 60_000)
+    kwargs.setdefault("burst", 1000)
+    return QuotaScheduler(usage_path=None, **kwargs)
+
+class ScriptedSession:
+    """Answers with the given statuses in turn, then 200."""
+
+    def __init__(self, statuses, headers=None):
+        self.statuses = list(statuses)
+        self.headers = headers or {}
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls += 1
+        status = self.statuses.pop(0) if self.statuses else 200
+        return FakeResponse(status, {"list": []}, self.headers if status == 429 else {})
+
+def test_concurrent_fetch_keeps_region_order():
+    session = FakeOWMSession(latency=0.05)
+    start = time.monotonic()
+    df, failed = fetch_forecast("test-key", days=1, workers=8, session=session, quota=_quota(),
+                                cache=False)
+    elapsed = time.monotonic() - start
+
+    assert session.max_in_flight <= 8
+    assert elapsed < len(REGIONS) * session.latency / 2
+    assert list(dict.fromkeys(df["Region"])) == FETCHABLE
+    assert sorted(failed) == sorted(set(REGIONS) - set(FETCHABLE))
+
+def test_retry_on_transient_status():
+    session = ScriptedSession([503, 429])
+    resp = _get_with_retry(session, "http://owm.test", {}, retries=2, backoff=0)
+    assert resp.status_code == 200
+    assert session.calls == 3
+
+    session = ScriptedSession([503, 503])
+    with pytest.raises(requests.HTTPError):
+        _get_with_retry(session, "http://owm.test", {}, retries=1, backoff=0)
+
+def test_retry_after_pauses_quota():
+    quota = _quota()
+    session = ScriptedSession([429], headers={"Retry-After": "0.2"})
+    start = time.monotonic()
+    _get_with_retry(session, "http://owm.test", {}, retries=2, backoff=0, quota=quota)
+    assert time.monotonic() - start >= 0.2
+    assert quota.usage()["throttled"] == 1
+    assert quota.usage()["calls"] == 2
+
+def test_token_bucket_rate_and_burst():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=lambda: now[0], sleep=lambda s: now.__setitem__(0, now[0] + s))
+    waits = [bucket.acquire() for _ in range(7)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3:] == pytest.approx([0.5] * 4)
+
+def test_daily_quota_fetches_most_urgent_first():
+    last_dates = {r: "2025-01-02" for r in FETCHABLE}
+    last_dates[FETCHABLE[-1]] = "2025-01-01"
+    alerts = {FETCHABLE[-2]: "High"}
+    quota = _quota(per_day=2)
+
+    df, failed = fetch_forecast("test-key", days=1, workers=1, session=FakeOWMSession(), quota=quota,
+                                last_dates=last_dates, alerts=alerts, cache=False)
+    assert set(df["Region"]) == {FETCHABLE[-2], FETCHABLE[-1]}
+    assert len(failed) == len(REGIONS) - 2
+    assert quota.usage()["day_remaining"] == 0
+
+def test_daily_quota_is_shared_by_concurrent_runs(tmp_path):
+    path = tmp_path / "owm_usage.json"
+    # Two runs in flight at once, e.g. the ingest worker and a CLI forecast_job
+    first = QuotaScheduler(per_minute=60_000, burst=1000, per_day=5, usage_path=path)
+    second = QuotaScheduler(per_minute=60_000, burst=1000, per_day=5, usage_path=path)
+    for _ in range(2):
+        first.acquire()
+        second.acquire()
+    first.acquire()
+    with pytest.raises(QuotaExhausted):
+        second.acquire()
+    assert first.usage()["calls"] == 3 and second.usage()["calls"] == 2
+    assert second.usage()["day_calls"] == 5
+
+    # A later run the same day starts from the shared count
+    assert QuotaScheduler(per_day=5, usage_path=path).usage()["day_remaining"] == 0
+
+def test_prioritize_orders_by_alert_then_staleness():
+    order = prioritize(["a", "b", "c", "d"], last_dates={"a": "2025-01-03", "b": "2025-01-01", "c": "2025-01-02"},
+                       alerts={"c": "Moderate"})
+    assert order == ["c", "d", "b", "a"]
+
+def test_fake_provider_enforces_limit():
+    session = FakeOWMSession(limit=3, window=60)
+    statuses = [session.get("http://owm.test", params={"lat": 1, "lon": 2}).status_code for _ in range(5)]
+    assert statuses == [200, 200, 200, 429, 429]
+    assert session.rejected == 2
+
+def test_response_cache_skips_network_and_revalidates(tmp_path):
+    now = [1_000_000.0]
+    cache = ResponseCache(DiskCache(tmp_path / "http.sqlite", clock=lambda: now[0]), ttl=3600,
+                          clock=lambda: now[0])
+    session = FakeOWMSession()
+
+    first, _ = fetch_forecast("test-key", days=1, session=session, quota=_quota(), cache=cache)
+    assert session.calls == len(FETCHABLE)
+
+    # Same issue bucket: nothing goes out, no quota used
+    quota = _quota()
+    again, _ = fetch_forecast("test-key", days=1, session=session, quota=quota, cache=cache)
+    assert session.calls == len(FETCHABLE)
+    assert quota.usage()["calls"] == 0
+    assert cache.hits == len(FETCHABLE)
+
+    # Next bucket: conditional requests, answered 304 by the provider
+    now[0] += 3 * 3600
+    revalidated, _ = fetch_forecast("test-key", days=1, session=session, quota=_quota(), cache=cache)
+    assert session.not_modified == len(FETCHABLE)
+    assert cache.revalidated == len(FETCHABLE)
+    assert first.equals(again) and first.equals(revalidated)
+
+def test_disk_cache_ttl_and_lru(tmp_path):
+    now = [0.0]
+    cache = DiskCache(tmp_path / "c.sqlite", max_bytes=3200, clock=lambda: now[0])
+    cache.set("short", b"x", ttl=10)
+    now[0] = 11
+    assert cache.get("short") is None
+    assert cache.get("short", stale=True) == b"x"
+
+    for i in range(3):
+        now[0] += 1
+        cache.set(f"k{i}", b"x" * 1000)
+    now[0] += 1
+    cache.get("k0")        # k0 is now more recent than k1
+    now[0] += 1
+    cache.set("k3", b"x" * 1000)
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None
+    assert cache.size() <= 3200
+
+def test_daily_frame_matches_per_region_resample():
+    start = 1_700_006_400  # midnight UTC
+    payloads = {region: forecast_payload(REGIONS[region]['lat'], REGIONS[region]['lon'], start=start)
+                for region in FETCHABLE[:5]}
+    for entry in payloads[FETCHABLE[1]]['list']:
+        entry.pop('rain', None)
+    payloads[FETCHABLE[2]]['list'][3]['rain'] = {'1h': 0.4}
+    del payloads[FETCHABLE[3]]['list'][8:16]  # a day with no entries at all
+    cutoff = pd.Timestamp(start + 4 * 86400, unit='s', tz='UTC')
+
+    static = region_static_table()
+    frames = []
+    for region, data in payloads.items():
+        df3h = pd.DataFrame(data['list'])
+        df3h['Date'] = pd.to_datetime(df3h['dt'], unit='s', utc=True)
+        df3h = df3h[df3h['Date'] < cutoff]
+        rain = df3h['rain'] if 'rain' in df3h.columns else pd.Series(np.nan, index=df3h.index)
+        df3h['rain'] = [v.get('3h', 0) if isinstance(v, dict) else 0.0 for v in rain]
+        daily = df3h.set_index('Date').resample('D')['rain'].sum().rename('Precipitation').reset_index()
+        daily['Region'] = region
+        for col in static.columns:
+            daily[col] = static.loc[region, col]
+        m = daily['Date'].dt.month
+        daily['month_sin'] = np.sin(2 * np.pi * m / 12)
+        daily['month_cos'] = np.cos(2 * np.pi * m / 12)
+        maxp = daily['Precipitation'].max()
+        daily['Precipitation_norm'] = daily['Precipitation'] / (maxp if maxp > 0 else 1)
+        daily['River_Level_norm'] = daily['Precipitation_norm']
+        frames.append(daily)
+    expected = pd.concat(frames, ignore_index=True)
+
+    result = daily_forecast_frame(payloads, cutoff)
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+def test_incremental_fetch_only_stale_regions_and_days():
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    full = daily_forecast_frame({r: forecast_payload(REGIONS[r]['lat'], REGIONS[r]['lon']) for r in FETCHABLE[:3]},
+                                forecast_cutoff(3))
+    spans = {FETCHABLE[0]: (None, 3), FETCHABLE[2]: ((today + pd.Timedelta(days=1)).date(), 3)}
+
+    session = FakeOWMSession()
+    df, failed = fetch_forecast("test-key", session=session, quota=_quota(), cache=False, spans=spans)
+    assert session.calls == 2 and failed == []
+    assert list(df['Region'].unique()) == [FETCHABLE[0], FETCHABLE[2]]
+    assert (df[df['Region'] == FETCHABLE[2]]['Date'] > today + pd.Timedelta(days=1)).all()
+
+    keep = (full['Region'] == FETCHABLE[0]) | ((full['Region'] == FETCHABLE[2]) & (full['Date'] > today + pd.Timedelta(days=1)))
+    pd.testing.assert_frame_equal(df, full[keep].reset_index(drop=True))
+    assert incremental_frame({}, spans).empty
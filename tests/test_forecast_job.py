@@ -1,12 +1,46 @@
-import os
-from simulation.forecast_job import fetch_forecast
-from dotenv import load_dotenv
+import pandas as pd
+import requests
+import simulation.fetcher as fetcher
+from simulation.fetcher import fetch_forecast
+from simulation.forecast_job import score_records
+from simulation.fake_provider import FakeOWMSession
+from simulation.quota import QuotaScheduler
+from simulation.replay import Cassette, ProviderServer, RecordingSession, scaled_regions, transport_session
+
+def _fetch(session, **kwargs):
+    return fetch_forecast("test-key", days=1, session=session, quota=QuotaScheduler.unlimited(), cache=False, **kwargs)
 
 def test_fetch_forecast_output():
-    load_dotenv()
-    api_key = os.getenv("OWM_API_KEY")
-    df, failed = fetch_forecast(api_key, days=1)
+    df, failed = _fetch(FakeOWMSession())
     assert not df.empty
     assert isinstance(failed, list)
     assert "Precipitation" in df.columns
     assert "Region" in df.columns
+
+def test_record_then_replay_is_identical(tmp_path):
+    cassette = tmp_path / "owm.json"
+    recording = RecordingSession(FakeOWMSession(), Cassette(cassette))
+    recorded, failed = _fetch(recording)
+    recording.close()
+    assert len(Cassette(cassette)) == recorded["Region"].nunique()
+
+    replayed, replay_failed = _fetch(transport_session("replay", requests.Session(), cassette=cassette))
+    assert replay_failed == failed
+    pd.testing.assert_frame_equal(replayed, recorded)
+    assert score_records(replayed) == score_records(recorded)
+
+def test_http_stand_in_with_injected_errors(monkeypatch):
+    expected, _ = _fetch(FakeOWMSession())
+    provider = FakeOWMSession(error_rate=0.1, latency=0.005, seed=1)
+    with ProviderServer(provider) as server:
+        monkeypatch.setattr(fetcher, "OWM_FORECAST_URL", server.url)
+        df, failed = _fetch(fetcher.make_session(transport="live"))
+    assert provider.calls > expected["Region"].nunique()  # 503s were retried
+    pd.testing.assert_frame_equal(df, expected)
+
+def test_scaled_regions_load():
+    regions = scaled_regions(3)
+    df, failed = _fetch(FakeOWMSession(), region_table=regions)
+    assert len(regions) == 3 * len(fetcher.REGIONS)
+    assert failed == [r for r, info in regions.items() if info.get("lat") is None]
+    assert df["Region"].nunique() == len(regions) - len(failed)
@@ -0,0 +1,86 @@
+from datetime import date
+import pandas as pd
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from backend.core.database import Base
+from backend.core.forecast_store import read_watermarks, write_forecasts
+from backend.db_models.forecast import Forecast
+from backend.main import app
+
+client = TestClient(app)
+
+def test_write_forecasts_bulk(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'store.db'}")
+    Base.metadata.create_all(engine, tables=[Forecast.__table__])
+
+    frame = pd.DataFrame({
+        "region": ["osh", "naryn"],
+        "forecast_date": pd.to_datetime(["2025-05-01", "2025-05-02"]),
+        "prob_hybrid": [0.25, 0.9],
+        "alert": [0, 1],
+    })
+    records = [{"region": "talas", "forecast_date": "2025-05-03", "prob_hybrid": 0.5, "alert": 0}]
+    assert write_forecasts(frame, engine) == 2
+    assert write_forecasts(records, engine) == 1
+    assert write_forecasts([], engine) == 0
+
+    with engine.connect() as conn:
+        rows = conn.execute(select(Forecast.region, Forecast.forecast_date, Forecast.prob_hybrid, Forecast.alert)
+                            .order_by(Forecast.forecast_date)).all()
+    assert rows == [
+        ("osh", date(2025, 5, 1), 0.25, 0),
+        ("naryn", date(2025, 5, 2), 0.9, 1),
+        ("talas", date(2025, 5, 3), 0.5, 0),
+    ]
+
+def test_write_forecasts_upserts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'upsert.db'}")
+    Base.metadata.create_all(engine, tables=[Forecast.__table__])
+
+    first = [{"region": "osh", "forecast_date": "2025-05-01", "prob_hybrid": 0.2, "alert": 0}]
+    rerun = [
+        {"region": "osh", "forecast_date": "2025-05-01", "prob_hybrid": 0.6, "alert": 0},
+        {"region": "osh", "forecast_date": "2025-05-01", "prob_hybrid": 0.95, "alert": 1},
+        {"region": "osh", "forecast_date": "2025-05-02", "prob_hybrid": 0.1, "alert": 0},
+    ]
+    write_forecasts(first, engine)
+    assert write_forecasts(rerun, engine) == 2
+    write_forecasts(rerun, engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(select(Forecast.forecast_date, Forecast.prob_hybrid, Forecast.alert)
+                            .order_by(Forecast.forecast_date)).all()
+    assert rows == [(date(2025, 5, 1), 0.95, 1), (date(2025, 5, 2), 0.1, 0)]
+
+def test_upload_endpoint_writes_in_bulk():
+    payload = [
+        {"region": "Osh", "forecast_date": "2001-01-0%d" % d, "prob_hybrid": 0.1 * d, "alert": 0}
+        for d in range(1, 4)
+    ]
+    res = client.post("/forecast/upload", json=payload)
+    assert res.status_code == 200
+    assert "Uploaded 3 forecasts" in res.json()["message"]
+
+def test_read_watermarks_per_region(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'marks.db'}")
+    Base.metadata.create_all(engine, tables=[Forecast.__table__])
+    write_forecasts([
+        {"region": "osh", "forecast_date": "2025-05-01", "prob_hybrid": 0.9, "alert": 1},
+        {"region": "osh", "forecast_date": "2025-05-03", "prob_hybrid": 0.2, "alert": 0},
+        {"region": "naryn", "forecast_date": "2025-04-28", "prob_hybrid": 0.85, "alert": 1},
+    ], engine)
+
+    assert read_watermarks(engine) == [
+        {"region": "naryn", "last_date": date(2025, 4, 28), "prob_hybrid": 0.85, "alert": 1},
+        {"region": "osh", "last_date": date(2025, 5, 3), "prob_hybrid": 0.2, "alert": 0},
+    ]
+
+def test_watermarks_endpoint():
+    client.post("/forecast/upload", json=[
+        {"region": "Talas", "forecast_date": "2001-02-0%d" % d, "prob_hybrid": 0.9, "alert": 1} for d in (1, 2)
+    ])
+    res = client.get("/forecast/watermarks")
+    assert res.status_code == 200
+    marks = {w["region"]: w for w in res.json()}
+    assert marks["talas"]["last_date"] >= "2001-02-02"
+    assert set(marks["talas"]) == {"region", "last_date", "prob_hybrid", "alert", "risk_level"}
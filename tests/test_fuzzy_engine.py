@@ -0,0 +1,48 @@
+import numpy as np
+from simulation.fuzzy_sim import load_fuzzy_sim, load_fuzzy_engine
+from simulation.fuzzy_surface import load_fuzzy_surface, surface_path
+
+def test_fuzzy_engine_matches_skfuzzy():
+    rng = np.random.default_rng(42)
+    grid = np.linspace(0, 1, 11)
+    gp, gr = np.meshgrid(grid, grid)
+    precip = np.concatenate([rng.random(200), gp.ravel(), [-0.5, 1.5]])
+    runoff = np.concatenate([rng.random(200), gr.ravel(), [0.3, 0.7]])
+
+    sim = load_fuzzy_sim()
+    expected = []
+    for p, r in zip(precip, runoff):
+        sim.input['precip'] = p
+        sim.input['runoff'] = r
+        sim.compute()
+        expected.append(sim.output['risk'])
+
+    engine = load_fuzzy_engine()
+    result = engine.evaluate(precip, runoff)
+    assert result.shape == precip.shape
+    np.testing.assert_allclose(result, expected, atol=1e-9)
+
+def test_fuzzy_engine_scalar_input():
+    engine = load_fuzzy_engine()
+    result = engine.evaluate(0.9, 0.9)
+    assert result.shape == (1,)
+    assert 0.0 <= result[0] <= 1.0
+
+def test_fuzzy_surface_tracks_engine(tmp_path):
+    surface = load_fuzzy_surface(resolution=201, cache_dir=tmp_path)
+    assert surface_path(201, tmp_path).exists()
+
+    rng = np.random.default_rng(7)
+    precip, runoff = rng.random(2000), rng.random(2000)
+    expected = load_fuzzy_engine().evaluate(precip, runoff)
+    np.testing.assert_allclose(surface.evaluate(precip, runoff), expected, atol=5e-3)
+
+    # Second load reads the cached grid instead of recompiling
+    reloaded = load_fuzzy_surface(resolution=201, cache_dir=tmp_path)
+    np.testing.assert_array_equal(reloaded.grid, surface.grid)
+
+def test_fuzzy_surface_missing_inputs_give_nan(tmp_path):
+    surface = load_fuzzy_surface(resolution=51, cache_dir=tmp_path)
+    risk = surface.evaluate([0.3, np.nan, 0.3, np.inf, 0.3], [0.6, 0.6, np.nan, 0.6, 0.6])
+    assert np.isnan(risk[1:4]).all()
+    assert risk[0] == risk[4] == surface.evaluate(0.3, 0.6)[0]
@@ -0,0 +1,168 @@
+import os
+import threading
+import uuid
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from backend.core.database import SessionLocal
+from backend.core import ingest_worker as ingest_worker_module
+from backend.core.ingest_worker import CronSchedule, DbRunStore, IngestWorker, ingest_worker, is_orphaned, worker_id
+from backend.core.security import get_current_admin_user
+from backend.main import app
+from backend.db_models.ingest_run import IngestRun
+from simulation.run_stats import RunStats
+
+client = TestClient(app)
+
+def test_cron_next_after():
+    start = datetime(2025, 5, 7, 10, 17, 42)  # a Wednesday
+    assert CronSchedule("*/15 * * * *").next_after(start) == datetime(2025, 5, 7, 10, 30)
+    assert CronSchedule("15 */6 * * *").next_after(start) == datetime(2025, 5, 7, 12, 15)
+    assert CronSchedule("0 3 * * *").next_after(start) == datetime(2025, 5, 8, 3, 0)
+    assert CronSchedule("0 0 1 * *").next_after(start) == datetime(2025, 6, 1, 0, 0)
+    assert CronSchedule("30 6 * * 1-5").next_after(datetime(2025, 5, 9, 7, 0)) == datetime(2025, 5, 12, 6, 30)
+    assert CronSchedule("0 12 * * 7").next_after(start) == datetime(2025, 5, 11, 12, 0)
+    # day-of-month OR day-of-week when both are restricted
+    assert CronSchedule("0 0 20 * 5").next_after(start) == datetime(2025, 5, 9, 0, 0)
+    with pytest.raises(ValueError):
+        CronSchedule("61 * * * *")
+    with pytest.raises(ValueError):
+        CronSchedule("* * *")
+
+def test_worker_runs_jobs_in_order_and_records_errors():
+    calls = []
+    release = threading.Event()
+
+    def run(job_id, backfill_days=None):
+        release.wait(5)
+        calls.append(backfill_days)
+        if backfill_days == 99:
+            raise RuntimeError("upstream down")
+
+    worker = IngestWorker(run_fn=run, schedule="", warm_up=None)
+    first = worker.enqueue(backfill_days=1)
+    second = worker.enqueue(backfill_days=99)
+    assert worker.enqueue(backfill_days=99) == second  # still queued → same job
+    release.set()
+
+    assert worker.wait(first, timeout=5)["status"] == "succeeded"
+    failed = worker.wait(second, timeout=5)
+    assert failed["status"] == "failed"
+    assert "upstream down" in failed["error"]
+    assert calls == [1, 99]
+    worker.stop(timeout=5)
+
+def test_worker_merges_run_stats():
+    saved = []
+
+    class Store:
+        def save(self, job):
+            saved.append(job)
+
+    def run(job_id):
+        stats = RunStats()
+        with stats.stage("fetch"):
+            pass
+        stats.add("rows_scored", 12)
+        stats.failed_regions = ["osh"]
+        stats.error = "Upload failed: 503"
+        return stats
+
+    worker = IngestWorker(run_fn=run, schedule="", warm_up=None, store=Store())
+    job = worker.wait(worker.enqueue(), timeout=5)
+    assert job["status"] == "failed"
+    assert job["rows_scored"] == 12
+    assert job["failed_regions"] == ["osh"]
+    assert job["fetch_s"] >= 0 and job["duration_s"] >= 0
+    assert [j["status"] for j in saved] == ["queued", "running", "failed"]
+    worker.stop(timeout=5)
+
+def test_admin_ingest_enqueues_and_records_job(monkeypatch):
+    def run(**options):
+        stats = RunStats()
+        stats.add("rows_uploaded", 3)
+        return stats
+
+    monkeypatch.setattr(ingest_worker, "run_fn", run)
+    monkeypatch.setattr(ingest_worker, "warm_up", None)
+    app.dependency_overrides[get_current_admin_user] = lambda: object()
+    try:
+        res = client.post("/admin/ingest", params={"backfill_days": 2})
+        assert res.status_code == 202
+        job_id = res.json()["job_id"]
+        assert ingest_worker.wait(job_id, timeout=5)["status"] == "succeeded"
+
+        job = client.get(f"/admin/jobs/{job_id}").json()
+        assert job["status"] == "succeeded"
+        assert job["options"] == {"backfill_days": 2}
+        assert job["rows_uploaded"] == 3
+        assert job_id in [j["id"] for j in client.get("/admin/jobs").json()]
+        assert client.get("/admin/jobs/nope").status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_current_admin_user, None)
+
+def test_interrupted_runs_are_failed_on_worker_start():
+    me = worker_id()
+    host = me.rpartition(":")[0]
+    assert is_orphaned(None, me) and is_orphaned(me, me)
+    assert is_orphaned(f"{host}:999999999", me)          # dead process on this host
+    assert not is_orphaned(f"{host}:{os.getppid()}", me)  # live process on this host
+    assert not is_orphaned("elsewhere:1", me)             # another host's own worker
+
+    stale_id = uuid.uuid4().hex
+    db = SessionLocal()
+    db.add(IngestRun(id=stale_id, trigger="manual", status="running", options={},
+                     queued_at=datetime.utcnow(), worker=f"{host}:999999999"))
+    db.commit()
+    db.close()
+
+    worker = IngestWorker(run_fn=lambda job_id: None, warm_up=None, store=DbRunStore())
+    worker.wait(worker.enqueue(), timeout=5)
+
+    db = SessionLocal()
+    run = db.get(IngestRun, stale_id)
+    assert run.status == "failed" and run.error.startswith("Interrupted")
+    db.close()
+
+def test_job_is_skipped_while_another_process_runs_one():
+    running_id = uuid.uuid4().hex
+    db = SessionLocal()
+    db.add(IngestRun(id=running_id, trigger="schedule", status="running", options={},
+                     queued_at=datetime.utcnow(), started_at=datetime.utcnow(), worker="elsewhere:1"))
+    db.commit()
+    db.close()
+
+    calls = []
+    worker = IngestWorker(run_fn=lambda job_id: calls.append(job_id), warm_up=None, store=DbRunStore())
+    try:
+        skipped = worker.wait(worker.enqueue(), timeout=5)
+        assert skipped["status"] == "skipped" and running_id in skipped["error"]
+        assert calls == []
+        db = SessionLocal()
+        assert db.get(IngestRun, skipped["id"]).status == "skipped"
+        db.close()
+    finally:
+        db = SessionLocal()
+        db.get(IngestRun, running_id).status = "succeeded"
+        db.commit()
+        db.close()
+
+    job = worker.wait(worker.enqueue(), timeout=5)
+    assert job["status"] == "succeeded" and calls == [job["id"]]
+    worker.stop(timeout=5)
+
+def test_each_job_checkpoints_in_its_own_directory(monkeypatch, tmp_path):
+    import simulation.checkpoint
+    import simulation.forecast_job
+    seen = []
+
+    def main(checkpoint, **kwargs):
+        checkpoint.start({}, sink="db")
+        seen.append(checkpoint.path)
+
+    monkeypatch.setattr(simulation.checkpoint, "CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setattr(simulation.forecast_job, "main", main)
+    ingest_worker_module.run_forecast_job("job1")
+    ingest_worker_module.run_forecast_job("job2")
+    assert seen == [tmp_path / "jobs" / "job1", tmp_path / "jobs" / "job2"]
+    assert not (tmp_path / "jobs" / "job1").exists()
@@ -0,0 +1,108 @@
+import threading
+from concurrent.futures import Future
+import numpy as np
+import pytest
+from backend.core.micro_batcher import MicroBatcher
+
+SAMPLE_ROW = {
+    "Precipitation": 5.0, "Elevation_m": 1000, "Slope_deg": 10.0, "Drainage_Density": 2.5,
+    "Dist_to_River_km": 0.5, "Soil_Type": "loam", "Land_Cover": "urban", "TWI": 13.0, "NDVI": 0.4,
+    "month_sin": 0.5, "month_cos": 0.86, "Precipitation_norm": 0.6, "River_Level_norm": 0.6,
+}
+
+def test_concurrent_submits_are_coalesced():
+    batch_sizes = []
+
+    def score(df):
+        batch_sizes.append(len(df))
+        return df["x"].to_numpy() * 2.0
+
+    batcher = MicroBatcher(score, window_ms=50, max_batch=16)
+    results = {}
+    barrier = threading.Barrier(10)
+
+    def call(i):
+        barrier.wait()
+        results[i] = batcher.submit({"x": float(i)}).result(timeout=5)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: i * 2.0 for i in range(10)}
+    assert sum(batch_sizes) == 10
+    assert len(batch_sizes) < 10
+
+def test_max_batch_and_errors_propagate():
+    batch_sizes = []
+
+    def score(df):
+        batch_sizes.append(len(df))
+        if (df["x"] < 0).any():
+            raise ValueError("bad row")
+        return np.zeros(len(df))
+
+    batcher = MicroBatcher(score, window_ms=20, max_batch=2)
+    futures = [batcher.submit({"x": 1.0}) for _ in range(5)]
+    assert [f.result(timeout=5) for f in futures] == [0.0] * 5
+    assert max(batch_sizes) <= 2
+
+    with pytest.raises(ValueError):
+        batcher.submit({"x": -1.0}).result(timeout=5)
+
+def test_bad_row_fails_only_its_own_request():
+    def score(df):
+        if (df["x"] < 0).any():
+            raise ValueError("bad row")
+        return df["x"].to_numpy() * 2.0
+
+    batcher = MicroBatcher(score, window_ms=100, max_batch=8)
+    good = [batcher.submit({"x": float(i)}) for i in range(3)]
+    bad = batcher.submit({"x": -1.0})
+    assert [f.result(timeout=5) for f in good] == [0.0, 2.0, 4.0]
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+
+def test_restarted_worker_serves_rows_already_queued():
+    batcher = MicroBatcher(lambda df: df["x"].to_numpy() * 2.0, window_ms=5)
+    assert batcher.submit({"x": 0.0}).result(timeout=5) == 0.0
+
+    dead = threading.Thread(target=lambda: None)
+    dead.start()
+    dead.join()
+    batcher._thread = dead  # as if the worker had died
+    pending = Future()
+    batcher._queue.put(({"x": 1.0}, pending))
+
+    assert batcher.submit({"x": 2.0}).result(timeout=5) == 4.0
+    assert pending.result(timeout=5) == 2.0
+
+def test_stalled_worker_gives_503(monkeypatch):
+    import backend.api.predict as predict
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    stalled = MicroBatcher(lambda df: df["x"].to_numpy())
+    stalled.submit = lambda row: Future()  # never resolved
+    monkeypatch.setattr(predict, "batcher", stalled)
+    monkeypatch.setattr(predict, "MICROBATCH_TIMEOUT_S", 0.05)
+
+    res = TestClient(app).post("/predict", json=SAMPLE_ROW)
+    assert res.status_code == 503
+
+def test_cancelled_rows_are_skipped():
+    batcher = MicroBatcher(lambda df: df["x"].to_numpy(), window_ms=50)
+    cancelled = Future()
+    cancelled.cancel()
+    batcher._ensure_worker()
+    batcher._queue.put(({"x": 1.0}, cancelled))
+    assert batcher.submit({"x": 2.0}).result(timeout=5) == 2.0
+
+def test_short_score_array_fails_the_whole_batch():
+    batcher = MicroBatcher(lambda df: df["x"].to_numpy()[:-1], window_ms=50)
+    futures = [batcher.submit({"x": float(i)}) for i in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="scores for"):
+            future.result(timeout=5)
@@ -0,0 +1,75 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+from backend.core.database import Base
+from backend.core.forecast_store import write_forecasts
+from backend.core.migrations import upgrade_database
+import backend.main  # noqa: F401  (registers every model on Base.metadata)
+from scripts.dedupe_forecasts import count_duplicates
+
+def _indexes(engine, table):
+    return {ix["name"] for ix in inspect(engine).get_indexes(table)}
+
+def test_migrations_match_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    upgrade_database(engine)
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+    assert "ix_forecasts_date_region" in _indexes(engine, "forecasts")
+
+def test_pre_migration_database_is_adopted(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    upgrade_database(engine, revision="0001")
+    with engine.begin() as conn:
+        # As left behind by create_all: the tables, no alembic_version
+        conn.execute(text("DROP TABLE alembic_version"))
+        conn.execute(text("INSERT INTO forecasts (region, forecast_date, prob_hybrid, alert) "
+                          "VALUES ('osh', '2025-05-01', 0.5, 0)"))
+
+    upgrade_database(engine)
+    assert "ix_subscriptions_user_region" in _indexes(engine, "subscriptions")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == "0004"
+        assert conn.execute(text("SELECT count(*) FROM forecasts")).scalar() == 1
+
+def test_read_queries_use_indexes():
+    from scripts.check_query_plans import main
+    assert main() == 0
+
+def test_legacy_duplicates_are_removed_and_upserts_work(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dupes.db'}")
+    with engine.begin() as conn:
+        # forecasts as created before uploads became upserts: no unique key
+        conn.execute(text("CREATE TABLE forecasts (id INTEGER PRIMARY KEY, region VARCHAR NOT NULL, "
+                          "forecast_date DATE NOT NULL, prob_hybrid FLOAT NOT NULL, alert INTEGER NOT NULL)"))
+        conn.execute(text("INSERT INTO forecasts (region, forecast_date, prob_hybrid, alert) VALUES "
+                          "('osh', '2025-05-01', 0.1, 0), ('osh', '2025-05-01', 0.9, 1), ('naryn', '2025-05-01', 0.2, 0)"))
+
+    assert count_duplicates(engine) == 1
+    upgrade_database(engine)
+    assert count_duplicates(engine) == 0
+    write_forecasts([{"region": "osh", "forecast_date": "2025-05-01", "prob_hybrid": 0.5, "alert": 0}], engine)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT region, prob_hybrid FROM forecasts ORDER BY region")).all()
+    assert rows == [("naryn", 0.2), ("osh", 0.5)]
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="set TEST_POSTGRES_URL to run the Postgres tests")
+def test_concurrent_upgrades_on_postgres_run_one_at_a_time():
+    pytest.importorskip("psycopg2")
+    url = os.getenv("TEST_POSTGRES_URL")  # a throwaway database: its schema is dropped
+    reset = create_engine(url)
+    with reset.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    reset.dispose()
+
+    engines = [create_engine(url) for _ in range(4)]
+    with ThreadPoolExecutor(len(engines)) as pool:
+        list(pool.map(upgrade_database, engines))  # re-raises a failed upgrade
+    with engines[0].connect() as conn:
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).all() == [("0004",)]
+    for engine in engines:
+        engine.dispose()
@@ -23,3 +23,35 @@ def test_model_prediction():
 
     proba = model.predict_proba(X_sample)
     assert proba.shape == (1, 2)
+
+def test_lean_model_matches_pipeline():
+    import numpy as np
+    from backend.core.lean_model import compile_pipeline
+    from scripts.export_lean_model import sample_rows
+
+    model = joblib.load("backend/models/hybrid_calibrated_pipeline.pkl")
+    lean = compile_pipeline(model)
+
+    X = sample_rows(n=500)
+    X.loc[0, "Soil_Type"] = "not_a_soil"  # unknown categories are ignored, as in OneHotEncoder
+    np.testing.assert_allclose(lean.predict_proba(X), model.predict_proba(X), atol=1e-9)
+
+def test_static_feature_cache_matches_pipeline():
+    import numpy as np
+    from backend.core.lean_model import compile_pipeline, StaticFeatureCache
+    from simulation.fetcher import region_static_table
+
+    model = joblib.load("backend/models/hybrid_calibrated_pipeline.pkl")
+    table = region_static_table()
+    cache = StaticFeatureCache(compile_pipeline(model), table)
+
+    rng = np.random.default_rng(0)
+    regions = rng.choice(table.index, 200)
+    X = table.loc[regions].reset_index(drop=True)
+    month = rng.integers(1, 13, len(X))
+    X["month_sin"] = np.sin(2 * np.pi * month / 12)
+    X["month_cos"] = np.cos(2 * np.pi * month / 12)
+    X["Fuzzy_Risk"] = rng.random(len(X))
+
+    assert cache.covers(regions)
+    np.testing.assert_allclose(cache.predict_positive(regions, X), model.predict_proba(X)[:, 1], atol=1e-9)
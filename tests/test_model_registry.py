@@ -0,0 +1,32 @@
+import threading
+import time
+from backend.core.model_registry import ModelRegistry
+
+def test_registry_loads_once_under_concurrency():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    registry = ModelRegistry()
+    registry.register("slow", loader)
+    assert not registry.is_loaded("slow")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("slow"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+def test_registry_reset_reloads():
+    registry = ModelRegistry()
+    registry.register("obj", object)
+    first = registry.get("obj")
+    registry.reset("obj")
+    assert registry.get("obj") is not first
@@ -0,0 +1,32 @@
+from datetime import date
+from sqlalchemy import create_engine, select
+from backend.core.database import Base
+from backend.core.forecast_store import write_forecasts
+from backend.core.partitions import (PARTITION_NAME, drop_partitions_before, ensure_partitions, partition_for,
+                                     partitions_between, prepare_storage)
+from backend.db_models.forecast import Forecast
+
+def test_partition_bounds():
+    assert partition_for(date(2024, 2, 29), "month") == ("forecasts_p2024_02", date(2024, 2, 1), date(2024, 3, 1))
+    assert partition_for(date(2024, 12, 31), "month")[2] == date(2025, 1, 1)
+    # ISO week: Monday 2024-12-30 starts week 1 of 2025
+    assert partition_for(date(2025, 1, 2), "week") == ("forecasts_p2025w01", date(2024, 12, 30), date(2025, 1, 6))
+
+    months = partitions_between(date(2024, 11, 15), date(2025, 2, 1), "month")
+    assert [name for name, _, _ in months] == ["forecasts_p2024_11", "forecasts_p2024_12",
+                                               "forecasts_p2025_01", "forecasts_p2025_02"]
+    assert all(a[2] == b[1] for a, b in zip(months, months[1:]))  # contiguous
+    assert all(PARTITION_NAME.match(name) for name, _, _ in months)
+    assert not PARTITION_NAME.match("forecasts")
+
+def test_sqlite_keeps_plain_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+    Base.metadata.create_all(engine, tables=[Forecast.__table__])
+    prepare_storage(engine, interval="month")
+
+    write_forecasts([{"region": "osh", "forecast_date": date(2025, 1, 5), "prob_hybrid": 0.2, "alert": 0},
+                     {"region": "osh", "forecast_date": date(2025, 3, 5), "prob_hybrid": 0.3, "alert": 0}], engine)
+    with engine.begin() as conn:
+        assert ensure_partitions(conn, [date(2025, 1, 5)], interval="month") == []
+        assert drop_partitions_before(conn, date(2025, 3, 1)) == []
+        assert len(conn.execute(select(Forecast.id)).all()) == 2
@@ -0,0 +1,79 @@
+import os
+from datetime import date
+import pytest
+from sqlalchemy import create_engine, text
+from backend.core.database import Base
+from backend.core.forecast_store import write_forecasts
+import backend.core.partitions as partitions
+from backend.db_models.forecast import Forecast
+
+# A throwaway Postgres database: its forecasts table is dropped and rebuilt
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="set TEST_POSTGRES_URL to run the Postgres partition tests")
+
+def _row(region, day, prob=0.5):
+    return {"region": region, "forecast_date": day, "prob_hybrid": prob, "alert": 0}
+
+@pytest.fixture
+def engine(monkeypatch):
+    pytest.importorskip("psycopg2")
+    engine = create_engine(POSTGRES_URL)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS forecasts CASCADE"))
+    Base.metadata.create_all(engine, tables=[Forecast.__table__])
+    monkeypatch.setattr(partitions, "FORECAST_PARTITIONS", "month")
+    yield engine
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS forecasts CASCADE"))
+    engine.dispose()
+
+def _rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT id, region, forecast_date, prob_hybrid FROM forecasts ORDER BY id")).all()
+
+def test_partition_existing_table_and_write(engine):
+    write_forecasts([_row("osh", date(2025, 1, 5)), _row("osh", date(2025, 3, 5)), _row("naryn", date(2025, 3, 6))],
+                    engine)
+    before = _rows(engine)
+
+    with engine.begin() as conn:
+        created = partitions.partition_table(conn, "month")
+    assert created == ["forecasts_p2025_01", "forecasts_p2025_02", "forecasts_p2025_03"]
+    assert _rows(engine) == before
+
+    # New month: its partition is created at ingest; ids continue; upserts still work
+    write_forecasts([_row("osh", date(2025, 4, 1)), _row("osh", date(2025, 3, 5), 0.9)], engine)
+    rows = _rows(engine)
+    assert len(rows) == 4 and rows[-1][0] > before[-1][0]
+    assert [r[3] for r in rows if r[2] == date(2025, 3, 5)] == [0.9]
+
+    with engine.connect() as conn:
+        plan = "\n".join(line for line, in conn.execute(text(
+            "EXPLAIN SELECT * FROM forecasts WHERE forecast_date >= '2025-03-01'")))
+    assert "forecasts_p2025_01" not in plan and "forecasts_p2025_03" in plan  # pruned
+
+def test_retention_drops_partitions_and_writes_recreate_them(engine):
+    with engine.begin() as conn:
+        partitions.partition_table(conn, "month")
+    write_forecasts([_row("osh", date(2025, 1, 5)), _row("osh", date(2025, 2, 20))], engine)
+
+    with engine.begin() as conn:
+        assert partitions.drop_partitions_before(conn, date(2025, 2, 10)) == ["forecasts_p2025_01"]
+    assert [r[2] for r in _rows(engine)] == [date(2025, 2, 20)]
+
+    # Another process dropped the partition: the next write for it recreates it
+    write_forecasts([_row("naryn", date(2025, 1, 6))], engine)
+    with engine.connect() as conn:
+        assert [name for name, _, _ in partitions.list_partitions(conn)] == ["forecasts_p2025_01", "forecasts_p2025_02"]
+
+def test_writes_into_existing_partitions_take_no_lock(engine):
+    with engine.begin() as conn:
+        partitions.partition_table(conn, "month")
+    write_forecasts([_row("osh", date(2025, 1, 5))], engine)
+
+    advisory = "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid()"
+    with engine.begin() as conn:
+        assert partitions.ensure_partitions(conn, [date(2025, 1, 20)]) == []
+        assert conn.execute(text(advisory)).scalar() == 0
+        assert partitions.ensure_partitions(conn, [date(2025, 2, 1)]) == ["forecasts_p2025_02"]
+        assert conn.execute(text(advisory)).scalar() == 1
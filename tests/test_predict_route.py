@@ -31,3 +31,56 @@ def test_predict_route_with_13_features():
 
     assert isinstance(data["risk_score"], float)
     assert data["alert_level"] in ["Low", "Moderate", "High"]
+
+def _sample_row(**overrides):
+    row = {
+        "Precipitation": 3.2,
+        "Elevation_m": 950,
+        "Slope_deg": 6.5,
+        "Drainage_Density": 2.1,
+        "Dist_to_River_km": 1.0,
+        "Soil_Type": "loam",
+        "Land_Cover": "urban",
+        "TWI": 12.5,
+        "NDVI": 0.35,
+        "month_sin": 0.5,
+        "month_cos": 0.866,
+        "Precipitation_norm": 0.64,
+        "River_Level_norm": 0.64,
+        "Fuzzy_Risk": 0.7,
+    }
+    row.update(overrides)
+    return row
+
+def test_predict_batch_rows_match_single_predictions():
+    rows = [_sample_row(Fuzzy_Risk=f) for f in (0.1, 0.5, 0.9)]
+    response = client.post("/predict/batch", json={"rows": rows})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["risk_scores"]) == 3
+    assert len(data["alert_levels"]) == 3
+
+    for row, score in zip(rows, data["risk_scores"]):
+        single = client.post("/predict", json=row).json()
+        assert single["risk_score"] == pytest.approx(score)
+
+def test_predict_batch_columnar_payload():
+    rows = [_sample_row(Fuzzy_Risk=f) for f in (0.2, 0.8)]
+    columns = {key: [row[key] for row in rows] for key in rows[0]}
+    by_rows = client.post("/predict/batch", json={"rows": rows}).json()
+    by_columns = client.post("/predict/batch", json={"columns": columns}).json()
+    assert by_columns["risk_scores"] == pytest.approx(by_rows["risk_scores"])
+
+def test_predict_batch_rejects_oversized_and_ambiguous_payloads():
+    from backend.schemas.forecast import PREDICT_MAX_BATCH
+    rows = [_sample_row()] * (PREDICT_MAX_BATCH + 1)
+    response = client.post("/predict/batch", json={"rows": rows})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "too_long"
+
+    columns = {key: [row[key] for row in rows] for key in rows[0]}
+    response = client.post("/predict/batch", json={"columns": columns})
+    assert response.status_code == 422
+
+    response = client.post("/predict/batch", json={})
+    assert response.status_code == 422
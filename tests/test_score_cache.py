@@ -0,0 +1,66 @@
+from backend.core.model_registry import get_fuzzy_surface, get_model, get_model_version, get_static_features
+from simulation.disk_cache import DiskCache
+from simulation.fake_provider import FakeOWMSession
+from simulation.fetcher import fetch_forecast
+from simulation.hybrid import run_forecast_pipeline
+from simulation.quota import QuotaScheduler
+from simulation.run_stats import RunStats
+from simulation.score_cache import ScoreCache
+
+class CountingSurface:
+    """The fuzzy surface, counting how many rows it is asked to evaluate."""
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.key = surface.key
+        self.rows = 0
+
+    def evaluate(self, precip, runoff):
+        self.rows += len(precip)
+        return self.surface.evaluate(precip, runoff)
+
+def _frame():
+    df, _ = fetch_forecast("test-key", days=5, session=FakeOWMSession(), quota=QuotaScheduler.unlimited(), cache=False)
+    return df
+
+def _score(df, sim, cache, version="v1", stats=None):
+    return run_forecast_pipeline(df.copy(), get_model(), sim, 0.71, static_features=get_static_features(),
+                                 stats=stats, score_cache=cache, model_version=version)
+
+def test_cache_scores_only_changed_rows(tmp_path):
+    df = _frame()
+    expected = run_forecast_pipeline(df.copy(), get_model(), get_fuzzy_surface(), 0.71,
+                                     static_features=get_static_features())
+    cache = ScoreCache(DiskCache(tmp_path / "scores.sqlite"))
+    sim = CountingSurface(get_fuzzy_surface())
+
+    first = _score(df, sim, cache)
+    assert sim.rows == len(df)
+    assert first.equals(expected)
+
+    stats = RunStats()
+    again = _score(df, sim, cache, stats=stats)
+    assert sim.rows == len(df)  # nothing rescored
+    assert stats.counts["rows_cached"] == len(df)
+    assert again.equals(expected)
+
+    changed = df.copy()
+    changed.loc[[0, 5], "Precipitation"] += 1.0
+    _score(changed, sim, cache)
+    assert sim.rows == len(df) + 2
+
+def test_new_model_version_misses(tmp_path):
+    df = _frame().head(20)
+    cache = ScoreCache(DiskCache(tmp_path / "scores.sqlite"))
+    sim = CountingSurface(get_fuzzy_surface())
+    _score(df, sim, cache, version="v1")
+    _score(df, sim, cache, version="v2")
+    assert sim.rows == 40
+    assert len(get_model_version()) == 16
+
+def test_disk_cache_batch_get_and_set(tmp_path):
+    store = DiskCache(tmp_path / "kv.sqlite", max_bytes=2000)
+    store.set_many({f"k{i}": (float(i), 0.5) for i in range(100)})
+    found = store.get_many(["k99", "k98", "missing"])
+    assert found == {"k99": (99.0, 0.5), "k98": (98.0, 0.5)}
+    assert store.size() <= 2000 and "k0" not in store.get_many(["k0"])
@@ -0,0 +1,51 @@
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from backend.core.database import Base
+from backend.core.snapshot import SnapshotCache
+from backend.db_models.forecast import Forecast
+from backend.main import app
+
+client = TestClient(app)
+
+def test_snapshot_served_until_bumped_or_expired(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'snap.db'}")
+    Base.metadata.create_all(engine, tables=[Forecast.__table__])
+    now = [0.0]
+    cache = SnapshotCache(ttl=30, clock=lambda: now[0])
+
+    with Session(engine) as db:
+        assert cache.get(db).empty
+        db.execute(insert(Forecast), [
+            {"region": "osh", "forecast_date": date(2025, 5, 1), "prob_hybrid": 0.9, "alert": 1},
+            {"region": "osh", "forecast_date": date(2025, 5, 2), "prob_hybrid": 0.6, "alert": 0},
+            {"region": "naryn", "forecast_date": date(2025, 5, 2), "prob_hybrid": 0.1, "alert": 0},
+        ])
+        db.commit()
+        assert cache.get(db).empty  # written behind its back: still the cached snapshot
+
+        cache.bump()
+        snapshot = cache.get(db)
+        assert snapshot.forecast_date == date(2025, 5, 2)
+        assert snapshot.summary == {"Low": 1, "Moderate": 1, "High": 0}
+        assert snapshot.status[0]["alert_level"] == "Moderate" and snapshot.status[0]["lat"] is not None
+        assert cache.get(db) is snapshot
+
+        now[0] = 31.0
+        assert cache.get(db) is not snapshot
+
+def test_uploads_refresh_dashboard_endpoints():
+    res = client.get("/forecast/latest")
+    day = res.json()[0]["forecast_date"] if res.status_code == 200 else "2001-01-01"
+    client.get("/status")
+
+    client.post("/forecast/upload", json=[
+        {"region": "Snapshot-Test", "forecast_date": day, "prob_hybrid": 0.95, "alert": 1}
+    ])
+    status = {row["region"]: row for row in client.get("/status").json()}
+    assert status["snapshot-test"]["alert_level"] == "High"
+    latest = {row["region"]: row for row in client.get("/forecast/latest").json()}
+    assert latest["snapshot-test"] == {"region": "snapshot-test", "forecast_date": day, "prob_hybrid": 0.95,
+                                       "alert": 1, "risk_level": "High"}
+    assert client.get("/risk-summary").json()["High"] >= 1
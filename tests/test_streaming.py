@@ -0,0 +1,53 @@
+import pytest
+from simulation.fetcher import fetch_forecast, forecast_cutoff, stream_forecast_payloads
+from simulation.fake_provider import FakeOWMSession
+from simulation.forecast_job import score_records
+from simulation.quota import QuotaScheduler
+from simulation.streaming import run_streaming
+from config.regions_config import REGIONS
+
+def _payloads(latency=0.0, workers=8):
+    quota = QuotaScheduler(per_minute=60_000, burst=1000, usage_path=None)
+    return stream_forecast_payloads("test-key", workers=workers, session=FakeOWMSession(latency=latency),
+                                    quota=quota, cache=False)
+
+def test_streaming_matches_batch_scoring():
+    uploads = []
+    progress = run_streaming(_payloads(), forecast_cutoff(3), score_records, uploads.append,
+                             total_regions=len(REGIONS), upload_batch=50)
+
+    quota = QuotaScheduler(per_minute=60_000, burst=1000, usage_path=None)
+    df_raw, failed = fetch_forecast("test-key", days=3, session=FakeOWMSession(), quota=quota, cache=False)
+    expected = score_records(df_raw)
+
+    streamed = [r for batch in uploads for r in batch]
+    key = lambda r: (r["region"], r["forecast_date"])
+    assert sorted(streamed, key=key) == pytest.approx(sorted(expected, key=key))
+    assert progress.counts["uploaded"] == len(expected)
+    assert progress.counts["scored"] == len(REGIONS) - len(failed)
+    assert all(len(batch) >= 50 for batch in uploads[:-1])
+
+def test_scoring_overlaps_slow_fetches():
+    fetched = [0]
+    seen = []
+
+    def counted(payloads):
+        for item in payloads:
+            fetched[0] += 1
+            yield item
+
+    def score(df_raw):
+        seen.append(fetched[0])
+        return [{"region": r} for r in df_raw["Region"]]
+
+    run_streaming(counted(_payloads(latency=0.05, workers=2)), forecast_cutoff(1), score, lambda records: None,
+                  total_regions=len(REGIONS))
+    assert seen[0] < len(REGIONS) // 2
+
+def test_score_errors_stop_the_run():
+    def score(df_raw):
+        raise RuntimeError("model exploded")
+
+    with pytest.raises(RuntimeError, match="model exploded"):
+        run_streaming(_payloads(latency=0.01), forecast_cutoff(1), score, lambda records: None,
+                      total_regions=len(REGIONS))